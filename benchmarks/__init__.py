@@ -0,0 +1,7 @@
+# __init__.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Benchmarks for the 'grin' package.  Each module in this package can be run
+# on its own (e.g., "python -m benchmarks.lexing") and prints its results.
@@ -0,0 +1,96 @@
+# asynchronous.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures grin.asynchronous.run_async, first by running many concurrent
+# sessions, each of which sums numbers that its producer sends it one at a
+# time, with a short delay between them (as though they were arriving over a
+# network), and then by comparing the time it takes to run a program that
+# never reads input with run_async and with interpret().
+#
+# Usage: python -m benchmarks.asynchronous [SESSION_COUNT]
+
+from grin.asynchronous import run_async
+from grin.interpreter import interpret
+from grin.parsing import parse_statements
+import asyncio
+import sys
+import time
+
+
+
+_LINE_COUNT = 20
+
+_DELAY = 0.01
+
+_SUMMING = list(parse_statements([
+    'LET TOTAL 0',
+    'LET I 0',
+    'LOOP: INNUM N',
+    'ADD TOTAL N',
+    'ADD I 1',
+    f'GOTO "LOOP" IF I < {_LINE_COUNT}',
+    'PRINT TOTAL'
+]))
+
+_COUNTING = list(parse_statements(['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < 1000000']))
+
+
+
+class _DiscardingWriter:
+    def write(self, data: bytes) -> None:
+        pass
+
+
+    async def drain(self) -> None:
+        pass
+
+
+
+async def _produce(reader: asyncio.StreamReader) -> None:
+    for n in range(_LINE_COUNT):
+        await asyncio.sleep(_DELAY)
+        reader.feed_data(f'{n}\n'.encode())
+
+    reader.feed_eof()
+
+
+async def run_sessions(session_count: int) -> None:
+    readers = [asyncio.StreamReader() for _ in range(session_count)]
+
+    await asyncio.gather(
+        *(run_async(_SUMMING, reader, _DiscardingWriter()) for reader in readers),
+        *(_produce(reader) for reader in readers))
+
+
+async def run_counting() -> None:
+    await run_async(_COUNTING, asyncio.StreamReader(), _DiscardingWriter())
+
+
+def main() -> None:
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    start = time.perf_counter()
+    asyncio.run(run_sessions(session_count))
+    elapsed = time.perf_counter() - start
+
+    print(f'{session_count} concurrent sessions, each reading {_LINE_COUNT} lines {_DELAY * 1000:g} ms apart')
+    print(f'  run_async:  {elapsed:8.3f} s  (one at a time: at least {session_count * _LINE_COUNT * _DELAY:.1f} s)')
+
+    start = time.perf_counter()
+    interpret(_COUNTING)
+    synchronous = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(run_counting())
+    asynchronous = time.perf_counter() - start
+
+    print('A loop of 1,000,000 iterations without input')
+    print(f'  interpret:  {synchronous:8.3f} s')
+    print(f'  run_async:  {asynchronous:8.3f} s  ({asynchronous / synchronous - 1:+.1%})')
+
+
+
+if __name__ == '__main__':
+    main()
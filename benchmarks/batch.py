@@ -0,0 +1,89 @@
+# batch.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how long it takes to run a batch of small Grin programs, first by
+# starting a new project3.py process for each of them, one after another, and
+# then with grin.batch.run_batch using from one worker process up to one per
+# processor.
+#
+# Usage: python -m benchmarks.batch [PROGRAM_COUNT]
+
+from grin.batch import find_programs, run_batch
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+
+
+_PROJECT3 = pathlib.Path(__file__).parent.parent / 'project3.py'
+
+_PROGRAM = '''INNUM N
+LET TOTAL 0
+LET I 0
+LOOP: ADD TOTAL I
+ADD I 1
+GOTO "LOOP" IF I < N
+PRINT TOTAL
+'''
+
+
+
+def make_batch(directory: str, program_count: int) -> None:
+    """Writes program_count programs, each with its own input, into the given
+    directory."""
+    for n in range(program_count):
+        with open(os.path.join(directory, f'program{n:05}.grin'), 'w', encoding = 'utf-8') as file:
+            file.write(_PROGRAM)
+
+        with open(os.path.join(directory, f'program{n:05}.in'), 'w', encoding = 'utf-8') as file:
+            file.write(f'{1000 + n}\n')
+
+
+def run_subprocesses(directory: str) -> list[bytes]:
+    outputs = []
+
+    for program in find_programs(directory):
+        with open(program.program_path(), 'rb') as file:
+            source = file.read()
+
+        with open(program.input_path(), 'rb') as file:
+            input_text = file.read()
+
+        completed = subprocess.run(
+            [sys.executable, str(_PROJECT3)],
+            input = source + b'.\n' + input_text, capture_output = True, check = True)
+
+        outputs.append(completed.stdout)
+
+    return outputs
+
+
+def main() -> None:
+    program_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_batch(directory, program_count)
+        programs = find_programs(directory)
+
+        start = time.perf_counter()
+        run_subprocesses(directory)
+        sequential = time.perf_counter() - start
+
+        print(f'{program_count} programs, one project3.py process each: {sequential:8.3f} s')
+
+        for max_workers in range(1, (os.cpu_count() or 1) + 1):
+            start = time.perf_counter()
+            run_batch(programs, max_workers = max_workers)
+            elapsed = time.perf_counter() - start
+
+            print(f'run_batch with {max_workers:3} worker(s): {elapsed:8.3f} s  ({sequential / elapsed:5.1f}x)')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# caching.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how long it takes to load a large Grin program from a file with
+# grin.loading.load_file(), without the cache, when it's first cached, and
+# when it's loaded from the cache.
+#
+# Usage: python -m benchmarks.caching [LINE_COUNT]
+
+from benchmarks.lexing import make_lines
+from grin.loading import load_file
+import os
+import sys
+import tempfile
+import time
+
+
+
+def measure(path: str, cache: bool) -> float:
+    """Loads the program in the given file, returning the number of seconds
+    it took."""
+    start = time.perf_counter()
+    load_file(path, cache = cache)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.grin')
+
+        with open(path, 'w') as file:
+            file.writelines(f'{line}\n' for line in make_lines(line_count))
+
+        uncached = measure(path, cache = False)
+        first = measure(path, cache = True)
+        cached = measure(path, cache = True)
+
+    print(f'Loading a {line_count}-line program')
+    print(f'  without the cache: {uncached:8.3f} s')
+    print(f'  caching it:        {first:8.3f} s')
+    print(f'  from the cache:    {cached:8.3f} s')
+    print(f'  speed-up:          {uncached / cached:8.2f}x')
+
+
+
+if __name__ == '__main__':
+    main()
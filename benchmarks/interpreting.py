@@ -0,0 +1,106 @@
+# interpreting.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how many Grin statements per second each of the interpreter's
+# engines can execute, on a few small programs whose loops are typical of the
+# work Grin programs do: counting, accumulating, printing, and calling
+# subroutines.  The bytecode engine is measured both with and without its
+# superinstructions.
+#
+# Usage: python -m benchmarks.interpreting [ITERATION_COUNT]
+
+from grin.interpreter import interpret, ENGINES
+from grin.parsing import parse_statements
+import sys
+import time
+
+
+
+# Each workload is a program whose loop runs {n} times, along with a function
+# that returns how many statements it executes when it does.
+_WORKLOADS = {
+    'counter': (
+        [
+            'LET I 0',
+            'LOOP: ADD I 1',
+            'GOTO "LOOP" IF I < {n}',
+            'END'
+        ],
+        lambda n: 2 * n + 2
+    ),
+    'accumulate': (
+        [
+            'LET I 0',
+            'LET TOTAL 0',
+            'LOOP: ADD TOTAL I',
+            'MULT TOTAL 3',
+            'DIV TOTAL 4',
+            'ADD I 1',
+            'GOTO "LOOP" IF I < {n}',
+            'PRINT TOTAL'
+        ],
+        lambda n: 5 * n + 3
+    ),
+    'print': (
+        [
+            'LOOP: LET X I',
+            'PRINT X',
+            'ADD I 1',
+            'GOTO "LOOP" IF I < {n}'
+        ],
+        lambda n: 4 * n
+    ),
+    'gosub': (
+        [
+            'LET I 0',
+            'LOOP: GOSUB "BODY"',
+            'ADD I 1',
+            'GOTO "LOOP" IF I < {n}',
+            'END',
+            'BODY: ADD TOTAL I',
+            'SUB TOTAL 1',
+            'RETURN'
+        ],
+        lambda n: 6 * n + 2
+    )
+}
+
+
+
+# Each measurement is repeated, reporting the fastest, since timings of
+# short runs vary considerably.
+_REPETITIONS = 3
+
+# The engines being compared, along with whether they fuse instructions.
+_CONFIGURATIONS = [(engine, True) for engine in ENGINES] + [('bytecode', False)]
+
+
+
+def measure(workload: str, engine: str, iteration_count: int, fuse: bool = True) -> float:
+    """Runs a workload using an engine, returning the statements per second."""
+    template, statement_count = _WORKLOADS[workload]
+    statements = list(parse_statements(line.format(n = iteration_count) for line in template))
+
+    start = time.perf_counter()
+    interpret(statements, output_line = lambda line: None, engine = engine, fuse = fuse)
+
+    return statement_count(iteration_count) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(f'Interpreting {iteration_count} loop iterations')
+
+    for workload in _WORKLOADS:
+        for engine, fuse in _CONFIGURATIONS:
+            rate = max(measure(workload, engine, iteration_count, fuse) for _ in range(_REPETITIONS))
+            name = engine if fuse or engine != 'bytecode' else 'unfused'
+            print(f'  {workload + ":":12} {name + ":":12} {rate:14,.0f} statements/s')
+
+
+
+if __name__ == '__main__':
+    main()
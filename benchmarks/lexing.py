@@ -0,0 +1,81 @@
+# lexing.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how many lines per second the lexer can process, comparing the
+# pattern-based grin.lexing.to_tokens() against the original character-at-a-time
+# lexer that it replaced, and against lexing the whole program at once with
+# grin.lexing.to_program_tokens(), both from a string and directly from bytes
+# (as a program loaded by grin.run_file() is).
+#
+# Usage: python -m benchmarks.lexing [LINE_COUNT]
+
+from collections.abc import Callable, Iterable
+from grin.lexing import to_tokens, to_program_tokens, _to_tokens_by_character
+from grin.token import GrinToken
+import sys
+import time
+
+
+
+_STATEMENTS = [
+    'LET COUNTER{n} 0',
+    'LOOP{n}: ADD COUNTER{n} 1',
+    'PRINT "Iteration number {n} of the loop"',
+    'MULT TOTAL{n} 3.75',
+    'GOTO "LOOP{n}" IF COUNTER{n} < 1000',
+    'GOSUB -4 IF NAME{n} <> "Boo"',
+    'INNUM VALUE{n}',
+    'RETURN'
+]
+
+
+
+def make_lines(line_count: int) -> list[str]:
+    """Generates a representative mix of Grin statements."""
+    return [
+        _STATEMENTS[n % len(_STATEMENTS)].format(n = n)
+        for n in range(line_count)
+    ]
+
+
+def measure(
+        lexer: Callable[[str, int], Iterable[GrinToken]],
+        lines: list[str]) -> float:
+    """Lexes every line with the given lexer, keeping the tokens (as a parser
+    would), and returning the lines per second."""
+    start = time.perf_counter()
+    tokens = [list(lexer(line, line_number)) for line_number, line in enumerate(lines, start = 1)]
+    return len(lines) / (time.perf_counter() - start)
+
+
+def measure_program(lines: list[str], as_bytes: bool = False) -> float:
+    """Lexes all of the lines at once, returning the lines per second."""
+    text = ''.join(f'{line}\n' for line in lines)
+    source = text.encode(encoding = 'utf-8') if as_bytes else text
+    start = time.perf_counter()
+    to_program_tokens(source)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = make_lines(line_count)
+
+    before = measure(_to_tokens_by_character, lines)
+    after = measure(to_tokens, lines)
+    whole = measure_program(lines)
+    whole_bytes = measure_program(lines, as_bytes = True)
+
+    print(f'Lexing {line_count} lines')
+    print(f'  character-at-a-time: {before:12,.0f} lines/s')
+    print(f'  master pattern:      {after:12,.0f} lines/s')
+    print(f'  whole program:       {whole:12,.0f} lines/s')
+    print(f'  whole program bytes: {whole_bytes:12,.0f} lines/s')
+    print(f'  speed-up:            {after / before:12.2f}x (per line), {whole / before:.2f}x (whole program)')
+
+
+
+if __name__ == '__main__':
+    main()
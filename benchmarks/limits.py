@@ -0,0 +1,57 @@
+# limits.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures what it costs to run a program with a budget and a deadline,
+# compared to running it without either, on each of the interpreter's engines.
+# Both are checked only every LIMIT_CHECK_INTERVAL instructions, so the
+# difference should be no more than a few percent.
+#
+# Usage: python -m benchmarks.limits [ITERATION_COUNT]
+
+from grin.interpreter import interpret, ENGINES
+from grin.parsing import parse_statements
+import sys
+import time
+
+
+
+def best_time(run, repetitions: int = 5) -> float:
+    times = []
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    program = list(parse_statements([
+        'LET I 0',
+        'LET TOTAL 0',
+        'LOOP: ADD I 1',
+        'ADD TOTAL I',
+        'GOSUB "CHECK"',
+        f'GOTO "LOOP" IF I < {iteration_count}',
+        'END',
+        'CHECK: RETURN'
+    ]))
+
+    print(f'{iteration_count} loop iterations')
+
+    for engine in ENGINES:
+        unlimited = best_time(lambda: interpret(program, engine = engine))
+        limited = best_time(lambda: interpret(
+            program, engine = engine, budget = 10 * iteration_count,
+            deadline = time.monotonic() + 3600))
+
+        print(f'  {engine:12} unlimited: {unlimited:7.3f} s   limited: {limited:7.3f} s   ({limited / unlimited - 1:+.1%})')
+
+
+
+if __name__ == '__main__':
+    main()
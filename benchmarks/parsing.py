@@ -0,0 +1,80 @@
+# parsing.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how many lines per second grin.parse() can process, both when it's
+# given lines of text (which it lexes one at a time) and when it's given a
+# program that was lexed all at once by grin.to_program_tokens().  Lines of
+# text are parsed both with and without a GrinLineCache, on the usual mix of
+# lines (in which every line is different) and on a program in which the
+# same few lines are repeated, as they are in many generated programs.
+#
+# Usage: python -m benchmarks.parsing [LINE_COUNT]
+
+from benchmarks.lexing import make_lines
+from grin.lexing import to_program_tokens
+from grin.parsing import parse, GrinLineCache
+import sys
+import time
+
+
+
+_REPEATED_LINES = [
+    'LET I 0',
+    'ADD I 1',
+    'PRINT I',
+    'GOSUB 4 IF I < 10',
+    'RETURN',
+    'MULT TOTAL 2',
+    'GOTO -5'
+]
+
+
+
+def make_repeated_lines(line_count: int) -> list[str]:
+    """Generates a program in which the same few lines are repeated."""
+    return [_REPEATED_LINES[n % len(_REPEATED_LINES)] for n in range(line_count)]
+
+
+def measure_lines(lines: list[str], line_cache: GrinLineCache | None = None) -> float:
+    """Parses the given lines, returning the lines per second."""
+    start = time.perf_counter()
+
+    for _ in parse(lines, line_cache = line_cache):
+        pass
+
+    return len(lines) / (time.perf_counter() - start)
+
+
+def measure_lexed_program(lines: list[str]) -> float:
+    """Lexes the given lines all at once, then parses them, returning the lines
+    per second (including the lexing)."""
+    text = ''.join(f'{line}\n' for line in lines)
+    start = time.perf_counter()
+
+    for _ in parse(to_program_tokens(text)):
+        pass
+
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lines = make_lines(line_count)
+    repeated_lines = make_repeated_lines(line_count)
+
+    print(f'Parsing {line_count} lines')
+    print(f'  line by line:   {measure_lines(lines):12,.0f} lines/s')
+    print(f'    cached:       {measure_lines(lines, GrinLineCache()):12,.0f} lines/s')
+    print(f'  lexed program:  {measure_lexed_program(lines):12,.0f} lines/s')
+    print(f'  repeated lines: {measure_lines(repeated_lines):12,.0f} lines/s')
+
+    cache = GrinLineCache()
+    print(f'    cached:       {measure_lines(repeated_lines, cache):12,.0f} lines/s', end = '')
+    print(f' ({cache.hits():,} hits, {cache.misses():,} misses)')
+
+
+
+if __name__ == '__main__':
+    main()
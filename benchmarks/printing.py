@@ -0,0 +1,60 @@
+# printing.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how many lines per second a Grin program that does little other
+# than PRINT can write to a file, comparing a print() call per line against
+# the grin.interpreter.GrinOutputBuffer that's used by default.
+#
+# Usage: python -m benchmarks.printing [LINE_COUNT]
+
+from grin.interpreter import interpret
+from grin.parsing import parse_statements
+import contextlib
+import os
+import sys
+import time
+
+
+
+_PROGRAM = [
+    'LET I 0',
+    'LOOP: PRINT I',
+    'ADD I 1',
+    'GOTO "LOOP" IF I < {n}'
+]
+
+
+
+def measure(line_count: int, buffered: bool) -> float:
+    """Runs the program, writing its output to the null device, and returns
+    the number of lines it printed per second."""
+    statements = parse_statements([line.format(n = line_count) for line in _PROGRAM])
+
+    with open(os.devnull, 'w') as file, contextlib.redirect_stdout(file):
+        start = time.perf_counter()
+
+        if buffered:
+            interpret(statements)
+        else:
+            interpret(statements, output_line = print)
+
+        return line_count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    unbuffered = measure(line_count, buffered = False)
+    buffered = measure(line_count, buffered = True)
+
+    print(f'Printing {line_count} lines')
+    print(f'  print() per line: {unbuffered:12,.0f} lines/s')
+    print(f'  GrinOutputBuffer: {buffered:12,.0f} lines/s')
+    print(f'  speed-up:         {buffered / unbuffered:12.2f}x')
+
+
+
+if __name__ == '__main__':
+    main()
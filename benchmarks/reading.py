@@ -0,0 +1,103 @@
+# reading.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how quickly a large Grin program can be read from the standard
+# input, comparing the one-line-at-a-time input() loop that project3.py used
+# to use against grin.reading.GrinInputReader, and then how long project3.py
+# takes to read, parse, and run the same program when it's piped into it.
+#
+# Usage: python -m benchmarks.reading [LINE_COUNT]
+
+from grin.reading import GrinInputReader
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+
+
+_PROJECT3 = pathlib.Path(__file__).parent.parent / 'project3.py'
+
+
+
+def make_program(line_count: int) -> bytes:
+    """Generates a program of the given number of lines, followed by the "."
+    that ends it and a line of input."""
+    lines = [f'LET X{n % 100} {n}' for n in range(line_count - 2)]
+    lines.extend(['INSTR NAME', 'PRINT NAME', '.', 'Boo'])
+    return ''.join(f'{line}\n' for line in lines).encode(encoding = 'utf-8')
+
+
+def read_with_input() -> list[str]:
+    lines = []
+
+    while True:
+        line = input()
+
+        if line == '.':
+            break
+
+        lines.append(line)
+
+    return lines
+
+
+def read_with_reader() -> bytes:
+    return GrinInputReader(sys.stdin.buffer).read_program()
+
+
+def measure_reading(read, path: str) -> float:
+    """Reads the program in the given file with the given function, with the
+    file as the standard input, returning the number of seconds it took."""
+    original_stdin = sys.stdin
+
+    with open(path, 'rb') as file:
+        sys.stdin = io.TextIOWrapper(file, encoding = 'utf-8')
+
+        try:
+            start = time.perf_counter()
+            read()
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdin = original_stdin
+
+    return elapsed
+
+
+def measure_project3(path: str) -> float:
+    """Runs project3.py with the given file as its standard input, returning
+    the number of seconds it took."""
+    with open(path, 'rb') as file:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(_PROJECT3)], stdin = file, stdout = subprocess.DEVNULL, check = True)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.NamedTemporaryFile(suffix = '.grin', delete = False) as file:
+        file.write(make_program(line_count))
+
+    try:
+        by_input = measure_reading(read_with_input, file.name)
+        by_reader = measure_reading(read_with_reader, file.name)
+        whole = measure_project3(file.name)
+    finally:
+        os.remove(file.name)
+
+    print(f'Reading a {line_count}-line program from the standard input')
+    print(f'  input() per line:  {by_input:8.3f} s ({line_count / by_input:12,.0f} lines/s)')
+    print(f'  GrinInputReader:   {by_reader:8.3f} s ({line_count / by_reader:12,.0f} lines/s)')
+    print(f'  speed-up:          {by_input / by_reader:8.2f}x')
+    print(f'  project3.py total: {whole:8.3f} s')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# server.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how many small Grin programs per second can be run by starting a
+# new project3.py process for each of them, compared to sending them to a
+# grin.server, either from a new grin.client process for each of them or by
+# connecting to the server directly, without starting any processes.
+#
+# Usage: python -m benchmarks.server [REQUEST_COUNT]
+
+from grin.client import run_client
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+
+
+_PROJECT3 = pathlib.Path(__file__).parent.parent / 'project3.py'
+
+_PROGRAM = b'INNUM N\nLET TOTAL 0\nLOOP: ADD TOTAL N\nSUB N 1\nGOTO "LOOP" IF N > 0\nPRINT TOTAL\n.\n100\n'
+
+
+
+def requests_per_second(run_request, request_count: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(request_count):
+        run_request()
+
+    return request_count / (time.perf_counter() - start)
+
+
+def start_server(socket_path: str) -> subprocess.Popen:
+    server = subprocess.Popen([sys.executable, '-m', 'grin.server', '--socket', socket_path])
+
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+
+    return server
+
+
+def main() -> None:
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, 'grin.sock')
+        server = start_server(socket_path)
+
+        try:
+            cold = requests_per_second(
+                lambda: subprocess.run(
+                    [sys.executable, str(_PROJECT3)], input = _PROGRAM,
+                    stdout = subprocess.DEVNULL, check = True),
+                request_count)
+
+            client = requests_per_second(
+                lambda: subprocess.run(
+                    [sys.executable, '-m', 'grin.client', '--socket', socket_path], input = _PROGRAM,
+                    stdout = subprocess.DEVNULL, check = True),
+                request_count)
+
+            connected = requests_per_second(
+                lambda: run_client(socket_path, io.BytesIO(_PROGRAM), io.BytesIO()),
+                request_count)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f'{request_count} requests')
+    print(f'  project3.py process per request:   {cold:9.1f} requests/s')
+    print(f'  grin.client process per request:   {client:9.1f} requests/s  ({client / cold:5.1f}x)')
+    print(f'  connecting to grin.server directly: {connected:9.1f} requests/s  ({connected / cold:5.1f}x)')
+
+
+
+if __name__ == '__main__':
+    main()
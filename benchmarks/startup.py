@@ -0,0 +1,83 @@
+# startup.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures how long it takes to start a new Python process that runs a
+# one-line Grin program with project3.py, compared to starting Python and
+# doing nothing, and to starting Python and importing every module in the
+# 'grin' package (as "import grin" used to).  Then it runs project3.py once
+# with "python -X importtime", and lists the modules that took the longest
+# to import.
+#
+# Usage: python -m benchmarks.startup [RUN_COUNT]
+
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+
+
+_PROJECT3 = pathlib.Path(__file__).parent.parent / 'project3.py'
+
+_IMPORT_EVERYTHING = 'import grin; [getattr(grin, name) for name in grin.__all__]'
+
+_PROGRAM = b'PRINT "Boo"\n.\n'
+
+
+
+def measure(arguments: list[str], run_count: int) -> float:
+    """Runs Python with the given arguments run_count times, giving it the
+    one-line program as its standard input, and returns the median number of
+    seconds each run took."""
+    times = []
+
+    for _ in range(run_count):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], input = _PROGRAM, stdout = subprocess.DEVNULL, check = True)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def slowest_imports(count: int) -> list[tuple[int, str]]:
+    """Runs project3.py with -X importtime, returning the modules whose imports
+    took the longest (including the modules they imported), in microseconds."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(_PROJECT3)],
+        input = _PROGRAM, capture_output = True, check = True)
+
+    imports = []
+
+    for line in completed.stderr.decode().splitlines():
+        fields = line.removeprefix('import time:').split('|')
+
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            imports.append((int(fields[1]), fields[2].strip()))
+
+    return sorted(imports, reverse = True)[:count]
+
+
+def main() -> None:
+    run_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    baseline = measure(['-c', 'pass'], run_count)
+    everything = measure(['-c', _IMPORT_EVERYTHING], run_count)
+    project3 = measure([str(_PROJECT3)], run_count)
+
+    print(f'Median of {run_count} runs')
+    print(f'  python -c pass:            {baseline * 1000:8.1f} ms')
+    print(f'  importing all of grin:     {everything * 1000:8.1f} ms')
+    print(f'  project3.py, one line:     {project3 * 1000:8.1f} ms')
+    print()
+    print('Slowest imports when running project3.py (cumulative)')
+
+    for microseconds, module in slowest_imports(10):
+        print(f'  {microseconds / 1000:8.1f} ms  {module}')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# suite.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Runs every workload in benchmarks.workloads, measuring how long it takes to
+# lex, parse, and execute each of them separately, and optionally saves the
+# results as JSON, or compares them to results saved earlier (the baseline),
+# reporting every time that's slower than the baseline's by more than the
+# threshold (a fraction, so 0.1 is 10%) as a regression.
+#
+# Each phase is repeated, and its fastest time is reported, since timings of
+# short runs vary considerably.  Times too short to be measured reliably are
+# never reported as regressions.
+#
+# When comparing to a baseline, the exit status is 1 if there were any
+# regressions, so that the suite can be used as a check.
+#
+# Usage: python -m benchmarks.suite [--engine ENGINE] [--scale N]
+#            [--repetitions N] [--save PATH] [--baseline PATH] [--threshold T]
+#            [WORKLOAD ...]
+
+from benchmarks.workloads import WORKLOADS
+from grin.interpreter import interpret, load_statements, ENGINES
+from grin.lexing import to_program_tokens
+from grin.parsing import parse_statements
+import json
+import platform
+import sys
+import time
+
+
+
+DEFAULT_REPETITIONS = 5
+
+DEFAULT_THRESHOLD = 0.1
+
+PHASES = ('lexing', 'parsing', 'execution')
+
+# Times shorter than this, in seconds, are too short to compare.
+_MINIMUM_COMPARABLE_TIME = 0.002
+
+
+
+def measure(source: str, *, engine: str, repetitions: int) -> dict[str, float]:
+    """Lexes, parses, and executes the given program repetitions times,
+    returning the fastest time for each phase, in seconds."""
+    times = {phase: [] for phase in PHASES}
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        lexed = to_program_tokens(source)
+        lexed_at = time.perf_counter()
+        statements = load_statements(parse_statements(lexed))
+        parsed_at = time.perf_counter()
+        interpret(statements, output_line = _discard, engine = engine)
+        executed_at = time.perf_counter()
+
+        times['lexing'].append(lexed_at - start)
+        times['parsing'].append(parsed_at - lexed_at)
+        times['execution'].append(executed_at - parsed_at)
+
+    return {phase: min(phase_times) for phase, phase_times in times.items()}
+
+
+def run_suite(
+        workload_names: list[str], *,
+        engine: str = 'closures', scale: int = 1,
+        repetitions: int = DEFAULT_REPETITIONS) -> dict:
+    """Measures each of the named workloads, returning the results, along with
+    a description of how they were measured, in a form that can be saved as
+    JSON."""
+    return {
+        'python': platform.python_version(),
+        'engine': engine,
+        'scale': scale,
+        'repetitions': repetitions,
+        'workloads': {
+            name: measure(WORKLOADS[name](scale), engine = engine, repetitions = repetitions)
+            for name in workload_names
+        }
+    }
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[tuple[str, str, float]]:
+    """Compares results to a baseline, returning the workload, phase, and ratio
+    of the current time to the baseline's for each time that's slower than
+    the baseline's by more than threshold."""
+    regressions = []
+
+    for name, times in results['workloads'].items():
+        baseline_times = baseline['workloads'].get(name, {})
+
+        for phase, seconds in times.items():
+            baseline_seconds = baseline_times.get(phase)
+
+            if baseline_seconds is None or max(seconds, baseline_seconds) < _MINIMUM_COMPARABLE_TIME:
+                continue
+
+            ratio = seconds / baseline_seconds
+
+            if ratio > 1 + threshold:
+                regressions.append((name, phase, ratio))
+
+    return regressions
+
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    print(f'Python {results["python"]}, {results["engine"]} engine, scale {results["scale"]}, '
+          f'fastest of {results["repetitions"]} runs')
+    print(f'  {"workload":16}' + ''.join(f'{phase:>12}{"":10}' for phase in PHASES))
+
+    for name, times in results['workloads'].items():
+        columns = []
+
+        for phase in PHASES:
+            column = f'{times[phase] * 1000:9.1f} ms'
+            baseline_seconds = baseline['workloads'].get(name, {}).get(phase) if baseline else None
+
+            if baseline_seconds:
+                column += f' ({times[phase] / baseline_seconds - 1:+6.1%})'
+            else:
+                column += ' ' * 10
+
+            columns.append(column)
+
+        print(f'  {name:16}' + ''.join(columns))
+
+
+def _discard(line: str) -> None:
+    pass
+
+
+def main() -> None:
+    options = {
+        '--engine': 'closures', '--scale': '1', '--repetitions': str(DEFAULT_REPETITIONS),
+        '--save': None, '--baseline': None, '--threshold': str(DEFAULT_THRESHOLD)
+    }
+    arguments = sys.argv[1:]
+    workload_names = []
+
+    while arguments:
+        if arguments[0] in options and len(arguments) >= 2:
+            options[arguments[0]] = arguments[1]
+            del arguments[:2]
+        elif arguments[0] in WORKLOADS:
+            workload_names.append(arguments.pop(0))
+        else:
+            print(f'Unknown argument: {arguments[0]}')
+            print(f'Workloads: {", ".join(WORKLOADS)}; engines: {", ".join(ENGINES)}')
+            sys.exit(2)
+
+    baseline = None
+
+    if options['--baseline'] is not None:
+        with open(options['--baseline'], encoding = 'utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_suite(
+        workload_names or list(WORKLOADS), engine = options['--engine'],
+        scale = int(options['--scale']), repetitions = int(options['--repetitions']))
+
+    print_results(results, baseline)
+
+    if baseline is not None and (baseline['engine'], baseline['scale']) != (results['engine'], results['scale']):
+        print(f'Warning: the baseline was measured with the {baseline["engine"]} engine at scale {baseline["scale"]}')
+
+    if options['--save'] is not None:
+        with open(options['--save'], 'w', encoding = 'utf-8') as results_file:
+            json.dump(results, results_file, indent = 4)
+
+    if baseline is not None:
+        threshold = float(options['--threshold'])
+        regressions = find_regressions(results, baseline, threshold)
+
+        print()
+
+        if regressions:
+            print(f'Regressions (slower than the baseline by more than {threshold:.0%})')
+
+            for name, phase, ratio in regressions:
+                print(f'  {name} {phase}: {ratio:.2f}x the baseline')
+
+            sys.exit(1)
+        else:
+            print(f'No regressions (slower than the baseline by more than {threshold:.0%})')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# tokens.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Measures the memory used by, and the time taken to create, compare, and hash,
+# the tokens of a large program, comparing the slotted, interned GrinToken and
+# GrinLocation against the plain classes they replaced (reproduced below) and
+# against storing the same tokens in a TokenBuffer.
+#
+# Usage: python -m benchmarks.tokens [LINE_COUNT]
+
+from benchmarks.lexing import make_lines
+from grin.lexing import to_tokens, to_program_tokens
+from grin.location import GrinLocation
+from grin.token import GrinToken
+import gc
+import sys
+import time
+import tracemalloc
+
+
+
+class _PlainLocation:
+    def __init__(self, line, column):
+        if int(line) < 1:
+            raise ValueError(f'Line in location cannot be non-positive, was {line}')
+
+        if int(column) < 1:
+            raise ValueError(f'Column in location cannot be non-positive, was {column}')
+
+        self._line = line
+        self._column = column
+
+
+    def __eq__(self, other):
+        return isinstance(other, _PlainLocation) \
+                and self._line == other._line \
+                and self._column == other._column
+
+
+
+class _PlainToken:
+    def __init__(self, *, kind, text, location, value = None):
+        self._kind = kind
+        self._text = text
+        self._location = location
+        self._value = value
+
+
+    def __eq__(self, other):
+        return isinstance(other, _PlainToken) \
+                and self._kind == other._kind \
+                and self._text == other._text \
+                and self._location == other._location \
+                and self._value == other._value
+
+
+
+def _make_plain_tokens(lines: list[str]) -> list[_PlainToken]:
+    # Like the original lexer, give every token its own copy of its text.
+    return [
+        _PlainToken(
+            kind = token.kind(), text = line[token.location().column() - 1:][:len(token.text())],
+            location = _PlainLocation(line_number, token.location().column()),
+            value = token.value())
+        for line_number, line in enumerate(lines, start = 1)
+        for token in to_tokens(line, line_number)
+    ]
+
+
+def _make_tokens(lines: list[str]) -> list[GrinToken]:
+    return [
+        token
+        for line_number, line in enumerate(lines, start = 1)
+        for token in to_tokens(line, line_number)
+    ]
+
+
+def _measure_memory(make, *args) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = make(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def _measure_time(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _compare_all(tokens: list) -> None:
+    for first, second in zip(tokens, tokens[1:]):
+        first == second
+        first == first
+
+
+def _build_locations(location_type: type, line_count: int) -> list:
+    return [
+        location_type(line_number, column)
+        for line_number in range(1, line_count + 1)
+        for column in (1, 5, 9, 13)
+    ]
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lines = make_lines(line_count)
+    text = ''.join(f'{line}\n' for line in lines)
+
+    # Four locations per line, staying within what the interning cache holds.
+    location_lines = 16_000
+
+    print('Creating locations (first and second time)')
+    print(f'  plain classes:   {_measure_time(_build_locations, _PlainLocation, location_lines):8.3f} s')
+    print(f'  slotted classes: {_measure_time(_build_locations, GrinLocation, location_lines):8.3f} s', end = '')
+    print(f', {_measure_time(_build_locations, GrinLocation, location_lines):.3f} s')
+
+    plain_tokens, plain_size = _measure_memory(_make_plain_tokens, lines)
+    tokens, size = _measure_memory(_make_tokens, lines)
+    _, buffer_size = _measure_memory(to_program_tokens, text)
+
+    print(f'{len(tokens)} tokens on {line_count} lines')
+    print('Memory')
+    print(f'  plain classes:   {plain_size / 2 ** 20:8.1f} MiB')
+    print(f'  slotted classes: {size / 2 ** 20:8.1f} MiB')
+    print(f'  TokenBuffer:     {buffer_size / 2 ** 20:8.1f} MiB')
+
+    print('Comparing tokens')
+    print(f'  plain classes:   {_measure_time(_compare_all, plain_tokens):8.3f} s')
+    print(f'  slotted classes: {_measure_time(_compare_all, tokens):8.3f} s')
+
+    print('Hashing tokens (first and second time)')
+    print(f'  slotted classes: {_measure_time(set, tokens):8.3f} s, {_measure_time(set, tokens):.3f} s')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# workloads.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Generated Grin programs that are representative of the work Grin programs
+# do, each stressing a different part of the 'grin' package, for use by
+# benchmarks.suite.  Each workload is a function that, given a scale (where 1
+# is a program that runs for a few tenths of a second), returns the text of
+# the program, which reads no input.
+
+
+
+def arithmetic(scale: int) -> str:
+    """A tight loop of arithmetic on integers and floats."""
+    return _program(
+        'LET I 0',
+        'LET TOTAL 0',
+        'LET AVERAGE 0.0',
+        'LOOP: ADD I 1',
+        'ADD TOTAL I',
+        'MULT TOTAL 3',
+        'DIV TOTAL 4',
+        'LET AVERAGE TOTAL',
+        'DIV AVERAGE 2.5',
+        'SUB AVERAGE 1',
+        f'GOTO "LOOP" IF I < {50000 * scale}',
+        'PRINT TOTAL',
+        'PRINT AVERAGE')
+
+
+def recursion(scale: int) -> str:
+    """A subroutine that calls itself, hundreds of calls deep, over and over."""
+    return _program(
+        'LET ROUND 0',
+        'LOOP: LET DEPTH 0',
+        'GOSUB "DESCEND"',
+        'ADD ROUND 1',
+        f'GOTO "LOOP" IF ROUND < {1000 * scale}',
+        'PRINT DEPTH',
+        'END',
+        'DESCEND: ADD DEPTH 1',
+        'GOTO "BOTTOM" IF DEPTH >= 500',
+        'GOSUB "DESCEND"',
+        'BOTTOM: RETURN')
+
+
+def jump_table(scale: int) -> str:
+    """A loop that computes an index, then jumps through a table of jumps to
+    labels, with one label for each of a hundred cases."""
+    case_count = 100
+    lines = [
+        'LET I 0',
+        'LET X 0',
+        'LOOP: LET CASE I',
+        f'DIV CASE {case_count}',
+        f'MULT CASE {case_count}',
+        'MULT CASE -1',
+        'ADD CASE I',
+        'ADD CASE 1',
+        'GOTO CASE',
+        *(f'GOTO "CASE{n}"' for n in range(case_count)),
+    ]
+
+    for n in range(case_count):
+        lines.extend([f'CASE{n}: ADD X {n}', 'GOTO "NEXT"'])
+
+    lines.extend([
+        'NEXT: ADD I 1',
+        f'GOTO "LOOP" IF I < {40000 * scale}',
+        'PRINT X'
+    ])
+
+    return _program(*lines)
+
+
+def strings(scale: int) -> str:
+    """A loop that builds strings by concatenation and compares them."""
+    return _program(
+        'LET I 0',
+        'LET COUNT 0',
+        'START: LET S ""',
+        'LET J 0',
+        'LOOP: ADD S "ab"',
+        'ADD S "c"',
+        'ADD J 1',
+        'GOTO "LOOP" IF J < 100',
+        'GOTO "SKIP" IF S < "abcab"',
+        'ADD COUNT 1',
+        'SKIP: ADD I 1',
+        f'GOTO "START" IF I < {2000 * scale}',
+        'PRINT S',
+        'PRINT COUNT')
+
+
+def printing(scale: int) -> str:
+    """A loop that does little but print."""
+    return _program(
+        'LET I 0',
+        'LET NAME "Boo"',
+        'LOOP: PRINT I',
+        'PRINT NAME',
+        'PRINT 3.75',
+        'ADD I 1',
+        f'GOTO "LOOP" IF I < {50000 * scale}')
+
+
+def straight_line(scale: int) -> str:
+    """A long program without loops, whose time goes mostly to lexing and
+    parsing it, since each statement executes once."""
+    lines = []
+
+    for n in range(20000 * scale):
+        variable = f'V{n % 200}'
+        lines.append([
+            f'LET {variable} {n}',
+            f'ADD {variable} 1.5',
+            f'L{n}: SUB {variable} V{(n + 1) % 200}',
+            f'LET NAME{n % 50} "Boo {n}"',
+            f'GOTO 2 IF {variable} > 1000000',
+            f'MULT {variable} 2'
+        ][n % 6])
+
+    lines.append('PRINT V0')
+    return _program(*lines)
+
+
+def _program(*lines: str) -> str:
+    return ''.join(f'{line}\n' for line in lines) + '.\n'
+
+
+
+# Every workload, by name.
+WORKLOADS = {
+    workload.__name__: workload
+    for workload in [arithmetic, recursion, jump_table, strings, printing, straight_line]
+}
+
+
+
+__all__ = [
+    'WORKLOADS',
+    arithmetic.__name__,
+    jump_table.__name__,
+    printing.__name__,
+    recursion.__name__,
+    straight_line.__name__,
+    strings.__name__
+]
@@ -3,18 +3,90 @@
 # ICS 33 Spring 2024
 # Project 3: Why Not Smile?
 #
-# Initializes the 'grin' package, by importing every publicly visible name
-# from each of its submodules.  That way, "import grin" will provide all
-# of those names -- so, for example, the parse() function in the grin.parsing
-# module becomes grin.parse().
+# Initializes the 'grin' package, making every publicly visible name from each
+# of its submodules available from the package itself.  That way, "import grin"
+# will provide all of those names -- so, for example, the parse() function in
+# the grin.parsing module becomes grin.parse().
+#
+# The submodules aren't imported until one of their names is first used, so
+# that "import grin" is quick, and a program that only needs a few of them
+# (such as project3.py running a short Grin program) never pays for importing
+# the rest.
 #
 # WHAT YOU NEED TO DO: As you add more modules in the 'grin' package, you'll
 # need to add them here.  Each of those modules should define a global value
 # __all__, as the provided modules do, specifying only their "exports" (i.e.,
 # the names that should become visible to a module that imports the 'grin'
-# package).
+# package), and those same names should be listed below.
+
+import importlib
+
+
+
+_EXPORTS_BY_MODULE = {
+    'ast': [
+        'Constant', 'Variable', 'JumpCondition', 'GrinStatement', 'VariableUpdateStatement',
+        'LetStatement', 'AddStatement', 'SubStatement', 'MultStatement', 'DivStatement',
+        'PrintStatement', 'InputStatement', 'InNumStatement', 'InStrStatement',
+        'JumpStatement', 'GotoStatement', 'GosubStatement', 'ReturnStatement', 'EndStatement'
+    ],
+    'asynchronous': ['DEFAULT_SLICE_SIZE', 'run_async'],
+    'batch': ['find_programs', 'run_batch', 'run_program', 'GrinBatchProgram', 'GrinBatchResult'],
+    'bytecode': ['compile_bytecode', 'fuse_instructions', 'GrinBytecode', 'GrinOpcode'],
+    'bytecode_engine': [],
+    'caching': ['CACHE_DIRECTORY_NAME', 'GRIN_VERSION', 'GrinProgramCache'],
+    'client': ['default_socket_path', 'run_client'],
+    'interpreter': [
+        'DEFAULT_OUTPUT_BUFFER_SIZE', 'ENGINES', 'LIMIT_CHECK_INTERVAL',
+        'interpret', 'GrinOutputBuffer', 'load_statements'
+    ],
+    'lexing': ['KEYWORDS', 'to_tokens', 'to_program_tokens', 'GrinLexedProgram', 'GrinLexError'],
+    'loading': ['load_file', 'load_source', 'run_file'],
+    'location': ['GrinLocation'],
+    'optimizing': ['optimize', 'GrinOptimizedProgram'],
+    'parsing': [
+        'DEFAULT_LINE_CACHE_SIZE', 'parse', 'parse_statements', 'shared_line_cache',
+        'to_statement', 'GrinLineCache', 'GrinParseError'
+    ],
+    'profiling': ['GrinProfile'],
+    'reading': ['DEFAULT_CHUNK_SIZE', 'GrinInputReader'],
+    'resolution': ['resolve', 'GrinResolvedProgram'],
+    'runtime': ['GrinLimitError', 'GrinRuntimeError'],
+    'server': ['DEFAULT_TIMEOUT', 'serve_request', 'GrinServer'],
+    'streaming': ['DEFAULT_WINDOW_SIZE', 'interpret_stream', 'GrinProgramWindow'],
+    'token': [
+        'CATEGORY_MASKS', 'COMPARISON_OPERATOR_MASK', 'JUMP_TARGET_MASK', 'KIND_BITS',
+        'KINDS_BY_INDEX', 'VALUE_MASK', 'kinds_mask',
+        'GrinToken', 'GrinTokenCategory', 'GrinTokenKind', 'TokenBuffer'
+    ]
+}
+
+
+_MODULES_BY_EXPORT = {
+    name: module_name
+    for module_name, names in _EXPORTS_BY_MODULE.items()
+    for name in names
+}
+
+
+
+def __getattr__(name: str) -> object:
+    if name in _MODULES_BY_EXPORT:
+        value = getattr(importlib.import_module(f'grin.{_MODULES_BY_EXPORT[name]}'), name)
+    elif name in _EXPORTS_BY_MODULE:
+        value = importlib.import_module(f'grin.{name}')
+    else:
+        raise AttributeError(f"module 'grin' has no attribute {name!r}")
+
+    # Once a name has been looked up, it's stored in the package, so that it's
+    # found without calling __getattr__ again.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_MODULES_BY_EXPORT})
+
+
 
-from grin.lexing import *
-from grin.location import *
-from grin.parsing import *
-from grin.token import *
+__all__ = list(_MODULES_BY_EXPORT)
@@ -0,0 +1,313 @@
+# ast.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Classes that describe the statements in a Grin program after they've been
+# parsed, so that the work of classifying a statement (what kind it is, which
+# of its operands are constants and which are variables, whether it has a
+# label or a condition) is done once, rather than every time it executes.
+#
+# * GrinStatement, the base of all of the kinds of statements, each of which
+#   knows its line number and its label (if any).
+# * Constant and Variable, which describe a statement's operands.
+# * JumpCondition, which describes the condition on a GOTO or GOSUB.
+
+from grin.token import GrinTokenKind
+
+
+
+class _GrinNode:
+    """The base of the classes in this module, whose objects are immutable and
+    compare equal when they're of the same type and their fields are of the
+    same types and are equal.  Fields that are floats are compared by their
+    reprs, so that 0.0 and -0.0, which print differently, aren't equal."""
+
+    __slots__ = ()
+
+
+    def _fields(self) -> tuple:
+        return tuple(_field_key(getattr(self, name)) for name in _all_slots(type(self)))
+
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._fields() == other._fields()
+
+
+    def __hash__(self):
+        return hash((type(self), self._fields()))
+
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{name[1:]} = {getattr(self, name)!r}'
+            for name in _all_slots(type(self)))
+
+        return f'{type(self).__name__}({fields})'
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __reduce__(self):
+        return _make_node, (type(self), {name[1:]: getattr(self, name) for name in _all_slots(type(self))})
+
+
+
+def _field_key(value: object) -> tuple[type, object]:
+    # Includes the type of a field's value, so that 1 and 1.0 aren't equal.
+    return type(value), repr(value) if type(value) is float else value
+
+
+def _all_slots(node_type: type) -> tuple[str, ...]:
+    return tuple(
+        name
+        for cls in reversed(node_type.__mro__)
+        for name in cls.__dict__.get('__slots__', ()))
+
+
+def _make_node(node_type: type, fields: dict) -> _GrinNode:
+    return node_type(**fields)
+
+
+_set_attribute = object.__setattr__
+
+
+
+class Constant(_GrinNode):
+    """An operand whose value is a literal integer, float, or string."""
+
+    __slots__ = ('_value',)
+
+
+    def __init__(self, value: int | float | str):
+        _set_attribute(self, '_value', value)
+
+
+    def value(self) -> int | float | str:
+        return self._value
+
+
+
+class Variable(_GrinNode):
+    """An operand that refers to a variable by its name."""
+
+    __slots__ = ('_name',)
+
+
+    def __init__(self, name: str):
+        _set_attribute(self, '_name', name)
+
+
+    def name(self) -> str:
+        return self._name
+
+
+
+class JumpCondition(_GrinNode):
+    """The condition on a GOTO or GOSUB statement, which compares two operands
+    using one of the comparison operators."""
+
+    __slots__ = ('_left', '_operator', '_right')
+
+
+    def __init__(self, *, left: Constant | Variable, operator: GrinTokenKind, right: Constant | Variable):
+        _set_attribute(self, '_left', left)
+        _set_attribute(self, '_operator', operator)
+        _set_attribute(self, '_right', right)
+
+
+    def left(self) -> Constant | Variable:
+        return self._left
+
+
+    def operator(self) -> GrinTokenKind:
+        """The kind of token of the comparison operator (e.g., LESS_THAN)."""
+        return self._operator
+
+
+    def right(self) -> Constant | Variable:
+        return self._right
+
+
+
+class GrinStatement(_GrinNode):
+    """A single statement in a Grin program, along with the number of the line
+    on which it appeared and its label, if it had one."""
+
+    __slots__ = ('_line', '_label')
+
+
+    def __init__(self, *, line: int, label: str | None = None):
+        _set_attribute(self, '_line', line)
+        _set_attribute(self, '_label', label)
+
+
+    def line(self) -> int:
+        return self._line
+
+
+    def label(self) -> str | None:
+        return self._label
+
+
+
+class VariableUpdateStatement(GrinStatement):
+    """The base of the statements that update a variable using a value."""
+
+    __slots__ = ('_target', '_value')
+
+
+    def __init__(self, *, line: int, label: str | None = None, target: str, value: Constant | Variable):
+        super().__init__(line = line, label = label)
+        _set_attribute(self, '_target', target)
+        _set_attribute(self, '_value', value)
+
+
+    def target(self) -> str:
+        """The name of the variable being updated."""
+        return self._target
+
+
+    def value(self) -> Constant | Variable:
+        return self._value
+
+
+
+class LetStatement(VariableUpdateStatement):
+    __slots__ = ()
+
+
+
+class AddStatement(VariableUpdateStatement):
+    __slots__ = ()
+
+
+
+class SubStatement(VariableUpdateStatement):
+    __slots__ = ()
+
+
+
+class MultStatement(VariableUpdateStatement):
+    __slots__ = ()
+
+
+
+class DivStatement(VariableUpdateStatement):
+    __slots__ = ()
+
+
+
+class PrintStatement(GrinStatement):
+    __slots__ = ('_value',)
+
+
+    def __init__(self, *, line: int, label: str | None = None, value: Constant | Variable):
+        super().__init__(line = line, label = label)
+        _set_attribute(self, '_value', value)
+
+
+    def value(self) -> Constant | Variable:
+        return self._value
+
+
+
+class InputStatement(GrinStatement):
+    """The base of the statements that read a line of input into a variable."""
+
+    __slots__ = ('_target',)
+
+
+    def __init__(self, *, line: int, label: str | None = None, target: str):
+        super().__init__(line = line, label = label)
+        _set_attribute(self, '_target', target)
+
+
+    def target(self) -> str:
+        """The name of the variable into which input is read."""
+        return self._target
+
+
+
+class InNumStatement(InputStatement):
+    __slots__ = ()
+
+
+
+class InStrStatement(InputStatement):
+    __slots__ = ()
+
+
+
+class JumpStatement(GrinStatement):
+    """The base of the statements that jump to another line, either always or
+    only when a condition is met.  The target is either an integer (a relative
+    line number), a string (a label), or a variable containing one of those."""
+
+    __slots__ = ('_target', '_condition')
+
+
+    def __init__(
+            self, *, line: int, label: str | None = None,
+            target: Constant | Variable, condition: JumpCondition | None = None):
+        super().__init__(line = line, label = label)
+        _set_attribute(self, '_target', target)
+        _set_attribute(self, '_condition', condition)
+
+
+    def target(self) -> Constant | Variable:
+        return self._target
+
+
+    def condition(self) -> JumpCondition | None:
+        return self._condition
+
+
+
+class GotoStatement(JumpStatement):
+    __slots__ = ()
+
+
+
+class GosubStatement(JumpStatement):
+    __slots__ = ()
+
+
+
+class ReturnStatement(GrinStatement):
+    __slots__ = ()
+
+
+
+class EndStatement(GrinStatement):
+    __slots__ = ()
+
+
+
+__all__ = [
+    Constant.__name__,
+    Variable.__name__,
+    JumpCondition.__name__,
+    GrinStatement.__name__,
+    VariableUpdateStatement.__name__,
+    LetStatement.__name__,
+    AddStatement.__name__,
+    SubStatement.__name__,
+    MultStatement.__name__,
+    DivStatement.__name__,
+    PrintStatement.__name__,
+    InputStatement.__name__,
+    InNumStatement.__name__,
+    InStrStatement.__name__,
+    JumpStatement.__name__,
+    GotoStatement.__name__,
+    GosubStatement.__name__,
+    ReturnStatement.__name__,
+    EndStatement.__name__
+]
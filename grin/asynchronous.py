@@ -0,0 +1,100 @@
+# asynchronous.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Runs Grin programs as asyncio tasks, so that one process can run many of
+# them at once -- e.g., one per connection to an asyncio server -- reading
+# their input from, and writing their output to, asyncio streams.
+#
+# A program runs on the same engines that grin.interpreter.interpret() uses,
+# but its engine pauses whenever the program needs a line of input that hasn't
+# arrived yet, and after every slice_size statements, giving the event loop a
+# chance to run the other tasks.  Otherwise, programs behave as they do when
+# run by interpret().
+
+from collections.abc import Iterable
+from grin.ast import GrinStatement
+from grin.interpreter import _check_limits, _make_engine, _prepare, _InputPending, ENGINES
+import asyncio
+
+
+
+DEFAULT_SLICE_SIZE = 1024
+
+
+
+async def run_async(
+        program: Iterable[GrinStatement | list],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        *,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+        strict: bool = False,
+        engine: str = 'closures',
+        fuse: bool = True,
+        optimize: bool = False,
+        budget: int | None = None,
+        deadline: float | None = None) -> None:
+    """Runs a Grin program, given as it would be given to interpret(), as an
+    asyncio task.  INNUM and INSTR statements read lines (encoded as UTF-8)
+    from reader, and PRINT statements write lines to writer, which is drained
+    whenever the program pauses.  The program pauses to let other tasks run
+    after every slice_size statements.
+
+    The remaining parameters are the same as interpret()'s, and, as there,
+    a GrinRuntimeError is raised if an error occurs while the program runs.
+    The budget and deadline are checked whenever the program pauses, so time
+    spent waiting for input counts toward the deadline."""
+
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine: {engine}')
+
+    if slice_size < 1:
+        raise ValueError('slice_size must be positive')
+
+    resolved = _prepare(program, strict, optimize)
+    lines = []
+
+    def input_line() -> str:
+        if not lines:
+            raise _InputPending()
+
+        line = lines.pop()
+
+        if line is None:
+            raise EOFError()
+
+        return line
+
+    def output_line(line: str) -> None:
+        writer.write(f'{line}\n'.encode(encoding = 'utf-8'))
+
+    runner = _make_engine(resolved, input_line, output_line, engine, fuse)
+
+    for waiting_for_input in runner.steps(slice_size):
+        _check_limits(runner, budget, deadline)
+        await writer.drain()
+
+        if waiting_for_input:
+            lines.append(_to_line(await reader.readline()))
+        else:
+            await asyncio.sleep(0)
+
+    await writer.drain()
+
+
+def _to_line(data: bytes) -> str | None:
+    # Turns what's read by StreamReader.readline() into a line of input, or
+    # None at the end of the stream.
+    if not data:
+        return None
+
+    return data.decode(encoding = 'utf-8').removesuffix('\n').removesuffix('\r')
+
+
+
+__all__ = [
+    'DEFAULT_SLICE_SIZE',
+    run_async.__name__
+]
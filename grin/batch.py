@@ -0,0 +1,185 @@
+# batch.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Runs a batch of Grin programs in parallel, across a pool of worker processes
+# (a concurrent.futures.ProcessPoolExecutor), each of which imports grin once
+# and then runs many programs, rather than starting a new Python process for
+# every program.
+#
+# Each program is in its own file, with its input (if it reads any) in another
+# file.  A batch is either a directory, in which each file whose name ends in
+# ".grin" is a program whose input is in the file with the same name but
+# ending in ".in" (if there is one), or a manifest, which is a text file in
+# which each line names a program and, optionally, its input file, separated
+# by whitespace, relative to the manifest's directory.
+#
+# The output of each program is captured, along with the message describing
+# any error that stopped it, exactly as project3.py would print them, and the
+# results are returned in the same order as the programs.  Programs aren't
+# cached (see grin.caching), since a batch's programs are usually run once,
+# and its directory shouldn't be left with __grincache__ directories in it.
+#
+# Usage: python -m grin.batch DIRECTORY_OR_MANIFEST [--workers N]
+
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from grin.lexing import GrinLexError
+from grin.loading import run_file
+from grin.parsing import GrinParseError
+from grin.reading import GrinInputReader
+from grin.runtime import GrinRuntimeError
+import io
+import os
+import sys
+
+
+
+class GrinBatchProgram:
+    """A program in a batch, given as the path to its file and the path to its
+    input file, or None if it has no input."""
+
+    def __init__(self, program_path: str, input_path: str | None = None):
+        self._program_path = program_path
+        self._input_path = input_path
+
+
+    def program_path(self) -> str:
+        return self._program_path
+
+
+    def input_path(self) -> str | None:
+        return self._input_path
+
+
+
+class GrinBatchResult:
+    """The result of running one program in a batch."""
+
+    def __init__(self, program: GrinBatchProgram, output: list[str], error: str | None):
+        self._program = program
+        self._output = output
+        self._error = error
+
+
+    def program(self) -> GrinBatchProgram:
+        return self._program
+
+
+    def output(self) -> list[str]:
+        """Returns the lines printed by the program, which include the message
+        describing the error that stopped it, if any."""
+        return self._output
+
+
+    def error(self) -> str | None:
+        """Returns the message describing the error that stopped the program,
+        or None if it ran to completion."""
+        return self._error
+
+
+
+def find_programs(path: str) -> list[GrinBatchProgram]:
+    """Returns the programs in a batch, given the path to either a directory
+    of programs or a manifest."""
+    if os.path.isdir(path):
+        return [
+            GrinBatchProgram(
+                os.path.join(path, name),
+                _existing_path(os.path.join(path, name.removesuffix('.grin') + '.in')))
+            for name in sorted(os.listdir(path))
+            if name.endswith('.grin')
+        ]
+
+    directory = os.path.dirname(path)
+    programs = []
+
+    with open(path, encoding = 'utf-8') as manifest:
+        for line in manifest:
+            fields = line.split()
+
+            if fields:
+                input_path = os.path.join(directory, fields[1]) if len(fields) > 1 else None
+                programs.append(GrinBatchProgram(os.path.join(directory, fields[0]), input_path))
+
+    return programs
+
+
+def run_batch(
+        programs: Iterable[GrinBatchProgram], *,
+        max_workers: int | None = None,
+        chunk_size: int = 8) -> list[GrinBatchResult]:
+    """Runs the given programs in a pool of max_workers processes (by default,
+    one per processor), returning their results in the same order.  Programs
+    are handed to the workers chunk_size at a time."""
+    programs = list(programs)
+
+    with ProcessPoolExecutor(max_workers = max_workers) as executor:
+        return list(executor.map(run_program, programs, chunksize = chunk_size))
+
+
+def run_program(program: GrinBatchProgram) -> GrinBatchResult:
+    """Runs one program from a batch in the current process.  Its input is
+    split into lines by a GrinInputReader, just as project3.py splits its
+    standard input."""
+    if program.input_path() is None:
+        input_stream = io.BytesIO()
+    else:
+        input_stream = open(program.input_path(), 'rb')
+
+    output = []
+
+    with input_stream:
+        reader = GrinInputReader(input_stream)
+
+        try:
+            run_file(
+                program.program_path(), cache = False,
+                input_line = reader.read_line, output_line = output.append)
+            error = None
+        except (GrinLexError, GrinParseError, GrinRuntimeError) as e:
+            error = str(e)
+            output.append(error)
+
+    return GrinBatchResult(program, output, error)
+
+
+def _existing_path(path: str) -> str | None:
+    return path if os.path.exists(path) else None
+
+
+def main() -> None:
+    arguments = sys.argv[1:]
+    max_workers = None
+
+    if '--workers' in arguments:
+        index = arguments.index('--workers')
+        max_workers = int(arguments[index + 1])
+        del arguments[index:index + 2]
+
+    if len(arguments) != 1:
+        print('Usage: python -m grin.batch DIRECTORY_OR_MANIFEST [--workers N]')
+        sys.exit(2)
+
+    for result in run_batch(find_programs(arguments[0]), max_workers = max_workers):
+        print(f'==> {result.program().program_path()} <==')
+
+        for line in result.output():
+            print(line)
+
+
+
+
+__all__ = [
+    find_programs.__name__,
+    run_batch.__name__,
+    run_program.__name__,
+    GrinBatchProgram.__name__,
+    GrinBatchResult.__name__
+]
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+# bytecode.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A compact, linear bytecode for Grin programs, along with a compiler that
+# translates a resolved Grin program into it.
+#
+# * GrinOpcode, which identifies the operation performed by an instruction.
+# * GrinBytecode, which stores a program's instructions in parallel arrays:
+#   one of opcodes and three of operands, along with the line on which each
+#   instruction's statement appeared.
+# * compile_bytecode(), which builds the bytecode for a GrinResolvedProgram.
+# * fuse_instructions(), an optional pass that replaces common pairs of
+#   adjacent instructions with superinstructions.
+#
+# Most operands are indexes into a list of values, in which each variable has
+# its slot and each constant follows them, so that instructions can read
+# variables and constants alike without checking which is which.  There are
+# typed variants of the most common instructions (e.g., ADD_VAR_CONST, which
+# adds an integer stored directly in its operand, and JUMP_IF_LT_VAR_CONST,
+# which compares a variable to a number), since they can skip some of the work
+# that the general instructions do.
+#
+# Each statement compiles to one instruction, except that a conditional jump
+# whose destination isn't known before the program runs, or any conditional
+# GOSUB, compiles to a JUMP_UNLESS instruction that skips the jump that
+# follows it.
+
+from array import array
+from collections.abc import Iterator
+from enum import IntEnum
+from grin.ast import Constant, Variable, GrinStatement, JumpStatement
+from grin.ast import LetStatement, AddStatement, SubStatement, MultStatement, DivStatement
+from grin.ast import PrintStatement, InNumStatement, InStrStatement
+from grin.ast import GotoStatement, ReturnStatement
+from grin.resolution import GrinResolvedProgram
+from grin.runtime import GrinRuntimeError
+from grin.token import GrinTokenKind
+
+
+
+class GrinOpcode(IntEnum):
+    """Identifies the operation performed by a bytecode instruction.  In the
+    descriptions below, A, B, and C are an instruction's three operands, and
+    values[A] is the value (of a variable or constant) whose index is A.
+
+    The superinstructions at the beginning are never emitted by the compiler;
+    they replace the first of a pair of instructions when fuse_instructions()
+    finds a common pair, and they take the second instruction's operands from
+    the instruction that follows them, which is left as it was."""
+
+    # ADD_VAR_CONST, then the JUMP_IF_..._VAR_CONST that follows it.
+    ADD_VAR_CONST_JUMP_IF_VAR_CONST = 0
+
+    # ADD_VAR_CONST, then the JUMP that follows it.
+    ADD_VAR_CONST_JUMP = 1
+
+    # LET, then the PRINT that follows it.
+    LET_PRINT = 2
+
+    # values[A] = values[A] + B, where B is an integer.
+    ADD_VAR_CONST = 3
+
+    # values[A] = values[A] - B, where B is an integer.
+    SUB_VAR_CONST = 4
+
+    # Jump to instruction C if values[A] compares to values[B], which is a
+    # number, as the opcode indicates.
+    JUMP_IF_LT_VAR_CONST = 5
+    JUMP_IF_LE_VAR_CONST = 6
+    JUMP_IF_GT_VAR_CONST = 7
+    JUMP_IF_GE_VAR_CONST = 8
+    JUMP_IF_EQ_VAR_CONST = 9
+    JUMP_IF_NE_VAR_CONST = 10
+
+    # values[A] = values[B], or values[A] combined with values[B].
+    LET = 11
+    ADD = 12
+    SUB = 13
+    MULT = 14
+    DIV = 15
+
+    # Jump to instruction A.
+    JUMP = 16
+
+    # Jump to instruction C if values[A] compares to values[B] as the opcode
+    # indicates.
+    JUMP_IF_LT = 17
+    JUMP_IF_LE = 18
+    JUMP_IF_GT = 19
+    JUMP_IF_GE = 20
+    JUMP_IF_EQ = 21
+    JUMP_IF_NE = 22
+
+    # Jump to instruction C unless values[A] compares to values[B] as the
+    # opcode indicates.
+    JUMP_UNLESS_LT = 23
+    JUMP_UNLESS_LE = 24
+    JUMP_UNLESS_GT = 25
+    JUMP_UNLESS_GE = 26
+    JUMP_UNLESS_EQ = 27
+    JUMP_UNLESS_NE = 28
+
+    # Print values[A].
+    PRINT = 29
+
+    # Read a line of input (as a number or a string) into values[A].
+    INNUM = 30
+    INSTR = 31
+
+    # Call the subroutine at instruction A.
+    GOSUB = 32
+
+    # Jump to (or call) the statement that values[A] specifies, relative to the
+    # statement whose index is B.
+    JUMP_DYNAMIC = 33
+    GOSUB_DYNAMIC = 34
+
+    # Return from the most recent subroutine call.
+    RETURN = 35
+
+    # End the program.
+    END = 36
+
+    # Fail with the error message values[A], which was determined before the
+    # program ran (e.g., a jump to a label that doesn't exist).
+    FAIL = 37
+
+
+
+_COMPARISON_NAMES = {
+    GrinTokenKind.LESS_THAN: 'LT',
+    GrinTokenKind.LESS_THAN_OR_EQUAL: 'LE',
+    GrinTokenKind.GREATER_THAN: 'GT',
+    GrinTokenKind.GREATER_THAN_OR_EQUAL: 'GE',
+    GrinTokenKind.EQUAL: 'EQ',
+    GrinTokenKind.NOT_EQUAL: 'NE'
+}
+
+
+def _comparison_opcodes(prefix: str, suffix: str = '') -> dict[GrinTokenKind, GrinOpcode]:
+    return {
+        kind: GrinOpcode[f'{prefix}_{name}{suffix}']
+        for kind, name in _COMPARISON_NAMES.items()
+    }
+
+
+_JUMP_IF_VAR_CONST = _comparison_opcodes('JUMP_IF', '_VAR_CONST')
+_JUMP_IF = _comparison_opcodes('JUMP_IF')
+_JUMP_UNLESS = _comparison_opcodes('JUMP_UNLESS')
+
+_UPDATE_OPCODES = {
+    LetStatement: GrinOpcode.LET,
+    AddStatement: GrinOpcode.ADD,
+    SubStatement: GrinOpcode.SUB,
+    MultStatement: GrinOpcode.MULT,
+    DivStatement: GrinOpcode.DIV
+}
+
+_IMMEDIATE_OPCODES = {
+    AddStatement: GrinOpcode.ADD_VAR_CONST,
+    SubStatement: GrinOpcode.SUB_VAR_CONST
+}
+
+# The range of integers that fit in an operand.
+_MIN_IMMEDIATE = -(1 << 63)
+_MAX_IMMEDIATE = (1 << 63) - 1
+
+
+
+class GrinBytecode:
+    """The bytecode for a Grin program: its instructions, stored as parallel
+    arrays, along with the values (variables followed by constants) to which
+    their operands refer."""
+
+    def __init__(self, program: GrinResolvedProgram):
+        self._program = program
+        self._opcodes = array('B')
+        self._first = array('q')
+        self._second = array('q')
+        self._third = array('q')
+        self._lines = array('I')
+        self._starts = array('I')
+        self._constants = []
+        self._constant_indexes = {}
+
+
+    def opcodes(self) -> array:
+        return self._opcodes
+
+
+    def operands(self) -> tuple[array, array, array]:
+        """Returns the arrays of the instructions' first, second, and third
+        operands."""
+        return self._first, self._second, self._third
+
+
+    def lines(self) -> array:
+        """Returns the array of the line number of each instruction's
+        statement."""
+        return self._lines
+
+
+    def starts(self) -> array:
+        """Returns an array containing the index of the first instruction of
+        each statement, followed by the number of instructions, so that a
+        statement's index can be turned into the index of an instruction."""
+        return self._starts
+
+
+    def program(self) -> GrinResolvedProgram:
+        return self._program
+
+
+    def initial_values(self) -> list:
+        """Returns a new list of values in which every variable is 0 and every
+        constant follows the variables."""
+        return [0] * len(self._program.slots()) + self._constants
+
+
+    def instructions(self) -> Iterator[tuple[GrinOpcode, int, int, int]]:
+        """Generates each instruction as a tuple of its opcode and operands."""
+        for index, opcode in enumerate(self._opcodes):
+            yield GrinOpcode(opcode), self._first[index], self._second[index], self._third[index]
+
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+
+    def _emit(self, opcode: GrinOpcode, line: int, first: int = 0, second: int = 0, third: int = 0) -> int:
+        self._opcodes.append(opcode)
+        self._first.append(first)
+        self._second.append(second)
+        self._third.append(third)
+        self._lines.append(line)
+        return len(self._opcodes) - 1
+
+
+    def _constant(self, value: object) -> int:
+        # Constants are distinguished by type and repr rather than by value,
+        # since 1 and 1.0, as well as 0.0 and -0.0, are equal but print
+        # differently.
+        key = (type(value), repr(value))
+        index = self._constant_indexes.get(key)
+
+        if index is None:
+            index = len(self._program.slots()) + len(self._constants)
+            self._constant_indexes[key] = index
+            self._constants.append(value)
+
+        return index
+
+
+
+def compile_bytecode(program: GrinResolvedProgram) -> GrinBytecode:
+    """Compiles a resolved Grin program into bytecode."""
+    return _BytecodeCompiler(program).compile()
+
+
+
+def fuse_instructions(bytecode: GrinBytecode) -> int:
+    """Replaces the first of each common pair of adjacent instructions (e.g.,
+    an ADD_VAR_CONST followed by a JUMP_IF_LT_VAR_CONST, which is how most
+    loops end) with a superinstruction that does the work of both, returning
+    the number of pairs that were fused.
+
+    The second instruction of each pair is left in place, so any jump to it
+    (including a jump whose destination is only known when the program runs,
+    and a RETURN to it) behaves as it did before."""
+
+    opcodes = bytecode.opcodes()
+    fused_count = 0
+
+    for index in range(len(opcodes) - 1):
+        fused = _SUPERINSTRUCTIONS.get((opcodes[index], opcodes[index + 1]))
+
+        if fused is not None:
+            opcodes[index] = fused
+            fused_count += 1
+
+    return fused_count
+
+
+_SUPERINSTRUCTIONS = {
+    **{
+        (GrinOpcode.ADD_VAR_CONST, opcode): GrinOpcode.ADD_VAR_CONST_JUMP_IF_VAR_CONST
+        for opcode in _JUMP_IF_VAR_CONST.values()
+    },
+    (GrinOpcode.ADD_VAR_CONST, GrinOpcode.JUMP): GrinOpcode.ADD_VAR_CONST_JUMP,
+    (GrinOpcode.LET, GrinOpcode.PRINT): GrinOpcode.LET_PRINT
+}
+
+
+
+class _BytecodeCompiler:
+    def __init__(self, program: GrinResolvedProgram):
+        self._program = program
+        self._bytecode = GrinBytecode(program)
+
+        # The instructions whose third operand is, for now, the index of the
+        # statement to which they jump, which is replaced with the index of
+        # its first instruction once every statement has been compiled.
+        self._jumps_to_statements = []
+
+
+    def compile(self) -> GrinBytecode:
+        bytecode = self._bytecode
+
+        for index, statement in enumerate(self._program.statements()):
+            bytecode._starts.append(len(bytecode))
+            self._compile_statement(statement, index)
+
+        bytecode._starts.append(len(bytecode))
+
+        for instruction, operand in self._jumps_to_statements:
+            operands = bytecode.operands()[operand]
+            operands[instruction] = bytecode._starts[operands[instruction]]
+
+        return bytecode
+
+
+    def _operand(self, operand: Constant | Variable) -> int:
+        if type(operand) is Variable:
+            return self._program.slots()[operand.name()]
+        else:
+            return self._bytecode._constant(operand.value())
+
+
+    def _emit_jump(self, opcode: GrinOpcode, line: int, operand: int, statement_index: int, **operands) -> None:
+        # Emits a jump to a statement, whose index is the given operand.
+        instruction = self._bytecode._emit(opcode, line, **operands)
+        self._bytecode.operands()[operand][instruction] = statement_index
+        self._jumps_to_statements.append((instruction, operand))
+
+
+    def _compile_statement(self, statement: GrinStatement, index: int) -> None:
+        bytecode = self._bytecode
+        line = statement.line()
+
+        if type(statement) in _UPDATE_OPCODES:
+            target = self._program.slots()[statement.target()]
+            value = statement.value()
+
+            if (type(statement) in _IMMEDIATE_OPCODES and type(value) is Constant
+                    and type(value.value()) is int
+                    and _MIN_IMMEDIATE <= value.value() <= _MAX_IMMEDIATE):
+                bytecode._emit(_IMMEDIATE_OPCODES[type(statement)], line, target, value.value())
+            else:
+                bytecode._emit(_UPDATE_OPCODES[type(statement)], line, target, self._operand(value))
+        elif type(statement) is PrintStatement:
+            bytecode._emit(GrinOpcode.PRINT, line, self._operand(statement.value()))
+        elif type(statement) is InNumStatement:
+            bytecode._emit(GrinOpcode.INNUM, line, self._program.slots()[statement.target()])
+        elif type(statement) is InStrStatement:
+            bytecode._emit(GrinOpcode.INSTR, line, self._program.slots()[statement.target()])
+        elif isinstance(statement, JumpStatement):
+            self._compile_jump(statement, index)
+        elif type(statement) is ReturnStatement:
+            bytecode._emit(GrinOpcode.RETURN, line)
+        else:
+            bytecode._emit(GrinOpcode.END, line)
+
+
+    def _compile_jump(self, statement: JumpStatement, index: int) -> None:
+        bytecode = self._bytecode
+        program = self._program
+        line = statement.line()
+        condition = statement.condition()
+        destination = None
+        message = None
+
+        if program.is_resolved(index):
+            try:
+                destination = program.destination(index)
+            except GrinRuntimeError as e:
+                message = e.message()
+
+        if type(statement) is GotoStatement and destination is not None:
+            if condition is None:
+                self._emit_jump(GrinOpcode.JUMP, line, 0, destination)
+            else:
+                left = self._operand(condition.left())
+                right = self._operand(condition.right())
+
+                if (type(condition.left()) is Variable and type(condition.right()) is Constant
+                        and type(condition.right().value()) is not str):
+                    opcode = _JUMP_IF_VAR_CONST[condition.operator()]
+                else:
+                    opcode = _JUMP_IF[condition.operator()]
+
+                self._emit_jump(opcode, line, 2, destination, first = left, second = right)
+
+            return
+
+        if condition is not None:
+            # Skips the jump that follows, which is the next instruction.
+            bytecode._emit(
+                _JUMP_UNLESS[condition.operator()], line,
+                self._operand(condition.left()), self._operand(condition.right()),
+                len(bytecode) + 2)
+
+        if message is not None:
+            bytecode._emit(GrinOpcode.FAIL, line, bytecode._constant(message))
+        elif destination is not None:
+            self._emit_jump(GrinOpcode.GOSUB, line, 0, destination)
+        elif type(statement) is GotoStatement:
+            bytecode._emit(GrinOpcode.JUMP_DYNAMIC, line, self._operand(statement.target()), index)
+        else:
+            bytecode._emit(GrinOpcode.GOSUB_DYNAMIC, line, self._operand(statement.target()), index)
+
+
+
+__all__ = [
+    compile_bytecode.__name__,
+    fuse_instructions.__name__,
+    GrinBytecode.__name__,
+    GrinOpcode.__name__
+]
@@ -0,0 +1,250 @@
+# bytecode_engine.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# The bytecode engine, which grin.interpreter.interpret() uses when its engine
+# is 'bytecode'.  It's kept apart from the other engines, so that neither it
+# nor grin.bytecode is imported unless a program is run by it.
+
+from collections.abc import Callable, Iterator
+from grin.bytecode import compile_bytecode, fuse_instructions, GrinOpcode
+from grin.interpreter import _Engine, _InputPending, _ticks, _instructions_run
+from grin.resolution import GrinResolvedProgram
+from grin.runtime import add, subtract, multiply, divide, compare
+from grin.runtime import read_line, to_number, jump_destination, runtime_error
+import operator
+
+
+
+class _BytecodeInterpreter(_Engine):
+    """Runs a Grin program by compiling it into bytecode (see grin.bytecode),
+    then executing the instructions in a single loop that dispatches on their
+    opcodes.  Unless fuse is False, common pairs of instructions are fused
+    into superinstructions first."""
+
+    def __init__(
+            self, program: GrinResolvedProgram,
+            input_line: Callable[[], str], output_line: Callable[[str], None],
+            *, fuse: bool = True):
+        self._bytecode = compile_bytecode(program)
+
+        if fuse:
+            fuse_instructions(self._bytecode)
+
+        self._input_line = input_line
+        self._output_line = output_line
+
+
+    def steps(self, slice_size: int | None) -> Iterator[bool]:
+        """Runs the program as _StatementInterpreter.steps() does."""
+        bytecode = self._bytecode
+        program = bytecode.program()
+        # The arrays are copied into lists while the program runs, since
+        # indexing a list is quicker than indexing an array (which creates a
+        # new int object every time).
+        opcodes = bytecode.opcodes().tolist()
+        first, second, third = (operands.tolist() for operands in bytecode.operands())
+        lines = bytecode.lines()
+        starts = bytecode.starts()
+        labels = program.labels()
+        statement_count = len(program.statements())
+        values = bytecode.initial_values()
+        return_indexes = []
+        input_line = self._input_line
+        output_line = self._output_line
+        count = len(opcodes)
+        pc = 0
+
+        while True:
+            ticks = _ticks(slice_size)
+
+            try:
+                for _ in ticks:
+                    if pc >= count:
+                        return
+
+                    op = opcodes[pc]
+                    a = first[pc]
+
+                    if op < _LET:
+                        if op < _ADD_VAR_CONST:
+                            # A superinstruction, which does the work of the instruction
+                            # at pc, then of the one that follows it.
+                            if op == _LET_PRINT:
+                                values[a] = values[second[pc]]
+                                pc += 1
+                                output_line(str(values[first[pc]]))
+                                pc += 1
+                                continue
+
+                            current = values[a]
+
+                            try:
+                                values[a] = current + second[pc]
+                            except TypeError:
+                                add(current, second[pc], lines[pc])
+
+                            pc += 1
+
+                            if op == _ADD_VAR_CONST_JUMP:
+                                pc = first[pc]
+                                continue
+
+                            # The JUMP_IF_..._VAR_CONST is done below.
+                            op = opcodes[pc]
+                            a = first[pc]
+                        elif op == _ADD_VAR_CONST:
+                            current = values[a]
+
+                            try:
+                                values[a] = current + second[pc]
+                            except TypeError:
+                                add(current, second[pc], lines[pc])
+
+                            pc += 1
+                            continue
+
+                        left = values[a]
+
+                        if type(left) is str:
+                            if op == _SUB_VAR_CONST:
+                                subtract(left, second[pc], lines[pc])
+                            else:
+                                compare(operator.eq, left, values[second[pc]], lines[pc])
+
+                        if op == _JUMP_IF_LT_VAR_CONST:
+                            pc = third[pc] if left < values[second[pc]] else pc + 1
+                        elif op == _SUB_VAR_CONST:
+                            values[a] = left - second[pc]
+                            pc += 1
+                        elif op == _JUMP_IF_LE_VAR_CONST:
+                            pc = third[pc] if left <= values[second[pc]] else pc + 1
+                        elif op == _JUMP_IF_GT_VAR_CONST:
+                            pc = third[pc] if left > values[second[pc]] else pc + 1
+                        elif op == _JUMP_IF_GE_VAR_CONST:
+                            pc = third[pc] if left >= values[second[pc]] else pc + 1
+                        elif op == _JUMP_IF_EQ_VAR_CONST:
+                            pc = third[pc] if left == values[second[pc]] else pc + 1
+                        else:
+                            pc = third[pc] if left != values[second[pc]] else pc + 1
+                    elif op < _JUMP_IF_LT:
+                        if op == _LET:
+                            values[a] = values[second[pc]]
+                            pc += 1
+                        elif op == _JUMP:
+                            pc = a
+                        elif op == _DIV:
+                            values[a] = divide(values[a], values[second[pc]], lines[pc])
+                            pc += 1
+                        else:
+                            current = values[a]
+                            operand = values[second[pc]]
+
+                            try:
+                                if op == _ADD:
+                                    values[a] = current + operand
+                                elif op == _SUB:
+                                    values[a] = current - operand
+                                else:
+                                    values[a] = current * operand
+                            except TypeError:
+                                _BYTECODE_UPDATES[op](current, operand, lines[pc])
+
+                            pc += 1
+                    elif op <= _JUMP_UNLESS_NE:
+                        left = values[a]
+                        right = values[second[pc]]
+
+                        if (type(left) is str) is not (type(right) is str):
+                            compare(operator.eq, left, right, lines[pc])
+
+                        if _BYTECODE_COMPARISONS[op](left, right) is (op <= _JUMP_IF_NE):
+                            pc = third[pc]
+                        else:
+                            pc += 1
+                    elif op == _PRINT:
+                        output_line(str(values[a]))
+                        pc += 1
+                    elif op == _GOSUB:
+                        return_indexes.append(pc + 1)
+                        pc = a
+                    elif op == _RETURN:
+                        if not return_indexes:
+                            raise runtime_error('RETURN without a matching GOSUB', lines[pc])
+
+                        pc = return_indexes.pop()
+                    elif op == _INNUM:
+                        values[a] = to_number(read_line(input_line, lines[pc]), lines[pc])
+                        pc += 1
+                    elif op == _INSTR:
+                        values[a] = read_line(input_line, lines[pc])
+                        pc += 1
+                    elif op == _JUMP_DYNAMIC or op == _GOSUB_DYNAMIC:
+                        destination = jump_destination(
+                            values[a], second[pc], labels, statement_count, lines[pc])
+
+                        if op == _GOSUB_DYNAMIC:
+                            return_indexes.append(pc + 1)
+
+                        pc = starts[destination]
+                    elif op == _END:
+                        pc = count
+                    else:
+                        raise runtime_error(values[a], lines[pc])
+            except _InputPending:
+                waiting_for_input = True
+            else:
+                waiting_for_input = False
+
+            self._instruction_count += _instructions_run(ticks, slice_size, waiting_for_input)
+            self._line = lines[pc] if pc < count else None
+            yield waiting_for_input
+
+
+
+# The opcodes, as plain integers, which are quicker to compare than members of
+# GrinOpcode.
+_ADD_VAR_CONST_JUMP = GrinOpcode.ADD_VAR_CONST_JUMP.value
+_LET_PRINT = GrinOpcode.LET_PRINT.value
+_ADD_VAR_CONST = GrinOpcode.ADD_VAR_CONST.value
+_SUB_VAR_CONST = GrinOpcode.SUB_VAR_CONST.value
+_JUMP_IF_LT_VAR_CONST = GrinOpcode.JUMP_IF_LT_VAR_CONST.value
+_JUMP_IF_LE_VAR_CONST = GrinOpcode.JUMP_IF_LE_VAR_CONST.value
+_JUMP_IF_GT_VAR_CONST = GrinOpcode.JUMP_IF_GT_VAR_CONST.value
+_JUMP_IF_GE_VAR_CONST = GrinOpcode.JUMP_IF_GE_VAR_CONST.value
+_JUMP_IF_EQ_VAR_CONST = GrinOpcode.JUMP_IF_EQ_VAR_CONST.value
+_LET = GrinOpcode.LET.value
+_ADD = GrinOpcode.ADD.value
+_SUB = GrinOpcode.SUB.value
+_DIV = GrinOpcode.DIV.value
+_JUMP = GrinOpcode.JUMP.value
+_JUMP_IF_LT = GrinOpcode.JUMP_IF_LT.value
+_JUMP_IF_NE = GrinOpcode.JUMP_IF_NE.value
+_JUMP_UNLESS_NE = GrinOpcode.JUMP_UNLESS_NE.value
+_PRINT = GrinOpcode.PRINT.value
+_INNUM = GrinOpcode.INNUM.value
+_INSTR = GrinOpcode.INSTR.value
+_GOSUB = GrinOpcode.GOSUB.value
+_JUMP_DYNAMIC = GrinOpcode.JUMP_DYNAMIC.value
+_GOSUB_DYNAMIC = GrinOpcode.GOSUB_DYNAMIC.value
+_RETURN = GrinOpcode.RETURN.value
+_END = GrinOpcode.END.value
+
+_BYTECODE_UPDATES = {
+    GrinOpcode.ADD.value: add,
+    GrinOpcode.SUB.value: subtract,
+    GrinOpcode.MULT.value: multiply
+}
+
+# The comparison made by each of the general conditional jumps, whose names
+# end with the name of the corresponding function in the operator module.
+_BYTECODE_COMPARISONS = {
+    opcode.value: getattr(operator, opcode.name[-2:].lower())
+    for opcode in GrinOpcode
+    if opcode.name.startswith(('JUMP_IF_', 'JUMP_UNLESS_')) and not opcode.name.endswith('_VAR_CONST')
+}
+
+
+
+__all__ = []
@@ -0,0 +1,243 @@
+# caching.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A cache of parsed Grin programs, kept in a directory (by default, one named
+# __grincache__ alongside the program's file, much as Python keeps compiled
+# modules in __pycache__), so that a program that's run repeatedly without
+# changing is only lexed and parsed the first time.
+#
+# Each program is stored in its own file, named for a hash of its source and
+# of GRIN_VERSION, so that a program that's changed (or a new version of Grin,
+# whose statements might be parsed differently) misses the cache.  A file
+# consists of a fixed-size header, followed by the program's statements
+# encoded by marshal as nested tuples, all of which is read at once.  The
+# header repeats the hash, records the format's version, and holds a checksum
+# of the statements, so a file that's stale, truncated or otherwise corrupt is
+# detected and treated as a miss, after which it's rewritten.
+
+from collections.abc import Callable
+from grin.ast import Constant, Variable, JumpCondition, GrinStatement, VariableUpdateStatement
+from grin.ast import LetStatement, AddStatement, SubStatement, MultStatement, DivStatement
+from grin.ast import PrintStatement, InputStatement, InNumStatement, InStrStatement
+from grin.ast import JumpStatement, GotoStatement, GosubStatement, ReturnStatement, EndStatement
+from grin.token import KINDS_BY_INDEX
+import marshal
+import os
+import struct
+import zlib
+
+
+
+CACHE_DIRECTORY_NAME = '__grincache__'
+
+# Changing how programs are lexed, parsed, or represented must be accompanied
+# by a new GRIN_VERSION, so that programs cached by the old version aren't used.
+GRIN_VERSION = '1.0'
+
+
+
+class GrinProgramCache:
+    """A directory in which parsed Grin programs are cached, keyed by a hash
+    of their source."""
+
+    def __init__(self, directory: str | os.PathLike):
+        self._directory = directory
+
+
+    def directory(self) -> str | os.PathLike:
+        return self._directory
+
+
+    def load(self, source: bytes | memoryview, parse: Callable[[], list[GrinStatement]]) -> list[GrinStatement]:
+        """Returns the statements of the program with the given source, from
+        the cache if they're there, or otherwise by calling parse (which is
+        expected to raise an exception if the program can't be parsed) and
+        storing what it returns in the cache."""
+        digest = _digest(source)
+        path = self.path(digest)
+        statements = _read_entry(path, digest)
+
+        if statements is None:
+            statements = parse()
+            _write_entry(self._directory, path, digest, statements)
+
+        return statements
+
+
+    def path(self, digest: bytes) -> str:
+        """Returns the path of the file in which the program whose source has
+        the given hash is cached."""
+        return os.path.join(self._directory, f'{digest.hex()}.grinc')
+
+
+
+_MAGIC = b'GRIN'
+_FORMAT_VERSION = 1
+
+# The magic number, the format's version, the hash of the program's source
+# and GRIN_VERSION, the length of the encoded statements, and their CRC-32.
+_HEADER = struct.Struct('<4sH32sII')
+
+
+_STATEMENT_TYPES = (
+    LetStatement, AddStatement, SubStatement, MultStatement, DivStatement,
+    PrintStatement, InNumStatement, InStrStatement,
+    GotoStatement, GosubStatement, ReturnStatement, EndStatement
+)
+
+_STATEMENT_CODES = {statement_type: code for code, statement_type in enumerate(_STATEMENT_TYPES)}
+
+
+
+# hashlib and tempfile are comparatively slow to import, so they're imported
+# only when they're needed, rather than whenever grin.loading is imported.
+
+def _digest(source: bytes | memoryview) -> bytes:
+    import hashlib
+
+    hash = hashlib.sha256(GRIN_VERSION.encode(encoding = 'utf-8') + b'\0')
+    hash.update(source)
+    return hash.digest()
+
+
+def _read_entry(path: str, digest: bytes) -> list[GrinStatement] | None:
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    if len(data) < _HEADER.size:
+        return None
+
+    magic, format_version, stored_digest, length, checksum = _HEADER.unpack_from(data)
+    payload = memoryview(data)[_HEADER.size:]
+
+    if (magic != _MAGIC or format_version != _FORMAT_VERSION or stored_digest != digest
+            or length != len(payload) or checksum != zlib.crc32(payload)):
+        return None
+
+    try:
+        decode = _Decoder().decode
+        return [decode(encoded) for encoded in marshal.loads(payload)]
+    except (ValueError, EOFError, TypeError, IndexError):
+        return None
+
+
+def _write_entry(directory: str | os.PathLike, path: str, digest: bytes, statements: list[GrinStatement]) -> None:
+    payload = marshal.dumps([_encode(statement) for statement in statements])
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, digest, len(payload), zlib.crc32(payload))
+
+    # As with __pycache__, failing to write to the cache (e.g., because the
+    # directory is read-only) isn't an error; the program just isn't cached.
+    # The entry is written to a temporary file first, so that a program that's
+    # run by several processes at once is never read half-written.
+    try:
+        import tempfile
+
+        os.makedirs(directory, exist_ok = True)
+        descriptor, temporary_path = tempfile.mkstemp(dir = directory, suffix = '.tmp')
+
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(header)
+                file.write(payload)
+
+            os.replace(temporary_path, path)
+        except OSError:
+            os.remove(temporary_path)
+            raise
+    except OSError:
+        pass
+
+
+def _encode(statement: GrinStatement) -> tuple:
+    # Each statement becomes a tuple of its type's code, its line and label,
+    # and then its own fields, in the order its constructor takes them.  A
+    # constant operand is just its value, while a variable operand is a tuple
+    # containing its name.  A condition is a tuple of its left operand, the
+    # index of its operator's kind, and its right operand.
+    fields = (_STATEMENT_CODES[type(statement)], statement.line(), statement.label())
+
+    if isinstance(statement, VariableUpdateStatement):
+        return (*fields, statement.target(), _encode_operand(statement.value()))
+    elif isinstance(statement, PrintStatement):
+        return (*fields, _encode_operand(statement.value()))
+    elif isinstance(statement, InputStatement):
+        return (*fields, statement.target())
+    elif isinstance(statement, JumpStatement):
+        condition = statement.condition()
+
+        if condition is not None:
+            condition = (
+                _encode_operand(condition.left()), condition.operator().index(),
+                _encode_operand(condition.right()))
+
+        return (*fields, _encode_operand(statement.target()), condition)
+    else:
+        return fields
+
+
+def _encode_operand(operand: Constant | Variable) -> object:
+    return (operand.name(),) if type(operand) is Variable else operand.value()
+
+
+
+class _Decoder:
+    """Decodes the statements of a program.  Since the same operands appear
+    in many statements, each distinct operand is only decoded once."""
+
+    def __init__(self):
+        self._operands = {}
+
+
+    def decode(self, encoded: tuple) -> GrinStatement:
+        statement_type = _STATEMENT_TYPES[encoded[0]]
+        line = encoded[1]
+        label = encoded[2]
+
+        if issubclass(statement_type, VariableUpdateStatement):
+            return statement_type(
+                line = line, label = label, target = encoded[3], value = self._operand(encoded[4]))
+        elif statement_type is PrintStatement:
+            return statement_type(line = line, label = label, value = self._operand(encoded[3]))
+        elif issubclass(statement_type, InputStatement):
+            return statement_type(line = line, label = label, target = encoded[3])
+        elif issubclass(statement_type, JumpStatement):
+            condition = encoded[4]
+
+            if condition is not None:
+                condition = JumpCondition(
+                    left = self._operand(condition[0]), operator = KINDS_BY_INDEX[condition[1]],
+                    right = self._operand(condition[2]))
+
+            return statement_type(
+                line = line, label = label, target = self._operand(encoded[3]), condition = condition)
+        else:
+            return statement_type(line = line, label = label)
+
+
+    def _operand(self, encoded: object) -> Constant | Variable:
+        # The key is the type and the repr, so that 1 and 1.0, as well as 0.0
+        # and -0.0 (which are equal), are decoded into different constants.
+        key = (type(encoded), repr(encoded))
+        operand = self._operands.get(key)
+
+        if operand is None:
+            if type(encoded) is tuple:
+                operand = Variable(encoded[0])
+            else:
+                operand = Constant(encoded)
+
+            self._operands[key] = operand
+
+        return operand
+
+
+__all__ = [
+    'CACHE_DIRECTORY_NAME',
+    'GRIN_VERSION',
+    GrinProgramCache.__name__
+]
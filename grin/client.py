@@ -0,0 +1,157 @@
+# client.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A thin client for grin.server, which behaves like project3.py -- reading a
+# program and its input from the standard input and printing its output --
+# but has the server run the program, so it needn't import any more of grin
+# than this module.  If no server is listening, the program is run in this
+# process instead, just as project3.py would run it.
+#
+# Given the path to a file, the program is read from that file instead, and
+# only its input is read from the standard input.
+#
+# Usage: python -m grin.client [--socket PATH] [PROGRAM_PATH]
+
+import io
+import os
+import socket
+import sys
+import threading
+
+
+
+_CHUNK_SIZE = 1 << 16
+
+
+
+def run_client(socket_path: str, input_stream: io.BufferedIOBase, output_stream: io.BufferedIOBase) -> None:
+    """Connects to the server listening on the given socket, sends it
+    everything read from input_stream (as it's read), and writes everything
+    the server sends back to output_stream.  Raises an OSError if there's no
+    server to connect to."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+
+        sender = threading.Thread(target = _send_input, args = (input_stream, connection), daemon = True)
+        sender.start()
+
+        while True:
+            try:
+                chunk = connection.recv(_CHUNK_SIZE)
+            except ConnectionResetError:
+                # The server closes the connection when the program ends, even
+                # if it hasn't read all of its input, which resets it.
+                break
+
+            if not chunk:
+                break
+
+            output_stream.write(chunk)
+            output_stream.flush()
+
+
+def default_socket_path() -> str:
+    """Returns the path of the socket on which the server listens, and to which
+    this client connects, unless they're told otherwise: the value of the
+    GRIN_SOCKET environment variable, if it's set, or a path in the user's
+    runtime directory (or /tmp) otherwise."""
+    if 'GRIN_SOCKET' in os.environ:
+        return os.environ['GRIN_SOCKET']
+
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, f'grin-{os.getuid()}.sock')
+
+
+def _send_input(input_stream: io.BufferedIOBase, connection: socket.socket) -> None:
+    read = getattr(input_stream, 'read1', input_stream.read)
+
+    try:
+        while chunk := read(_CHUNK_SIZE):
+            connection.sendall(chunk)
+
+        connection.shutdown(socket.SHUT_WR)
+    except OSError:
+        # The program ended without reading the rest of its input.
+        pass
+
+
+def _with_program(path: str, input_stream: io.BufferedIOBase) -> io.BufferedIOBase:
+    # Returns a stream that reads the program in the given file, followed by
+    # a line containing only a "." (unless the file already has one, as a
+    # program file given to project3.py does), followed by what's read from
+    # input_stream.
+    with open(path, 'rb') as file:
+        program = file.read()
+
+    if program and not program.endswith(b'\n'):
+        program += b'\n'
+
+    if not any(line.removesuffix(b'\r') == b'.' for line in program.split(b'\n')):
+        program += b'.\n'
+
+    return io.BufferedReader(_ConcatenatedStream(io.BytesIO(program), input_stream))
+
+
+
+class _ConcatenatedStream(io.RawIOBase):
+    def __init__(self, first: io.BufferedIOBase, second: io.BufferedIOBase):
+        self._streams = [first, second]
+
+
+    def readable(self) -> bool:
+        return True
+
+
+    def readinto(self, buffer) -> int:
+        while self._streams:
+            stream = self._streams[0]
+            count = getattr(stream, 'readinto1', stream.readinto)(buffer)
+
+            if count:
+                return count
+
+            del self._streams[0]
+
+        return 0
+
+
+
+def main() -> None:
+    arguments = sys.argv[1:]
+    socket_path = None
+
+    if arguments[:1] == ['--socket'] and len(arguments) >= 2:
+        socket_path = arguments[1]
+        del arguments[:2]
+
+    if len(arguments) > 1 or arguments[:1] and arguments[0].startswith('--'):
+        print('Usage: python -m grin.client [--socket PATH] [PROGRAM_PATH]')
+        sys.exit(2)
+
+    if socket_path is None:
+        socket_path = default_socket_path()
+
+    input_stream = sys.stdin.buffer
+
+    if arguments:
+        input_stream = _with_program(arguments[0], input_stream)
+
+    try:
+        run_client(socket_path, input_stream, sys.stdout.buffer)
+    except (FileNotFoundError, ConnectionRefusedError):
+        from grin.server import serve_request
+        serve_request(input_stream, sys.stdout)
+
+
+
+__all__ = [
+    default_socket_path.__name__,
+    run_client.__name__
+]
+
+
+
+if __name__ == '__main__':
+    main()
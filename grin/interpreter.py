@@ -0,0 +1,815 @@
+# interpreter.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# An interpreter for the Grin language, which executes a parsed Grin program
+# (a sequence of GrinStatements, or of the lists of GrinTokens generated by
+# grin.parse(), which are turned into GrinStatements first).  Before the
+# program runs, its labels and literal jump targets are resolved by the pass in
+# grin.resolution.
+#
+# Variables that have never been assigned a value have the value 0.  Errors
+# that occur while the program runs (e.g., dividing by zero, adding a string
+# to an integer, or jumping to a label that doesn't exist) are reported by
+# raising a GrinRuntimeError, which stops the program.
+
+from collections.abc import Callable, Iterable, Iterator
+from grin.ast import Constant, Variable, GrinStatement, JumpStatement
+from grin.ast import LetStatement, AddStatement, SubStatement, MultStatement, DivStatement
+from grin.ast import PrintStatement, InNumStatement, InStrStatement
+from grin.ast import GotoStatement, GosubStatement, ReturnStatement, EndStatement
+from grin.location import GrinLocation
+from grin.parsing import to_statement
+from grin.resolution import resolve, GrinResolvedProgram
+from grin.runtime import add, subtract, multiply, divide, compare, COMPARISONS
+from grin.runtime import read_line, to_number, jump_destination, runtime_error
+from grin.runtime import GrinLimitError, GrinRuntimeError
+import io
+import itertools
+import operator
+import sys
+import time
+
+
+
+DEFAULT_OUTPUT_BUFFER_SIZE = 1 << 16
+
+# How many instructions a program executes between the checks of its budget
+# and deadline, when it has either.
+LIMIT_CHECK_INTERVAL = 1024
+
+
+
+def interpret(
+        program: Iterable[GrinStatement | list],
+        *,
+        input_line: Callable[[], str] = input,
+        output_line: Callable[[str], None] | None = None,
+        output_buffer_size: int = DEFAULT_OUTPUT_BUFFER_SIZE,
+        strict: bool = False,
+        engine: str = 'closures',
+        fuse: bool = True,
+        optimize: bool = False,
+        budget: int | None = None,
+        deadline: float | None = None,
+        profile: 'GrinProfile | None' = None) -> None:
+    """Runs a Grin program, given as a sequence of GrinStatements (or of lists
+    of GrinTokens, as generated by grin.parse()).  The whole sequence is
+    consumed before the program starts, so any parse error is raised before
+    any statement executes.
+
+    INNUM and INSTR statements read lines by calling input_line, while PRINT
+    statements write lines by calling output_line.  If output_line isn't
+    given, lines are written to the standard output by a GrinOutputBuffer
+    holding up to output_buffer_size characters, which is flushed whenever
+    it's full, before each line of input is read, and when the program ends
+    (even if it ends with an error).
+
+    Raises a GrinRuntimeError if an error occurs while the program runs.  If
+    strict is True, a jump whose literal target is impossible is an error
+    before the program starts, even if it would never execute.
+
+    The engine selects how the program is run: 'closures' compiles each
+    statement into a specialized Python function before running any of them,
+    'bytecode' compiles the program into bytecode that's executed by a single
+    loop, while 'statements' examines each statement every time it executes.
+    All of them behave identically; ENGINES lists the names of all of the
+    engines.  When the engine is 'bytecode', fuse controls whether common
+    pairs of instructions are fused into superinstructions.
+
+    If optimize is True, the program is optimized by grin.optimizing before
+    it runs, which doesn't change its behavior.
+
+    A GrinLimitError is raised if the program executes more than budget
+    instructions, or is still running after deadline (a time.monotonic()
+    value).  These are only checked every LIMIT_CHECK_INTERVAL instructions,
+    so a program can overrun either of them by that much before it's stopped.
+    (An instruction is usually one statement, but the bytecode engine's
+    superinstructions are two.)
+
+    If a GrinProfile (from grin.profiling) is given, the program's execution
+    is profiled, which requires the closures engine."""
+
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine: {engine}')
+
+    if profile is not None and engine != 'closures':
+        raise ValueError('Only the closures engine can profile a program')
+
+    resolved = _prepare(program, strict, optimize)
+
+    if output_line is None:
+        with GrinOutputBuffer(sys.stdout, buffer_size = output_buffer_size) as output:
+            _run(resolved, output.flushing(input_line), output.write_line, engine, fuse, budget, deadline, profile)
+    else:
+        _run(resolved, input_line, output_line, engine, fuse, budget, deadline, profile)
+
+
+def load_statements(program: Iterable[GrinStatement | list]) -> list[GrinStatement]:
+    """Returns a list of the statements in a program, given as a sequence of
+    GrinStatements or of lists of GrinTokens."""
+    return [
+        statement if isinstance(statement, GrinStatement) else to_statement(statement)
+        for statement in program
+    ]
+
+
+def _prepare(program: Iterable[GrinStatement | list], strict: bool, optimize: bool) -> GrinResolvedProgram:
+    # Turns a program into the resolved program that an engine runs.
+    statements = load_statements(program)
+
+    if optimize:
+        from grin.optimizing import optimize as optimize_statements
+        statements = optimize_statements(statements).statements()
+
+    resolved = resolve(statements)
+
+    if strict and resolved.diagnostics():
+        raise resolved.diagnostics()[0]
+
+    return resolved
+
+
+def _make_engine(
+        program: GrinResolvedProgram,
+        input_line: Callable[[], str], output_line: Callable[[str], None],
+        engine: str, fuse: bool):
+    if engine == 'bytecode':
+        from grin.bytecode_engine import _BytecodeInterpreter
+        return _BytecodeInterpreter(program, input_line, output_line, fuse = fuse)
+    else:
+        return _ENGINES[engine](program, input_line, output_line)
+
+
+def _run(
+        program: GrinResolvedProgram,
+        input_line: Callable[[], str], output_line: Callable[[str], None],
+        engine: str, fuse: bool,
+        budget: int | None, deadline: float | None,
+        profile: 'GrinProfile | None' = None) -> None:
+    runner = _make_engine(program, input_line, output_line, engine, fuse)
+
+    if profile is not None:
+        runner.instrument(profile)
+
+    if budget is None and deadline is None:
+        # Without a slice size, an engine's steps() only pauses when input_line
+        # raises _InputPending, which a synchronous input_line never does, so
+        # this loop's body never runs.
+        for _ in runner.steps(None):
+            pass
+    else:
+        for _ in runner.steps(LIMIT_CHECK_INTERVAL):
+            _check_limits(runner, budget, deadline)
+
+
+def _check_limits(runner, budget: int | None, deadline: float | None) -> None:
+    # Raises a GrinLimitError if an engine that has paused has exceeded its
+    # budget or deadline.
+    line = runner.line()
+
+    if line is None:
+        return
+
+    if budget is not None and runner.instruction_count() > budget:
+        raise GrinLimitError(f'Exceeded the budget of {budget} instructions', GrinLocation(line, 1))
+
+    if deadline is not None and time.monotonic() > deadline:
+        raise GrinLimitError('Ran past the deadline', GrinLocation(line, 1))
+
+
+
+class _InputPending(Exception):
+    """Raised by an input_line function when the line it would return hasn't
+    arrived yet, which pauses an engine's steps() until it has.  Since INNUM
+    and INSTR read their input before they do anything else, the statement
+    that was reading is simply executed again once the line is available."""
+    pass
+
+
+def _ticks(slice_size: int | None) -> Iterator[None]:
+    # The iterations of an engine's loop in one slice, which is endless if
+    # there's no slice size.
+    return itertools.repeat(None) if slice_size is None else itertools.repeat(None, slice_size)
+
+
+def _instructions_run(ticks: Iterator[None], slice_size: int | None, waiting_for_input: bool) -> int:
+    # How many instructions an engine executed in a slice, given the ticks it
+    # didn't use, not counting a statement that's waiting for input, since it
+    # will be executed again.
+    if slice_size is None:
+        return 0
+
+    return slice_size - operator.length_hint(ticks) - waiting_for_input
+
+
+
+class GrinOutputBuffer:
+    """Collects the lines written by a Grin program's PRINT statements, writing
+    them to a text stream together once buffer_size characters have been
+    collected, rather than one at a time.  When the stream is a terminal,
+    each line is written as soon as it's printed, instead."""
+
+    def __init__(self, stream: io.TextIOBase, *, buffer_size: int = DEFAULT_OUTPUT_BUFFER_SIZE):
+        self._stream = stream
+        self._buffer_size = 0 if stream.isatty() else buffer_size
+        self._lines = []
+        self._size = 0
+
+
+    def write_line(self, line: str) -> None:
+        """Writes a line, which is held in the buffer until it's flushed."""
+        self._lines.append(line)
+        self._size += len(line) + 1
+
+        if self._size >= self._buffer_size:
+            self.flush()
+
+
+    def flush(self) -> None:
+        """Writes every line held in the buffer to the stream."""
+        if self._lines:
+            self._lines.append('')
+            self._stream.write('\n'.join(self._lines))
+            self._lines.clear()
+            self._size = 0
+
+        self._stream.flush()
+
+
+    def flushing(self, input_line: Callable[[], str]) -> Callable[[], str]:
+        """Returns a function that reads a line by calling input_line, after
+        flushing the buffer, so that a program's output always appears before
+        it waits for input."""
+        def read_after_flushing() -> str:
+            self.flush()
+            return input_line()
+
+        return read_after_flushing
+
+
+    def __enter__(self) -> 'GrinOutputBuffer':
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+
+
+class _Engine:
+    """The base class of the engines, which keeps track of how far a program
+    has gotten whenever its engine's steps() pauses."""
+
+    _instruction_count = 0
+    _line = None
+
+
+    def line(self) -> int | None:
+        """Returns the line of the statement that executes next when the
+        program continues, or None if it has ended."""
+        return self._line
+
+
+    def instruction_count(self) -> int:
+        """Returns how many instructions have executed so far."""
+        return self._instruction_count
+
+
+
+class _StatementInterpreter(_Engine):
+    """Runs a Grin program by walking its statements, examining each one every
+    time it executes."""
+
+    def __init__(
+            self, program: GrinResolvedProgram,
+            input_line: Callable[[], str], output_line: Callable[[str], None]):
+        self._program = program
+        self._statements = program.statements()
+        self._variables = {}
+        self._return_indexes = []
+        self._input_line = input_line
+        self._output_line = output_line
+
+
+    def steps(self, slice_size: int | None) -> Iterator[bool]:
+        """Runs the program, pausing (by yielding) after every slice_size
+        instructions, and whenever input_line raises _InputPending.  Each value
+        yielded is True if the program is waiting for input, False otherwise.
+        While it's paused, line() and instruction_count() describe where the
+        program has gotten to."""
+        statements = self._statements
+        count = len(statements)
+        executors = self._EXECUTORS
+        index = 0
+
+        while True:
+            ticks = _ticks(slice_size)
+
+            try:
+                for _ in ticks:
+                    if index >= count:
+                        return
+
+                    statement = statements[index]
+                    index = executors[type(statement)](self, statement, index)
+            except _InputPending:
+                waiting_for_input = True
+            else:
+                waiting_for_input = False
+
+            self._instruction_count += _instructions_run(ticks, slice_size, waiting_for_input)
+            self._line = statements[index].line() if index < count else None
+            yield waiting_for_input
+
+
+    def _evaluate(self, operand: Constant | Variable) -> object:
+        if type(operand) is Variable:
+            return self._variables.get(operand.name(), 0)
+        else:
+            return operand.value()
+
+
+    def _execute_let(self, statement: LetStatement, index: int) -> int:
+        self._variables[statement.target()] = self._evaluate(statement.value())
+        return index + 1
+
+
+    def _execute_update(
+            self, statement: GrinStatement, index: int,
+            operation: Callable[[object, object, int], object]) -> int:
+        target = statement.target()
+        current = self._variables.get(target, 0)
+        self._variables[target] = operation(current, self._evaluate(statement.value()), statement.line())
+        return index + 1
+
+
+    def _execute_add(self, statement: AddStatement, index: int) -> int:
+        return self._execute_update(statement, index, add)
+
+
+    def _execute_sub(self, statement: SubStatement, index: int) -> int:
+        return self._execute_update(statement, index, subtract)
+
+
+    def _execute_mult(self, statement: MultStatement, index: int) -> int:
+        return self._execute_update(statement, index, multiply)
+
+
+    def _execute_div(self, statement: DivStatement, index: int) -> int:
+        return self._execute_update(statement, index, divide)
+
+
+    def _execute_print(self, statement: PrintStatement, index: int) -> int:
+        self._output_line(str(self._evaluate(statement.value())))
+        return index + 1
+
+
+    def _execute_innum(self, statement: InNumStatement, index: int) -> int:
+        text = read_line(self._input_line, statement.line())
+        self._variables[statement.target()] = to_number(text, statement.line())
+        return index + 1
+
+
+    def _execute_instr(self, statement: InStrStatement, index: int) -> int:
+        self._variables[statement.target()] = read_line(self._input_line, statement.line())
+        return index + 1
+
+
+    def _condition_holds(self, statement: JumpStatement) -> bool:
+        condition = statement.condition()
+
+        if condition is None:
+            return True
+
+        return compare(
+            COMPARISONS[condition.operator()],
+            self._evaluate(condition.left()), self._evaluate(condition.right()),
+            statement.line())
+
+
+    def _destination(self, statement: JumpStatement, index: int) -> int:
+        if self._program.is_resolved(index):
+            return self._program.destination(index)
+
+        return jump_destination(
+            self._evaluate(statement.target()), index, self._program.labels(),
+            len(self._statements), statement.line())
+
+
+    def _execute_goto(self, statement: GotoStatement, index: int) -> int:
+        if self._condition_holds(statement):
+            return self._destination(statement, index)
+        else:
+            return index + 1
+
+
+    def _execute_gosub(self, statement: GosubStatement, index: int) -> int:
+        if self._condition_holds(statement):
+            destination = self._destination(statement, index)
+            self._return_indexes.append(index + 1)
+            return destination
+        else:
+            return index + 1
+
+
+    def _execute_return(self, statement: ReturnStatement, index: int) -> int:
+        if not self._return_indexes:
+            raise runtime_error('RETURN without a matching GOSUB', statement.line())
+
+        return self._return_indexes.pop()
+
+
+    def _execute_end(self, statement: EndStatement, index: int) -> int:
+        return len(self._statements)
+
+
+    _EXECUTORS = {
+        LetStatement: _execute_let,
+        AddStatement: _execute_add,
+        SubStatement: _execute_sub,
+        MultStatement: _execute_mult,
+        DivStatement: _execute_div,
+        PrintStatement: _execute_print,
+        InNumStatement: _execute_innum,
+        InStrStatement: _execute_instr,
+        GotoStatement: _execute_goto,
+        GosubStatement: _execute_gosub,
+        ReturnStatement: _execute_return,
+        EndStatement: _execute_end
+    }
+
+
+
+class _ClosureInterpreter(_Engine):
+    """Runs a Grin program by first compiling each of its statements, once, into
+    a Python function specialized to that statement (e.g., "ADD X 1" becomes a
+    function that adds the constant 1 to X), then calling those functions.
+    Each function returns the index of the statement that executes next.
+
+    Variables are kept in a list, each in the slot assigned to it before the
+    program runs, so that no function looks up a variable by its name.  Every
+    slot starts out as 0, the value of a variable that was never assigned."""
+
+    def __init__(
+            self, program: GrinResolvedProgram,
+            input_line: Callable[[], str], output_line: Callable[[str], None]):
+        self._program = program
+        self._slots = program.slots()
+        self._values = [0] * len(self._slots)
+        self._return_indexes = []
+        self._input_line = input_line
+        self._output_line = output_line
+        self._instructions = [
+            self._COMPILERS[type(statement)](self, statement, index)
+            for index, statement in enumerate(program.statements())
+        ]
+
+
+    def instrument(self, profile: 'GrinProfile') -> None:
+        """Replaces the compiled statements with ones that record their
+        executions in the given GrinProfile."""
+        self._instructions = profile.instrument(
+            self._instructions, self._program.statements(), self._return_indexes)
+
+
+    def steps(self, slice_size: int | None) -> Iterator[bool]:
+        """Runs the program as _StatementInterpreter.steps() does."""
+        instructions = self._instructions
+        count = len(instructions)
+        lines = [statement.line() for statement in self._program.statements()]
+        index = 0
+
+        while True:
+            ticks = _ticks(slice_size)
+
+            try:
+                for _ in ticks:
+                    if index >= count:
+                        return
+
+                    index = instructions[index]()
+            except _InputPending:
+                waiting_for_input = True
+            else:
+                waiting_for_input = False
+
+            self._instruction_count += _instructions_run(ticks, slice_size, waiting_for_input)
+            self._line = lines[index] if index < count else None
+            yield waiting_for_input
+
+
+    def _compile_let(self, statement: LetStatement, index: int) -> Callable[[], int]:
+        values = self._values
+        target = self._slots[statement.target()]
+        value = statement.value()
+        following = index + 1
+
+        if type(value) is Variable:
+            source = self._slots[value.name()]
+
+            def let_variable() -> int:
+                values[target] = values[source]
+                return following
+
+            return let_variable
+        else:
+            constant = value.value()
+
+            def let_constant() -> int:
+                values[target] = constant
+                return following
+
+            return let_constant
+
+
+    def _compile_update(
+            self, statement: GrinStatement, index: int,
+            operation: Callable[[object, object], object],
+            report: Callable[[object, object, int], object]) -> Callable[[], int]:
+        values = self._values
+        target = self._slots[statement.target()]
+        value = statement.value()
+        line = statement.line()
+        following = index + 1
+
+        if type(value) is Variable:
+            source = self._slots[value.name()]
+
+            def update_by_variable() -> int:
+                current = values[target]
+                operand = values[source]
+
+                try:
+                    values[target] = operation(current, operand)
+                except TypeError:
+                    report(current, operand, line)
+
+                return following
+
+            return update_by_variable
+        else:
+            constant = value.value()
+
+            def update_by_constant() -> int:
+                current = values[target]
+
+                try:
+                    values[target] = operation(current, constant)
+                except TypeError:
+                    report(current, constant, line)
+
+                return following
+
+            return update_by_constant
+
+
+    def _compile_add(self, statement: AddStatement, index: int) -> Callable[[], int]:
+        return self._compile_update(statement, index, operator.add, add)
+
+
+    def _compile_sub(self, statement: SubStatement, index: int) -> Callable[[], int]:
+        return self._compile_update(statement, index, operator.sub, subtract)
+
+
+    def _compile_mult(self, statement: MultStatement, index: int) -> Callable[[], int]:
+        return self._compile_update(statement, index, operator.mul, multiply)
+
+
+    def _compile_div(self, statement: DivStatement, index: int) -> Callable[[], int]:
+        # Division has rules that Python's operators don't (integer division of
+        # integers, and zero divisors), so it's always left to divide().
+        values = self._values
+        target = self._slots[statement.target()]
+        evaluate = self._compile_operand(statement.value())
+        line = statement.line()
+        following = index + 1
+
+        def div() -> int:
+            values[target] = divide(values[target], evaluate(), line)
+            return following
+
+        return div
+
+
+    def _compile_print(self, statement: PrintStatement, index: int) -> Callable[[], int]:
+        output_line = self._output_line
+        value = statement.value()
+        following = index + 1
+
+        if type(value) is Variable:
+            values = self._values
+            source = self._slots[value.name()]
+
+            def print_variable() -> int:
+                output_line(str(values[source]))
+                return following
+
+            return print_variable
+        else:
+            text = str(value.value())
+
+            def print_constant() -> int:
+                output_line(text)
+                return following
+
+            return print_constant
+
+
+    def _compile_innum(self, statement: InNumStatement, index: int) -> Callable[[], int]:
+        values = self._values
+        input_line = self._input_line
+        target = self._slots[statement.target()]
+        line = statement.line()
+        following = index + 1
+
+        def innum() -> int:
+            values[target] = to_number(read_line(input_line, line), line)
+            return following
+
+        return innum
+
+
+    def _compile_instr(self, statement: InStrStatement, index: int) -> Callable[[], int]:
+        values = self._values
+        input_line = self._input_line
+        target = self._slots[statement.target()]
+        line = statement.line()
+        following = index + 1
+
+        def instr() -> int:
+            values[target] = read_line(input_line, line)
+            return following
+
+        return instr
+
+
+    def _compile_operand(self, operand: Constant | Variable) -> Callable[[], object]:
+        if type(operand) is Variable:
+            values = self._values
+            slot = self._slots[operand.name()]
+            return lambda: values[slot]
+        else:
+            value = operand.value()
+            return lambda: value
+
+
+    def _compile_condition(self, statement: JumpStatement) -> Callable[[], bool]:
+        condition = statement.condition()
+        left = self._compile_operand(condition.left())
+        right = self._compile_operand(condition.right())
+        comparison = COMPARISONS[condition.operator()]
+        line = statement.line()
+
+        return lambda: compare(comparison, left(), right(), line)
+
+
+    def _compile_destination(self, statement: JumpStatement, index: int) -> Callable[[], int]:
+        program = self._program
+
+        if program.is_resolved(index):
+            return lambda: program.destination(index)
+
+        target = self._compile_operand(statement.target())
+        labels = program.labels()
+        count = len(program.statements())
+        line = statement.line()
+
+        return lambda: jump_destination(target(), index, labels, count, line)
+
+
+    def _resolved_destination(self, index: int) -> int | None:
+        # The destination of a jump that's known before the program runs, or
+        # None if it has to be worked out (or an error reported) when it runs.
+        if not self._program.is_resolved(index):
+            return None
+
+        try:
+            return self._program.destination(index)
+        except GrinRuntimeError:
+            return None
+
+
+    def _compile_goto(self, statement: GotoStatement, index: int) -> Callable[[], int]:
+        destination = self._resolved_destination(index)
+        condition = statement.condition()
+        following = index + 1
+
+        if destination is not None and condition is None:
+            return lambda: destination
+        elif (destination is not None and type(condition.left()) is Variable
+                and type(condition.right()) is Constant):
+            # The usual way that loops end (e.g., GOTO "LOOP" IF I < 10) is
+            # common enough to be worth handling without any further calls.
+            values = self._values
+            slot = self._slots[condition.left().name()]
+            constant = condition.right().value()
+            constant_is_string = type(constant) is str
+            comparison = COMPARISONS[condition.operator()]
+            line = statement.line()
+
+            def goto_if_variable_compares_to_constant() -> int:
+                value = values[slot]
+
+                if (type(value) is str) is not constant_is_string:
+                    compare(comparison, value, constant, line)
+
+                return destination if comparison(value, constant) else following
+
+            return goto_if_variable_compares_to_constant
+
+        find_destination = self._compile_destination(statement, index)
+
+        if condition is None:
+            return find_destination
+
+        holds = self._compile_condition(statement)
+
+        def goto() -> int:
+            return find_destination() if holds() else following
+
+        return goto
+
+
+    def _compile_gosub(self, statement: GosubStatement, index: int) -> Callable[[], int]:
+        return_indexes = self._return_indexes
+        destination = self._resolved_destination(index)
+        following = index + 1
+
+        if destination is not None and statement.condition() is None:
+            def gosub_resolved() -> int:
+                return_indexes.append(following)
+                return destination
+
+            return gosub_resolved
+
+        find_destination = self._compile_destination(statement, index)
+        holds = self._compile_condition(statement) if statement.condition() is not None else None
+
+        def gosub() -> int:
+            if holds is not None and not holds():
+                return following
+
+            found = find_destination()
+            return_indexes.append(following)
+            return found
+
+        return gosub
+
+
+    def _compile_return(self, statement: ReturnStatement, index: int) -> Callable[[], int]:
+        return_indexes = self._return_indexes
+        line = statement.line()
+
+        def return_() -> int:
+            if not return_indexes:
+                raise runtime_error('RETURN without a matching GOSUB', line)
+
+            return return_indexes.pop()
+
+        return return_
+
+
+    def _compile_end(self, statement: EndStatement, index: int) -> Callable[[], int]:
+        count = len(self._program.statements())
+        return lambda: count
+
+
+    _COMPILERS = {
+        LetStatement: _compile_let,
+        AddStatement: _compile_add,
+        SubStatement: _compile_sub,
+        MultStatement: _compile_mult,
+        DivStatement: _compile_div,
+        PrintStatement: _compile_print,
+        InNumStatement: _compile_innum,
+        InStrStatement: _compile_instr,
+        GotoStatement: _compile_goto,
+        GosubStatement: _compile_gosub,
+        ReturnStatement: _compile_return,
+        EndStatement: _compile_end
+    }
+
+
+
+# The engines' classes, except for the bytecode engine's, which is in the
+# grin.bytecode_engine module, so that it (and grin.bytecode) is only imported
+# when a program runs on it.
+_ENGINES = {
+    'statements': _StatementInterpreter,
+    'closures': _ClosureInterpreter
+}
+
+ENGINES = (*_ENGINES, 'bytecode')
+
+
+
+__all__ = [
+    'DEFAULT_OUTPUT_BUFFER_SIZE',
+    'ENGINES',
+    'LIMIT_CHECK_INTERVAL',
+    interpret.__name__,
+    GrinOutputBuffer.__name__,
+    load_statements.__name__
+]
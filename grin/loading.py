@@ -0,0 +1,84 @@
+# loading.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Loads Grin programs from files, rather than from the standard input.  A file
+# is memory-mapped and lexed directly from the mapped bytes, so its text is
+# never read into a string (or split into lines) first; lexing stops at the "."
+# line that ends the program, if there is one.
+#
+# Unless asked not to, the parsed program is cached in a __grincache__
+# directory alongside the file by grin.caching, so that running the same file
+# again skips lexing and parsing.  grin.caching (and mmap) are only imported
+# when they're used, so that a program given as text that isn't cached, such
+# as one read by project3.py from the standard input, doesn't wait for them.
+
+from grin.ast import GrinStatement
+from grin.interpreter import interpret, load_statements
+from grin.lexing import to_program_tokens
+from grin.parsing import parse_statements
+import os
+
+
+
+def load_file(path: str | os.PathLike, *, cache: bool = True) -> list[GrinStatement]:
+    """Lexes and parses the Grin program in the given file, returning its
+    statements.  Raises a GrinLexError or GrinParseError if the program has a
+    lexical or syntax error.
+
+    If cache is True, the program is cached in a __grincache__ directory in
+    the same directory as the file, and loaded from there when the file hasn't
+    changed since it was cached."""
+    from grin.caching import CACHE_DIRECTORY_NAME
+    import mmap
+
+    cache_directory = os.path.join(os.path.dirname(path), CACHE_DIRECTORY_NAME) if cache else None
+
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # An empty file can't be memory-mapped, but it's an empty program.
+            return load_source(b'', cache_directory = cache_directory)
+
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as source:
+            return load_source(source, cache_directory = cache_directory)
+
+
+def load_source(
+        source: str | bytes | memoryview, *,
+        cache_directory: str | os.PathLike | None = None) -> list[GrinStatement]:
+    """Lexes and parses the given text of a Grin program, returning its
+    statements.  If cache_directory isn't None, the program is cached in that
+    directory, and loaded from there if it's been cached already."""
+
+    def parse() -> list[GrinStatement]:
+        return load_statements(parse_statements(to_program_tokens(source, defer_errors = True)))
+
+    if cache_directory is None:
+        return parse()
+
+    from grin.caching import GrinProgramCache
+
+    if isinstance(source, str):
+        source = source.encode(encoding = 'utf-8')
+
+    return GrinProgramCache(cache_directory).load(source, parse)
+
+
+def run_file(path: str | os.PathLike, *, cache: bool = True, **options) -> None:
+    """Runs the Grin program in the given file, which is loaded (and cached)
+    as load_file() does.  Any other keyword arguments (e.g., input_line or
+    engine) are passed along to grin.interpret().
+
+    Raises a GrinLexError or GrinParseError before the program runs if it has
+    a lexical or syntax error, or a GrinRuntimeError if an error occurs while
+    it runs."""
+    interpret(load_file(path, cache = cache), **options)
+
+
+
+__all__ = [
+    load_file.__name__,
+    load_source.__name__,
+    run_file.__name__
+]
@@ -12,17 +12,35 @@
 
 
 class GrinLocation:
-    """Describes a location within the text of a Grin program"""
+    """Describes a location within the text of a Grin program.  Locations are
+    immutable and interned, so that creating a GrinLocation with the same line
+    and column as one that already exists returns that same object."""
 
-    def __init__(self, line, column):
-        if int(line) < 1:
-            raise ValueError(f'Line in location cannot be non-positive, was {line}')
+    __slots__ = ('_line', '_column', '_hash')
 
-        if int(column) < 1:
-            raise ValueError(f'Column in location cannot be non-positive, was {column}')
 
-        self._line = line
-        self._column = column
+    def __new__(cls, line, column):
+        key = (line, column)
+        location = _interned.get(key)
+
+        if location is None:
+            if int(line) < 1:
+                raise ValueError(f'Line in location cannot be non-positive, was {line}')
+
+            if int(column) < 1:
+                raise ValueError(f'Column in location cannot be non-positive, was {column}')
+
+            location = object.__new__(cls)
+            object.__setattr__(location, '_line', line)
+            object.__setattr__(location, '_column', column)
+            object.__setattr__(location, '_hash', hash(key))
+
+            if len(_interned) >= _MAX_INTERNED:
+                _interned.clear()
+
+            _interned[key] = location
+
+        return location
 
 
     def line(self) -> int:
@@ -42,10 +60,37 @@ class GrinLocation:
 
 
     def __eq__(self, other):
-        return isinstance(other, GrinLocation) \
+        return self is other \
+                or isinstance(other, GrinLocation) \
                 and self._line == other._line \
                 and self._column == other._column
 
 
+    def __hash__(self):
+        return self._hash
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __reduce__(self):
+        return GrinLocation, (self._line, self._column)
+
+
+
+# Interning is a best-effort cache: when it fills, it's emptied and starts over,
+# so that lexing a huge program line by line can't grow it without bound.  (That
+# can leave two equal locations that aren't the same object, which is why
+# __eq__ still compares lines and columns when the objects differ.)
+_MAX_INTERNED = 1 << 16
+
+_interned = {}
+
+
 
 __all__ = [GrinLocation.__name__]
@@ -0,0 +1,325 @@
+# optimizing.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# An optional pass that runs between parsing and execution, producing a smaller
+# program that behaves identically (including the line numbers reported in
+# any GrinRuntimeError):
+#
+# * Conditions that compare two literal values are decided, so that the jump
+#   becomes unconditional, or is removed if it can never happen.
+# * A LET of a literal value followed by arithmetic on that variable with a
+#   literal value is folded into a single LET of the result.
+# * A LET that's immediately overwritten by another LET is removed.
+# * Unlabeled statements that can never execute are removed.
+#
+# Removing statements would change where relative jumps go, so the targets of
+# the remaining relative jumps are adjusted.  That's only possible when every
+# jump's target is literal, so nothing is removed (and no arithmetic is folded)
+# in a program in which any jump's target is a variable.
+
+from collections.abc import Iterable
+from grin.ast import Constant, Variable, GrinStatement, JumpStatement
+from grin.ast import LetStatement, AddStatement, SubStatement, MultStatement, DivStatement
+from grin.ast import GotoStatement, GosubStatement, ReturnStatement, EndStatement
+from grin.resolution import resolve
+from grin.runtime import add, subtract, multiply, divide, compare, COMPARISONS
+from grin.runtime import GrinRuntimeError
+
+
+
+class GrinOptimizedProgram:
+    """The result of optimizing a Grin program: the statements that remain,
+    along with a record of what was changed and why."""
+
+    def __init__(
+            self, statements: list[GrinStatement],
+            removed: list[tuple[GrinStatement, str]],
+            folded: list[tuple[GrinStatement, GrinStatement]]):
+        self._statements = statements
+        self._removed = removed
+        self._folded = folded
+
+
+    def statements(self) -> list[GrinStatement]:
+        return self._statements
+
+
+    def removed(self) -> list[tuple[GrinStatement, str]]:
+        """Returns each statement that was removed, along with the reason, in
+        the order the statements appeared in the original program."""
+        return self._removed
+
+
+    def folded(self) -> list[tuple[GrinStatement, GrinStatement]]:
+        """Returns each statement that was replaced by a simpler one, along
+        with its replacement, in the order they appeared in the program."""
+        return self._folded
+
+
+    def report(self) -> list[str]:
+        """Returns a line of text describing each change, in line order."""
+        changes = [
+            (statement.line(), f'Line {statement.line()}: removed ({reason})')
+            for statement, reason in self._removed
+        ]
+
+        changes.extend(
+            (original.line(), f'Line {original.line()}: folded into {_describe(replacement)}')
+            for original, replacement in self._folded)
+
+        return [change for _, change in sorted(changes)]
+
+
+
+def optimize(statements: Iterable[GrinStatement]) -> GrinOptimizedProgram:
+    """Optimizes a Grin program, given as a sequence of GrinStatements."""
+    return _Optimizer(list(statements)).optimize()
+
+
+
+_ALWAYS_FALSE = 'condition is always false'
+_UNREACHABLE = 'unreachable'
+_OVERWRITTEN = 'overwritten by the next statement'
+
+_FOLDABLE_OPERATIONS = {
+    AddStatement: add,
+    SubStatement: subtract,
+    MultStatement: multiply,
+    DivStatement: divide
+}
+
+
+
+class _Optimizer:
+    def __init__(self, statements: list[GrinStatement]):
+        self._original = statements
+        self._statements = list(statements)
+        self._resolved = resolve(statements)
+        self._reasons = {}
+        self._folded = {}
+
+
+    def optimize(self) -> GrinOptimizedProgram:
+        can_remove = not any(
+            isinstance(statement, JumpStatement) and type(statement.target()) is Variable
+            for statement in self._statements)
+
+        self._fold_conditions(can_remove)
+
+        if can_remove:
+            self._fold_arithmetic()
+            self._remove_overwritten()
+            self._remove_unreachable()
+
+        return GrinOptimizedProgram(
+            self._renumber(),
+            [(self._original[index], reason) for index, reason in sorted(self._reasons.items())],
+            [(self._original[index], self._statements[index])
+             for index in sorted(self._folded) if index not in self._reasons])
+
+
+    def _replace(self, index: int, statement: GrinStatement) -> None:
+        self._statements[index] = statement
+        self._folded[index] = True
+
+
+    def _fold_conditions(self, can_remove: bool) -> None:
+        for index, statement in enumerate(self._statements):
+            if not isinstance(statement, JumpStatement) or statement.condition() is None:
+                continue
+
+            condition = statement.condition()
+
+            if type(condition.left()) is not Constant or type(condition.right()) is not Constant:
+                continue
+
+            try:
+                holds = compare(
+                    COMPARISONS[condition.operator()],
+                    condition.left().value(), condition.right().value(), statement.line())
+            except GrinRuntimeError:
+                # Comparing a string to a number fails when the statement runs,
+                # which is left to happen.
+                continue
+
+            if holds:
+                self._replace(index, type(statement)(
+                    line = statement.line(), label = statement.label(),
+                    target = statement.target()))
+            elif can_remove and statement.label() is None:
+                self._reasons[index] = _ALWAYS_FALSE
+
+
+    def _jump_targets(self) -> set[int]:
+        return {
+            self._resolved.destination(index)
+            for index, statement in enumerate(self._statements)
+            if isinstance(statement, JumpStatement) and self._is_possible_jump(index)
+        }
+
+
+    def _is_possible_jump(self, index: int) -> bool:
+        try:
+            self._resolved.destination(index)
+            return True
+        except GrinRuntimeError:
+            return False
+
+
+    def _fold_arithmetic(self) -> None:
+        # The second statement of a pair can only be folded if nothing other
+        # than the first statement can lead to it.
+        jump_targets = self._jump_targets()
+
+        for index in range(len(self._statements) - 1):
+            first = self._statements[index]
+            second = self._statements[index + 1]
+
+            if (type(first) is LetStatement and type(first.value()) is Constant
+                    and type(second) in _FOLDABLE_OPERATIONS
+                    and second.target() == first.target()
+                    and type(second.value()) is Constant
+                    and second.label() is None
+                    and index + 1 not in jump_targets
+                    and index not in self._reasons):
+                try:
+                    result = _FOLDABLE_OPERATIONS[type(second)](
+                        first.value().value(), second.value().value(), second.line())
+                except GrinRuntimeError:
+                    continue
+
+                self._replace(index + 1, LetStatement(
+                    line = second.line(), target = second.target(), value = Constant(result)))
+
+
+    def _remove_overwritten(self) -> None:
+        for index in range(len(self._statements) - 1):
+            first = self._statements[index]
+            second = self._statements[index + 1]
+
+            if (type(first) is LetStatement and first.label() is None
+                    and type(second) is LetStatement
+                    and second.target() == first.target()
+                    and second.value() != Variable(first.target())
+                    and index not in self._reasons):
+                self._reasons[index] = _OVERWRITTEN
+
+
+    def _remove_unreachable(self) -> None:
+        reachable = set()
+        pending = [0]
+        count = len(self._statements)
+
+        while pending:
+            index = pending.pop()
+
+            if index >= count or index in reachable:
+                continue
+
+            reachable.add(index)
+            pending.extend(self._successors(index))
+
+        for index, statement in enumerate(self._statements):
+            if index not in reachable and statement.label() is None and index not in self._reasons:
+                self._reasons[index] = _UNREACHABLE
+
+
+    def _successors(self, index: int) -> list[int]:
+        statement = self._statements[index]
+
+        if type(statement) in (ReturnStatement, EndStatement):
+            # The statements to which a RETURN goes are found from the GOSUBs.
+            return []
+        elif not isinstance(statement, JumpStatement) or self._reasons.get(index) == _ALWAYS_FALSE:
+            return [index + 1]
+
+        successors = []
+
+        if self._is_possible_jump(index):
+            successors.append(self._resolved.destination(index))
+
+            if type(statement) is GosubStatement:
+                successors.append(index + 1)
+
+        if statement.condition() is not None:
+            successors.append(index + 1)
+
+        return successors
+
+
+    def _renumber(self) -> list[GrinStatement]:
+        new_indexes = self._new_indexes()
+        result = []
+
+        for index, statement in enumerate(self._statements):
+            if index in self._reasons:
+                continue
+
+            if self._is_relative_jump(index):
+                offset = new_indexes[self._resolved.destination(index)] - new_indexes[index]
+
+                if offset != statement.target().value():
+                    statement = type(statement)(
+                        line = statement.line(), label = statement.label(),
+                        target = Constant(offset), condition = statement.condition())
+
+            result.append(statement)
+
+        return result
+
+
+    def _new_indexes(self) -> list[int]:
+        # Each original index maps to the index of the first statement that
+        # remains at or after it.  A relative jump to a removed statement that
+        # would, as a result, become a jump to itself (which is an error) keeps
+        # the statement it jumped to, instead.
+        while True:
+            new_indexes = []
+            remaining = 0
+
+            for index in range(len(self._statements)):
+                new_indexes.append(remaining)
+
+                if index not in self._reasons:
+                    remaining += 1
+
+            new_indexes.append(remaining)
+
+            kept = [
+                self._resolved.destination(index)
+                for index in range(len(self._statements))
+                if index not in self._reasons and self._is_relative_jump(index)
+                and self._resolved.destination(index) != index
+                and new_indexes[self._resolved.destination(index)] == new_indexes[index]
+            ]
+
+            if not kept:
+                return new_indexes
+
+            for index in kept:
+                del self._reasons[index]
+
+
+    def _is_relative_jump(self, index: int) -> bool:
+        statement = self._statements[index]
+
+        return (isinstance(statement, JumpStatement) and type(statement.target()) is Constant
+                and type(statement.target().value()) is int and self._is_possible_jump(index))
+
+
+def _describe(statement: GrinStatement) -> str:
+    if type(statement) is LetStatement:
+        return f'LET {statement.target()} {statement.value().value()!r}'
+    elif type(statement) is GotoStatement:
+        return 'GOTO without a condition'
+    else:
+        return 'GOSUB without a condition'
+
+
+
+__all__ = [
+    optimize.__name__,
+    GrinOptimizedProgram.__name__
+]
@@ -9,14 +9,30 @@
 # if there are no parse errors (e.g., a statement that doesn't start with a
 # keyword, a GOTO statement that's missing a target, etc.) on the line.  When
 # a parse error is detected, a GrinParseError is raised instead.
+# parse_statements() does the same job, but generates a GrinStatement (see
+# grin.ast) for each line, rather than its tokens.
+#
+# When lines are given as strings, each one is lexed and checked separately,
+# which is wasted work when the same text appears on many lines (as "ADD I 1"
+# or "RETURN" often do).  So a GrinLineCache remembers the kinds, texts,
+# values, and columns of the tokens on recently parsed lines, keyed by their
+# text; only the line number in their locations differs from one occurrence to
+# the next.  Lines with errors aren't cached, so errors are always reported
+# exactly as they would be otherwise.
 #
 # WHAT YOU'LL NEED TO DO: Nothing.  This module is provided in its entirety,
 # and it should not be necessary to change it.
 
-from typing import Callable, Iterable, NoReturn
-from grin.lexing import to_tokens
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from grin.ast import Constant, Variable, JumpCondition, GrinStatement
+from grin.ast import LetStatement, AddStatement, SubStatement, MultStatement, DivStatement
+from grin.ast import PrintStatement, InNumStatement, InStrStatement
+from grin.ast import GotoStatement, GosubStatement, ReturnStatement, EndStatement
+from grin.lexing import to_tokens, GrinLexedProgram
 from grin.location import GrinLocation
 from grin.token import GrinTokenKind, GrinToken
+from grin.token import COMPARISON_OPERATOR_MASK, JUMP_TARGET_MASK, KIND_BITS, KINDS_BY_INDEX, VALUE_MASK
 
 
 
@@ -36,167 +52,436 @@ class GrinParseError(Exception):
 
 
 
-def parse(lines: Iterable[str]) -> Iterable[list[GrinToken]]:
-    """Given a sequence of strings containing lines of Grin code, generates a
-    corresponding sequence of lists of GrinTokens, each being the tokens
-    found on the corresponding line of input code.
+def _describe(*kinds: GrinTokenKind) -> str:
+    return ', '.join(str(kind) for kind in kinds)
 
-    Raises a GrinParseError when there is a parse error on a line, so that
-    you'll only ever receive valid lists of GrinTokens from this function."""
 
-    for line_number, line in enumerate(lines, start = 1):
-        tokens = _parse_line(line, line_number)
+# What the parser expects to find at each point in a statement, as a mask of
+# the acceptable kinds of tokens and the message reported when the token found
+# is not one of them.  The messages list the kinds in a fixed order, which is
+# why they're not derived from the masks.
+_EXPECTED_IDENTIFIER = (
+    GrinTokenKind.IDENTIFIER.bit(),
+    _describe(GrinTokenKind.IDENTIFIER))
 
-        if len(tokens) == 1 and tokens[0].kind() == GrinTokenKind.DOT:
-            return
+_EXPECTED_COLON = (
+    GrinTokenKind.COLON.bit(),
+    _describe(GrinTokenKind.COLON))
 
-        yield tokens
+_EXPECTED_JUMP_TARGET = (
+    JUMP_TARGET_MASK,
+    _describe(
+        GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING,
+        GrinTokenKind.IDENTIFIER))
 
+_EXPECTED_VALUE = (
+    VALUE_MASK,
+    _describe(
+        GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
+        GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER))
 
-def _parse_line(line: str, line_number: int) -> list[GrinToken]:
-    tokens = list(to_tokens(line, line_number))
-    index = 0
+_EXPECTED_COMPARISON_OPERATOR = (
+    COMPARISON_OPERATOR_MASK,
+    _describe(
+        GrinTokenKind.EQUAL, GrinTokenKind.NOT_EQUAL,
+        GrinTokenKind.LESS_THAN, GrinTokenKind.LESS_THAN_OR_EQUAL,
+        GrinTokenKind.GREATER_THAN, GrinTokenKind.GREATER_THAN_OR_EQUAL))
 
 
-    def _raise_error_on_token(message: str, token: GrinToken) -> NoReturn:
-        raise GrinParseError(message, token.location())
+# The grammar of a statement's body, as the sequence of expectations that must
+# be met by the tokens following each statement keyword, indexed by the index
+# of the keyword's kind.  Kinds that don't begin a statement have no entry.
+_VARIABLE_UPDATE = (_EXPECTED_IDENTIFIER, _EXPECTED_VALUE)
+_PRINT = (_EXPECTED_VALUE,)
+_INPUT = (_EXPECTED_IDENTIFIER,)
+_JUMP = (_EXPECTED_JUMP_TARGET,)
+_EMPTY = ()
 
 
-    def _raise_error_at_end_of_line(message: str) -> NoReturn:
-        raise GrinParseError(message, GrinLocation(line_number, len(line) + 1))
+_STATEMENTS = (
+    (GrinTokenKind.LET, _VARIABLE_UPDATE, LetStatement),
+    (GrinTokenKind.PRINT, _PRINT, PrintStatement),
+    (GrinTokenKind.INNUM, _INPUT, InNumStatement),
+    (GrinTokenKind.INSTR, _INPUT, InStrStatement),
+    (GrinTokenKind.ADD, _VARIABLE_UPDATE, AddStatement),
+    (GrinTokenKind.SUB, _VARIABLE_UPDATE, SubStatement),
+    (GrinTokenKind.MULT, _VARIABLE_UPDATE, MultStatement),
+    (GrinTokenKind.DIV, _VARIABLE_UPDATE, DivStatement),
+    (GrinTokenKind.GOTO, _JUMP, GotoStatement),
+    (GrinTokenKind.GOSUB, _JUMP, GosubStatement),
+    (GrinTokenKind.RETURN, _EMPTY, ReturnStatement),
+    (GrinTokenKind.END, _EMPTY, EndStatement)
+)
 
 
-    def _token_is(*kinds: GrinTokenKind) -> bool:
-        return index < len(tokens) and tokens[index].kind() in kinds
+def _index_by_kind(pairs: Iterable[tuple[GrinTokenKind, object]]) -> tuple:
+    table = [None] * len(KIND_BITS)
 
+    for kind, entry in pairs:
+        table[kind.index()] = entry
 
-    def _expect(*kinds: GrinTokenKind) -> None:
-        if not _token_is(*kinds):
-            message = ', '.join(str(kind) for kind in kinds)
+    return tuple(table)
 
-            if index >= len(tokens):
-                _raise_error_at_end_of_line(message)
-            else:
-                _raise_error_on_token(message, tokens[index])
 
+_BODY_GRAMMAR = _index_by_kind((kind, grammar) for kind, grammar, _ in _STATEMENTS)
+_STATEMENT_TYPES = _index_by_kind((kind, statement_type) for kind, _, statement_type in _STATEMENTS)
 
-    def _parse_label() -> None:
-        nonlocal index
+# Jumps can optionally be followed by a condition, which is introduced by IF.
+_CONDITIONAL_MASK = GrinTokenKind.GOTO.bit() | GrinTokenKind.GOSUB.bit()
+_CONDITION = (_EXPECTED_VALUE, _EXPECTED_COMPARISON_OPERATOR, _EXPECTED_VALUE)
 
-        if _token_is(GrinTokenKind.IDENTIFIER):
-            index += 1
-            _expect(GrinTokenKind.COLON)
-            index += 1
+_IDENTIFIER_BIT = GrinTokenKind.IDENTIFIER.bit()
+_IDENTIFIER_INDEX = GrinTokenKind.IDENTIFIER.index()
+_COLON_BIT = GrinTokenKind.COLON.bit()
+_IF_INDEX = GrinTokenKind.IF.index()
+_DOT_INDEX = GrinTokenKind.DOT.index()
 
 
-    def _parse_variable_update() -> None:
-        nonlocal index
-        _expect(GrinTokenKind.IDENTIFIER)
-        index += 1
-        _parse_value()
 
+DEFAULT_LINE_CACHE_SIZE = 4096
 
-    def _parse_print() -> None:
-        nonlocal index
-        _parse_value()
 
 
-    def _parse_input() -> None:
-        nonlocal index
-        _expect(GrinTokenKind.IDENTIFIER)
-        index += 1
+class GrinLineCache:
+    """A cache of the lines that have been lexed and found to be valid, keyed
+    by their text, which holds at most max_size lines, discarding the least
+    recently used line when it's full."""
 
+    def __init__(self, max_size: int = DEFAULT_LINE_CACHE_SIZE):
+        if max_size < 0:
+            raise ValueError('max_size cannot be negative')
 
-    def _parse_jump() -> None:
-        nonlocal index
-        _parse_jump_target()
+        self._max_size = max_size
+        self._lines = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
 
-        if _token_is(GrinTokenKind.IF):
-            index += 1
-            _parse_value()
-            _parse_comparison_operator()
-            _parse_value()
 
+    def max_size(self) -> int:
+        return self._max_size
 
-    def _parse_empty() -> None:
-        pass
 
+    def hits(self) -> int:
+        """Returns the number of times a line was found in the cache."""
+        return self._hits
 
-    _BODY_PARSERS: dict[GrinTokenKind, Callable[[], None]] = {
-        GrinTokenKind.LET: _parse_variable_update,
-        GrinTokenKind.PRINT: _parse_print,
-        GrinTokenKind.INNUM: _parse_input,
-        GrinTokenKind.INSTR: _parse_input,
-        GrinTokenKind.ADD: _parse_variable_update,
-        GrinTokenKind.SUB: _parse_variable_update,
-        GrinTokenKind.MULT: _parse_variable_update,
-        GrinTokenKind.DIV: _parse_variable_update,
-        GrinTokenKind.GOTO: _parse_jump,
-        GrinTokenKind.GOSUB: _parse_jump,
-        GrinTokenKind.RETURN: _parse_empty,
-        GrinTokenKind.END: _parse_empty
-    }
 
+    def misses(self) -> int:
+        """Returns the number of times a line was not found in the cache."""
+        return self._misses
 
-    def _parse_body() -> None:
-        nonlocal index
 
-        if tokens[index].kind() in _BODY_PARSERS:
-            kind = tokens[index].kind()
-            index += 1
-            _BODY_PARSERS[kind]()
+    def evictions(self) -> int:
+        """Returns the number of lines that were discarded to make room for
+        others."""
+        return self._evictions
+
+
+    def clear(self) -> None:
+        """Discards every line in the cache, and resets its statistics."""
+        self._lines.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+
+    def _parse(self, line: str, line_number: int) -> '_ParsedLine':
+        parsed = self._lines.get(line)
+
+        if parsed is not None:
+            self._hits += 1
+            self._lines.move_to_end(line)
+            return parsed
+
+        self._misses += 1
+        parsed = _parse_line(line, line_number)
+
+        if self._max_size > 0:
+            self._lines[line] = parsed
+
+            if len(self._lines) > self._max_size:
+                self._lines.popitem(last = False)
+                self._evictions += 1
+
+        return parsed
+
+
+
+class _ParsedLine:
+    """The tokens on a valid line, without the line number, from which the
+    tokens or statement for any occurrence of the line can be built."""
+
+    __slots__ = ('kinds', 'texts', 'values', 'columns')
+
+
+    def __init__(self, tokens: list[GrinToken]):
+        self.kinds = tuple(token.kind().index() for token in tokens)
+        self.texts = tuple(token.text() for token in tokens)
+        self.values = tuple(token.value() for token in tokens)
+        self.columns = tuple(token.location().column() for token in tokens)
+
+
+    def is_end_of_program(self) -> bool:
+        return len(self.kinds) == 1 and self.kinds[0] == _DOT_INDEX
+
+
+    def tokens(self, line_number: int) -> list[GrinToken]:
+        return [
+            GrinToken(
+                kind = KINDS_BY_INDEX[kind], text = text, value = value,
+                location = GrinLocation(line_number, column))
+            for kind, text, value, column in zip(self.kinds, self.texts, self.values, self.columns)
+        ]
+
+
+    def statement(self, line_number: int) -> GrinStatement:
+        return _build_statement(self.kinds, self.values.__getitem__, 0, len(self.kinds), line_number)
+
+
+
+_SHARED_LINE_CACHE = GrinLineCache()
+
+
+def shared_line_cache() -> GrinLineCache:
+    """Returns the GrinLineCache that parse() and parse_statements() use unless
+    they're given another one."""
+    return _SHARED_LINE_CACHE
+
+
+def parse(
+        lines: Iterable[str] | GrinLexedProgram,
+        *, first_line: int = 1,
+        line_cache: GrinLineCache | None = _SHARED_LINE_CACHE) -> Iterable[list[GrinToken]]:
+    """Given a sequence of strings containing lines of Grin code, generates a
+    corresponding sequence of lists of GrinTokens, each being the tokens
+    found on the corresponding line of input code.  Alternatively, the lines
+    can be given as a GrinLexedProgram, when the program was lexed all at once.
+    When the lines are strings, first_line is the line number of the first of
+    them, for when they're only part of a program, and lines are looked up in
+    line_cache (unless it's None) before they're lexed.
+
+    Raises a GrinParseError when there is a parse error on a line, so that
+    you'll only ever receive valid lists of GrinTokens from this function."""
+
+    if isinstance(lines, GrinLexedProgram):
+        yield from _parse_lexed_program(lines)
+        return
+
+    for parsed, line_number in _parse_lines(lines, first_line, line_cache):
+        yield parsed.tokens(line_number)
+
+
+def parse_statements(
+        lines: Iterable[str] | GrinLexedProgram,
+        *, first_line: int = 1,
+        line_cache: GrinLineCache | None = _SHARED_LINE_CACHE) -> Iterable[GrinStatement]:
+    """Given the same input as parse(), generates a corresponding sequence of
+    GrinStatements instead of lists of GrinTokens.
+
+    Raises a GrinParseError when there is a parse error on a line."""
+
+    if isinstance(lines, GrinLexedProgram):
+        tokens = lines.tokens()
+        kinds = tokens.kind_indexes()
+        value_of = tokens.value
+
+        for start, end, line_number in _parse_line_ranges(lines):
+            yield _build_statement(kinds, value_of, start, end, line_number)
+    else:
+        for parsed, line_number in _parse_lines(lines, first_line, line_cache):
+            yield parsed.statement(line_number)
+
+
+def to_statement(tokens: list[GrinToken]) -> GrinStatement:
+    """Given the tokens on one line of a Grin program, as generated by parse(),
+    returns the corresponding GrinStatement."""
+    kinds = [token.kind().index() for token in tokens]
+    values = [token.value() for token in tokens]
+
+    return _build_statement(
+        kinds, values.__getitem__, 0, len(tokens), tokens[0].location().line())
+
+
+def _parse_lines(
+        lines: Iterable[str], first_line: int,
+        line_cache: GrinLineCache | None) -> Iterable[tuple[_ParsedLine, int]]:
+    for line_number, line in enumerate(lines, start = first_line):
+        if line_cache is None:
+            parsed = _parse_line(line, line_number)
         else:
-            _raise_error_on_token('Statement keyword expected', tokens[index])
+            parsed = line_cache._parse(line, line_number)
 
+        if parsed.is_end_of_program():
+            return
 
-    def _parse_jump_target() -> None:
-        nonlocal index
+        yield parsed, line_number
 
-        _expect(
-            GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING,
-            GrinTokenKind.IDENTIFIER)
 
-        index += 1
+def _parse_line(line: str, line_number: int) -> _ParsedLine:
+    tokens = list(to_tokens(line, line_number))
+    kinds = [token.kind().index() for token in tokens]
+    error = _find_error(kinds, 0, len(kinds))
+
+    if error is not None:
+        message, index = error
+
+        if index < len(tokens):
+            raise GrinParseError(message, tokens[index].location())
+        else:
+            raise GrinParseError(message, GrinLocation(line_number, len(line) + 1))
 
+    return _ParsedLine(tokens)
 
-    def _parse_value() -> None:
-        nonlocal index
 
-        _expect(
-            GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
-            GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER)
+def _parse_lexed_program(lexed: GrinLexedProgram) -> Iterable[list[GrinToken]]:
+    tokens = lexed.tokens()
+
+    for start, end, _ in _parse_line_ranges(lexed):
+        yield tokens.tokens(start, end)
+
+
+def _parse_line_ranges(lexed: GrinLexedProgram) -> Iterable[tuple[int, int, int]]:
+    tokens = lexed.tokens()
+    kinds = tokens.kind_indexes()
+
+    for line_number in range(1, lexed.line_count() + 1):
+        start, end = lexed.line_range(line_number)
+        error = _find_error(kinds, start, end)
+
+        if error is not None:
+            message, index = error
+
+            if index < end:
+                raise GrinParseError(message, tokens.location(index))
+            else:
+                raise GrinParseError(
+                    message, GrinLocation(line_number, lexed.line_length(line_number) + 1))
+        elif end - start == 1 and kinds[start] == _DOT_INDEX:
+            return
+
+        yield start, end, line_number
+
+    if lexed.error() is not None:
+        raise lexed.error()
+
+
+def _find_error(kinds: Sequence[int], index: int, end: int) -> tuple[str, int] | None:
+    """Checks whether the tokens whose kinds' indexes are in kinds[index:end]
+    form a valid line of Grin code (either a statement, with or without a label,
+    or the dot that ends a program).  Returns None if so; otherwise, returns an
+    error message, along with the index of the offending token (or end, if the
+    line ended too soon)."""
+
+    if index == end:
+        return 'Program lines cannot be empty', end
+    elif end - index == 1 and kinds[index] == _DOT_INDEX:
+        return None
+
+    if KIND_BITS[kinds[index]] & _IDENTIFIER_BIT:
+        index += 1
+
+        if index == end or not KIND_BITS[kinds[index]] & _COLON_BIT:
+            return _EXPECTED_COLON[1], index
 
         index += 1
 
+        if index == end:
+            return 'Statement body expected', end
+
+    keyword = kinds[index]
+    expectations = _BODY_GRAMMAR[keyword]
 
-    def _parse_comparison_operator() -> None:
-        nonlocal index
+    if expectations is None:
+        return 'Statement keyword expected', index
 
-        _expect(
-            GrinTokenKind.EQUAL, GrinTokenKind.NOT_EQUAL,
-            GrinTokenKind.LESS_THAN, GrinTokenKind.LESS_THAN_OR_EQUAL,
-            GrinTokenKind.GREATER_THAN, GrinTokenKind.GREATER_THAN_OR_EQUAL)
+    index += 1
+
+    for mask, message in expectations:
+        if index == end or not KIND_BITS[kinds[index]] & mask:
+            return message, index
 
         index += 1
 
+    if index < end and kinds[index] == _IF_INDEX and KIND_BITS[keyword] & _CONDITIONAL_MASK:
+        index += 1
 
-    if len(tokens) == 0:
-        _raise_error_at_end_of_line('Program lines cannot be empty')
-    elif len(tokens) == 1 and tokens[0].kind() == GrinTokenKind.DOT:
-        return tokens
+        for mask, message in _CONDITION:
+            if index == end or not KIND_BITS[kinds[index]] & mask:
+                return message, index
 
-    _parse_label()
+            index += 1
 
-    if index >= len(tokens):
-        _raise_error_at_end_of_line('Statement body expected')
+    if index < end:
+        return 'Extra tokens after statement end', index
 
-    _parse_body()
+    return None
 
-    if index < len(tokens):
-        _raise_error_on_token('Extra tokens after statement end', tokens[index])
 
-    return tokens
+def _build_statement(
+        kinds: Sequence[int], value_of: Callable[[int], object],
+        index: int, end: int, line_number: int) -> GrinStatement:
+    """Builds the statement whose tokens are at kinds[index:end], which have
+    already been found to be valid, given a function that returns the value of
+    the token at an index."""
 
+    label = None
 
+    if kinds[index] == _IDENTIFIER_INDEX:
+        label = value_of(index)
+        index += 2
 
-__all__ = [parse.__name__, GrinParseError.__name__]
+    keyword = kinds[index]
+    grammar = _BODY_GRAMMAR[keyword]
+    statement_type = _STATEMENT_TYPES[keyword]
+    index += 1
+
+    if grammar is _VARIABLE_UPDATE:
+        return statement_type(
+            line = line_number, label = label, target = value_of(index),
+            value = _make_operand(kinds, value_of, index + 1))
+    elif grammar is _JUMP:
+        if index + 1 < end:
+            condition = JumpCondition(
+                left = _make_operand(kinds, value_of, index + 2),
+                operator = KINDS_BY_INDEX[kinds[index + 3]],
+                right = _make_operand(kinds, value_of, index + 4))
+        else:
+            condition = None
+
+        return statement_type(
+            line = line_number, label = label,
+            target = _make_operand(kinds, value_of, index), condition = condition)
+    elif grammar is _PRINT:
+        return statement_type(
+            line = line_number, label = label,
+            value = _make_operand(kinds, value_of, index))
+    elif grammar is _INPUT:
+        return statement_type(line = line_number, label = label, target = value_of(index))
+    else:
+        return statement_type(line = line_number, label = label)
+
+
+def _make_operand(
+        kinds: Sequence[int], value_of: Callable[[int], object],
+        index: int) -> Constant | Variable:
+    if kinds[index] == _IDENTIFIER_INDEX:
+        return Variable(value_of(index))
+    else:
+        return Constant(value_of(index))
+
+
+
+__all__ = [
+    'DEFAULT_LINE_CACHE_SIZE',
+    parse.__name__,
+    parse_statements.__name__,
+    shared_line_cache.__name__,
+    to_statement.__name__,
+    GrinLineCache.__name__,
+    GrinParseError.__name__
+]
@@ -0,0 +1,214 @@
+# profiling.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A profiler for Grin programs, which counts how many times each line of a
+# program executes and how long it takes, as well as how many times each
+# subroutine (i.e., each destination of a GOSUB) is called and how long it
+# takes, from the GOSUB until its matching RETURN.
+#
+# A program is profiled by passing a GrinProfile to grin.interpret(), which
+# only the closures engine supports.  Rather than checking whether to profile
+# every time a statement executes, that engine's compiled statements are
+# replaced with ones that record what they do, so a program that isn't being
+# profiled runs exactly as quickly as it otherwise would.
+#
+# Afterward, the GrinProfile can produce a report, or be written to a file
+# in the format of Python's pstats module, so that it can be viewed with tools
+# that display Python profiles (e.g., "python -m pstats PATH").
+
+from collections.abc import Callable
+from grin.ast import GrinStatement, GosubStatement, ReturnStatement
+import time
+
+
+
+class GrinProfile:
+    """The statistics collected while profiling a Grin program."""
+
+    def __init__(self):
+        self._lines = []
+        self._counts = []
+        self._times = []
+        self._subroutines = {}
+
+
+    def lines(self) -> list[tuple[int, int, float]]:
+        """Returns the line number, execution count, and total time (in
+        seconds) of every statement that executed, the most time first.  The
+        time is only the statement's own, so a GOSUB's doesn't include the
+        subroutine it calls."""
+        return sorted(
+            (
+                (line, count, seconds)
+                for line, count, seconds in zip(self._lines, self._counts, self._times)
+                if count > 0
+            ),
+            key = lambda statistics: (-statistics[2], statistics[0]))
+
+
+    def subroutines(self) -> list[tuple[int, str, int, float]]:
+        """Returns the line number and name (its label, if it has one) of every
+        subroutine that was called, along with how many times it was called
+        and its total time (in seconds), the most time first.  The time of a
+        recursive call is only counted once, as part of the outermost one."""
+        return sorted(
+            (
+                (line, name, calls, seconds)
+                for line, (name, calls, seconds) in self._subroutines.items()
+            ),
+            key = lambda statistics: (-statistics[3], statistics[0]))
+
+
+    def report(self, source: str | None = None) -> str:
+        """Returns a report of the statistics, including the text of each line
+        if the source of the program is given."""
+        source_lines = _split_source(source)
+        report_lines = [f'{"Line":>6} {"Count":>10} {"Time (ms)":>12} {"Per call (us)":>14}  Statement']
+
+        for line, count, seconds in self.lines():
+            report_lines.append(
+                f'{line:>6} {count:>10} {seconds * 1e3:>12.3f} {seconds / count * 1e6:>14.3f}  '
+                f'{_text_of(source_lines, line)}')
+
+        if self._subroutines:
+            report_lines.extend(['', f'{"Line":>6} {"Calls":>10} {"Time (ms)":>12} {"Per call (us)":>14}  Subroutine'])
+
+            for line, name, calls, seconds in self.subroutines():
+                report_lines.append(
+                    f'{line:>6} {calls:>10} {seconds * 1e3:>12.3f} {seconds / calls * 1e6:>14.3f}  {name}')
+
+        return '\n'.join(report_lines)
+
+
+    def write_pstats(self, path: str, source: str | None = None, program_name: str = 'program.grin') -> None:
+        """Writes the statistics to a file in the format of Python's pstats
+        module, in which each line and each subroutine is a function, whose
+        name includes the text of the line if the source is given."""
+        import marshal
+
+        source_lines = _split_source(source)
+        statistics = {}
+
+        for line, count, seconds in self.lines():
+            name = f'line {line}: {_text_of(source_lines, line)}' if source_lines else f'line {line}'
+            statistics[(program_name, line, name)] = (count, count, seconds, seconds, {})
+
+        for line, name, calls, seconds in self.subroutines():
+            statistics[(program_name, line, f'GOSUB {name}')] = (calls, calls, 0.0, seconds, {})
+
+        with open(path, 'wb') as file:
+            marshal.dump(statistics, file)
+
+
+    def instrument(
+            self, instructions: list[Callable[[], int]],
+            statements: list[GrinStatement],
+            return_indexes: list[int]) -> list[Callable[[], int]]:
+        """Given the compiled statements of a program run by the closures
+        engine (each a function returning the index of the statement that
+        executes next), along with the statements themselves and the engine's
+        stack of return indexes, returns compiled statements that do the same
+        while recording their executions in this profile."""
+        lines = [statement.line() for statement in statements]
+        self._lines = lines
+        self._counts = [0] * len(instructions)
+        self._times = [0.0] * len(instructions)
+        self._subroutines = {}
+
+        # The subroutines that have been called but haven't returned yet, as
+        # (line, start time) pairs, and how many calls of each are active, so
+        # that recursive calls aren't counted twice.
+        active = []
+        active_counts = {}
+
+        def record_call(destination: int) -> None:
+            line = lines[destination] if destination < len(lines) else lines[-1] + 1
+            name = statements[destination].label() if destination < len(lines) else None
+
+            if line not in self._subroutines:
+                self._subroutines[line] = [name or f'line {line}', 0, 0.0]
+
+            self._subroutines[line][1] += 1
+            active_counts[line] = active_counts.get(line, 0) + 1
+            active.append((line, time.perf_counter()))
+
+        def record_return() -> None:
+            line, start = active.pop()
+            active_counts[line] -= 1
+
+            if active_counts[line] == 0:
+                self._subroutines[line][2] += time.perf_counter() - start
+
+        return [
+            self._instrument(index, instruction, statements[index], return_indexes, record_call, record_return)
+            for index, instruction in enumerate(instructions)
+        ]
+
+
+    def _instrument(
+            self, index: int, instruction: Callable[[], int], statement: GrinStatement,
+            return_indexes: list[int],
+            record_call: Callable[[int], None],
+            record_return: Callable[[], None]) -> Callable[[], int]:
+        counts = self._counts
+        times = self._times
+        clock = time.perf_counter
+
+        if type(statement) is GosubStatement:
+            def profiled_gosub() -> int:
+                depth = len(return_indexes)
+                start = clock()
+
+                try:
+                    destination = instruction()
+                finally:
+                    counts[index] += 1
+                    times[index] += clock() - start
+
+                if len(return_indexes) > depth:
+                    record_call(destination)
+
+                return destination
+
+            return profiled_gosub
+        elif type(statement) is ReturnStatement:
+            def profiled_return() -> int:
+                start = clock()
+
+                try:
+                    destination = instruction()
+                finally:
+                    counts[index] += 1
+                    times[index] += clock() - start
+
+                record_return()
+                return destination
+
+            return profiled_return
+        else:
+            def profiled() -> int:
+                start = clock()
+
+                try:
+                    return instruction()
+                finally:
+                    counts[index] += 1
+                    times[index] += clock() - start
+
+            return profiled
+
+
+def _split_source(source: str | None) -> list[str]:
+    return source.splitlines() if source is not None else []
+
+
+def _text_of(source_lines: list[str], line: int) -> str:
+    return source_lines[line - 1].strip() if line <= len(source_lines) else ''
+
+
+
+__all__ = [
+    GrinProfile.__name__
+]
@@ -0,0 +1,160 @@
+# reading.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A buffered reader for the standard input (or any other binary stream), from
+# which a Grin program is read, followed by the lines of input that its INNUM
+# and INSTR statements read.  Reading is done in large chunks rather than a
+# line at a time, and a program is found by searching the chunks for the "."
+# that ends it, without decoding or splitting the lines before it.
+#
+# Lines end with "\n" or "\r\n", either of which is removed from each line
+# that's read.
+
+import io
+
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+
+class GrinInputReader:
+    """Reads a Grin program, then lines of input, from a binary stream."""
+
+    def __init__(self, stream: io.BufferedIOBase, *, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._position = 0
+        self._at_end = False
+
+        # read1() returns whatever is available (e.g., a line typed into a
+        # terminal) rather than waiting until a whole chunk has been read.
+        self._read_chunk = getattr(stream, 'read1', stream.read)
+
+
+    def read_program(self) -> bytes:
+        """Reads lines until one consists only of a ".", returning the text of
+        the lines before it, or every remaining line if there is no such
+        line.  The lines after it are left to be read by read_line()."""
+        search_from = self._position
+
+        while True:
+            end, after = self._find_end_of_program(search_from)
+
+            if end is not None:
+                break
+            elif self._at_end:
+                end = after = len(self._buffer)
+                break
+
+            read_count = self._fill()
+
+            # A "." line might straddle the chunks, so the search resumes a few
+            # bytes before the new ones.
+            search_from = max(self._position, len(self._buffer) - read_count - 3)
+
+        program = bytes(self._buffer[self._position:end])
+        self._position = after
+        return program
+
+
+    def read_line(self) -> str:
+        """Reads the next line, returning it without its line ending.  Raises
+        EOFError if there are no more lines, as input() does."""
+        search_from = self._position
+
+        while True:
+            newline = self._buffer.find(b'\n', search_from)
+
+            if newline >= 0:
+                line = self._decode(self._position, newline)
+                self._position = newline + 1
+                return line
+
+            read_count = self._fill()
+
+            if read_count == 0:
+                break
+
+            search_from = len(self._buffer) - read_count
+
+        if self._position == len(self._buffer):
+            raise EOFError('No more input')
+
+        line = self._decode(self._position, len(self._buffer))
+        self._position = len(self._buffer)
+        return line
+
+
+    def _find_end_of_program(self, search_from: int) -> tuple[int | None, int]:
+        # Returns the offset at which the "." line begins and the offset of the
+        # line after it, or None if it hasn't been found yet.  The first line
+        # of the program has no newline before it, so it's checked separately.
+        buffer = self._buffer
+
+        if search_from == self._position:
+            dot = search_from
+        else:
+            dot = self._next_dot_line(search_from)
+
+        while dot is not None:
+            if buffer.startswith(b'.', dot):
+                rest = buffer[dot + 1:dot + 3]
+
+                if rest.startswith(b'\n'):
+                    return dot, dot + 2
+                elif rest == b'\r\n':
+                    return dot, dot + 3
+                elif rest in (b'', b'\r'):
+                    # The "." is at the end of what's been read so far, so it's
+                    # the last line only if there's nothing more to read.
+                    return (dot, len(buffer)) if self._at_end else (None, 0)
+
+            dot = self._next_dot_line(dot)
+
+        return None, 0
+
+
+    def _next_dot_line(self, start: int) -> int | None:
+        # Returns the offset of the next line after start that begins with a
+        # ".", or None if there isn't one in what's been read so far.
+        newline = self._buffer.find(b'\n.', start)
+        return None if newline == -1 else newline + 1
+
+
+    def _fill(self) -> int:
+        # Reads another chunk into the buffer, first discarding what's already
+        # been read, and returns the number of bytes that were read.
+        if self._position > 0:
+            del self._buffer[:self._position]
+            self._position = 0
+
+        if self._at_end:
+            return 0
+
+        chunk = self._read_chunk(self._chunk_size)
+
+        if not chunk:
+            self._at_end = True
+            return 0
+
+        self._buffer += chunk
+        return len(chunk)
+
+
+    def _decode(self, start: int, end: int) -> str:
+        if end > start and self._buffer[end - 1] == ord('\r'):
+            end -= 1
+
+        with memoryview(self._buffer) as view:
+            return str(view[start:end], encoding = 'utf-8')
+
+
+
+__all__ = [
+    'DEFAULT_CHUNK_SIZE',
+    GrinInputReader.__name__
+]
@@ -0,0 +1,144 @@
+# resolution.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A pass that runs before a Grin program executes, resolving its labels and
+# the targets of its jumps.  Every GOTO or GOSUB whose target is a literal
+# integer or string is resolved to the index of the statement it jumps to, so
+# that only jumps whose targets are variables need to be worked out while the
+# program runs.
+#
+# Each variable is also assigned a slot (a small integer), so that a program's
+# variables can be kept in a list rather than a dictionary keyed by name.
+#
+# Jumps whose literal targets are impossible (e.g., a label that doesn't exist)
+# are reported as diagnostics before the program runs, but they only cause
+# the program to fail if they actually execute, as they always have.
+
+from collections.abc import Iterable
+from grin.ast import Constant, Variable, GrinStatement, JumpStatement
+from grin.ast import VariableUpdateStatement, InputStatement, PrintStatement
+from grin.runtime import find_jump_error, runtime_error, GrinRuntimeError
+
+
+
+class GrinResolvedProgram:
+    """A Grin program whose labels and literal jump targets have been
+    resolved."""
+
+    def __init__(self, statements: list[GrinStatement]):
+        self._statements = statements
+        self._labels = _find_labels(statements)
+        self._slots = _assign_slots(statements)
+        self._destinations = [None] * len(statements)
+        self._errors = {}
+
+        for index, statement in enumerate(statements):
+            if isinstance(statement, JumpStatement) and type(statement.target()) is Constant:
+                destination, message = find_jump_error(
+                    statement.target().value(), index, self._labels, len(statements))
+
+                if message is None:
+                    self._destinations[index] = destination
+                else:
+                    self._errors[index] = message
+
+
+    def statements(self) -> list[GrinStatement]:
+        return self._statements
+
+
+    def labels(self) -> dict[str, int]:
+        """Returns a dictionary mapping each label to the index of the first
+        statement that has it."""
+        return self._labels
+
+
+    def slots(self) -> dict[str, int]:
+        """Returns a dictionary mapping the name of each variable that appears
+        in the program to its slot, numbering them consecutively from 0 in the
+        order in which they first appear."""
+        return self._slots
+
+
+    def is_resolved(self, index: int) -> bool:
+        """Returns True if the statement at the given index is a jump whose
+        target was resolved before the program runs, whether or not the jump
+        is possible, or False otherwise."""
+        return self._destinations[index] is not None or index in self._errors
+
+
+    def destination(self, index: int) -> int:
+        """Returns the index of the statement to which the resolved jump at
+        the given index goes, raising a GrinRuntimeError if the jump is
+        impossible."""
+        destination = self._destinations[index]
+
+        if destination is None:
+            raise runtime_error(self._errors[index], self._statements[index].line())
+
+        return destination
+
+
+    def diagnostics(self) -> list[GrinRuntimeError]:
+        """Returns a GrinRuntimeError describing each impossible jump with a
+        literal target, in the order the jumps appear in the program."""
+        return [
+            runtime_error(message, self._statements[index].line())
+            for index, message in sorted(self._errors.items())
+        ]
+
+
+
+def resolve(statements: Iterable[GrinStatement]) -> GrinResolvedProgram:
+    """Resolves the labels and literal jump targets of a Grin program."""
+    return GrinResolvedProgram(list(statements))
+
+
+def _find_labels(statements: list[GrinStatement]) -> dict[str, int]:
+    labels = {}
+
+    for index, statement in enumerate(statements):
+        label = statement.label()
+
+        if label is not None and label not in labels:
+            labels[label] = index
+
+    return labels
+
+
+def _assign_slots(statements: list[GrinStatement]) -> dict[str, int]:
+    slots = {}
+
+    for statement in statements:
+        for name in _variable_names(statement):
+            if name not in slots:
+                slots[name] = len(slots)
+
+    return slots
+
+
+def _variable_names(statement: GrinStatement) -> list[str]:
+    if isinstance(statement, VariableUpdateStatement):
+        operands = [Variable(statement.target()), statement.value()]
+    elif isinstance(statement, InputStatement):
+        operands = [Variable(statement.target())]
+    elif isinstance(statement, PrintStatement):
+        operands = [statement.value()]
+    elif isinstance(statement, JumpStatement):
+        operands = [statement.target()]
+
+        if statement.condition() is not None:
+            operands.extend((statement.condition().left(), statement.condition().right()))
+    else:
+        operands = []
+
+    return [operand.name() for operand in operands if type(operand) is Variable]
+
+
+
+__all__ = [
+    resolve.__name__,
+    GrinResolvedProgram.__name__
+]
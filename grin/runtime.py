@@ -0,0 +1,203 @@
+# runtime.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# The rules that govern what happens while a Grin program runs, shared by
+# everything that executes Grin programs:
+#
+# * GrinRuntimeError, which is raised when a running program fails, and
+#   GrinLimitError, which is raised when a program is stopped because it ran
+#   for longer than it was allowed to.
+# * The operations performed by ADD, SUB, MULT, and DIV, and by the conditions
+#   on GOTO and GOSUB, which check the types of their operands.
+# * Reading input for INNUM and INSTR.
+# * Deciding where a jump goes, given the value of its target.
+#
+# Only GrinRuntimeError and GrinLimitError are exported from the 'grin'
+# package; the rest are imported by name by the modules that need them.
+
+from collections.abc import Callable
+from grin.location import GrinLocation
+from grin.token import GrinTokenKind
+import operator
+import re
+
+
+
+class GrinRuntimeError(Exception):
+    """Raised when an error occurs while a Grin program is running, with an
+    error message explaining the issue and a GrinLocation specifying the line
+    on which the statement that failed appeared."""
+
+    def __init__(self, message: str, location: GrinLocation):
+        formatted = f'Error during execution: {str(location)}: {message}'
+        super().__init__(formatted)
+        self._message = message
+        self._location = location
+
+
+    def message(self) -> str:
+        """Returns the error message, without its location"""
+        return self._message
+
+
+    def location(self) -> GrinLocation:
+        """Returns the location of the statement that failed"""
+        return self._location
+
+
+
+class GrinLimitError(GrinRuntimeError):
+    """Raised when a Grin program is stopped because it exceeded its budget of
+    instructions or ran past its deadline, with the location of the statement
+    that it had reached."""
+    pass
+
+
+
+def runtime_error(message: str, line: int) -> GrinRuntimeError:
+    """Returns a GrinRuntimeError for the statement on the given line."""
+    return GrinRuntimeError(message, GrinLocation(line, 1))
+
+
+def describe(value: object) -> str:
+    """Describes the type of a value, for use in error messages."""
+    if type(value) is int:
+        return 'an integer'
+    elif type(value) is float:
+        return 'a floating-point number'
+    else:
+        return 'a string'
+
+
+
+# The operations performed by the arithmetic statements, each of which returns
+# the updated value or raises a GrinRuntimeError.  Python's +, -, and * already
+# allow exactly the combinations of types that Grin does, so they're tried
+# first and any TypeError reported.
+
+def add(left: object, right: object, line: int) -> object:
+    try:
+        return left + right
+    except TypeError:
+        raise runtime_error(f'Cannot add {describe(left)} and {describe(right)}', line) from None
+
+
+def subtract(left: object, right: object, line: int) -> object:
+    try:
+        return left - right
+    except TypeError:
+        raise runtime_error(f'Cannot subtract {describe(right)} from {describe(left)}', line) from None
+
+
+def multiply(left: object, right: object, line: int) -> object:
+    try:
+        return left * right
+    except TypeError:
+        raise runtime_error(f'Cannot multiply {describe(left)} by {describe(right)}', line) from None
+
+
+def divide(left: object, right: object, line: int) -> object:
+    if type(left) is str or type(right) is str:
+        raise runtime_error(f'Cannot divide {describe(left)} by {describe(right)}', line)
+    elif right == 0:
+        raise runtime_error('Cannot divide by zero', line)
+    elif type(left) is int and type(right) is int:
+        return left // right
+    else:
+        return left / right
+
+
+COMPARISONS = {
+    GrinTokenKind.EQUAL: operator.eq,
+    GrinTokenKind.NOT_EQUAL: operator.ne,
+    GrinTokenKind.LESS_THAN: operator.lt,
+    GrinTokenKind.LESS_THAN_OR_EQUAL: operator.le,
+    GrinTokenKind.GREATER_THAN: operator.gt,
+    GrinTokenKind.GREATER_THAN_OR_EQUAL: operator.ge
+}
+
+
+def compare(
+        comparison: Callable[[object, object], bool],
+        left: object, right: object, line: int) -> bool:
+    """Compares two values using one of the functions in COMPARISONS.  Strings
+    can only be compared to strings, and numbers to numbers."""
+    if (type(left) is str) is not (type(right) is str):
+        raise runtime_error(f'Cannot compare {describe(left)} and {describe(right)}', line)
+
+    return comparison(left, right)
+
+
+
+_INTEGER_PATTERN = re.compile(r'-?[0-9]+')
+_FLOAT_PATTERN = re.compile(r'-?[0-9]+\.[0-9]*')
+
+
+def read_line(input_line: Callable[[], str], line: int) -> str:
+    try:
+        return input_line()
+    except EOFError:
+        raise runtime_error('No more input is available', line) from None
+
+
+def to_number(text: str, line: int) -> int | float:
+    """Converts a line of input read by INNUM to an integer or a float."""
+    stripped = text.strip()
+
+    if _INTEGER_PATTERN.fullmatch(stripped):
+        return int(stripped)
+    elif _FLOAT_PATTERN.fullmatch(stripped):
+        return float(stripped)
+    else:
+        raise runtime_error(f'Input "{text}" is not a number', line)
+
+
+
+def find_jump_error(
+        target: object, index: int, labels: dict[str, int],
+        statement_count: int) -> tuple[int | None, str | None]:
+    """Decides where a jump from the statement at the given index goes, given
+    the value of its target: either an integer (a number of lines relative to
+    the jump) or a string (a label).  Jumping just past the last statement is
+    allowed, and ends the program.  Returns the index of the destination and
+    None, or None and an error message if the jump is impossible."""
+
+    if type(target) is int:
+        if target == 0:
+            return None, 'Cannot jump to the same line'
+
+        destination = index + target
+    elif type(target) is str:
+        if target not in labels:
+            return None, f'Unknown label "{target}"'
+
+        destination = labels[target]
+    else:
+        return None, f'Cannot jump to {describe(target)}'
+
+    if not 0 <= destination <= statement_count:
+        return None, 'Jump target is outside of the program'
+
+    return destination, None
+
+
+def jump_destination(
+        target: object, index: int, labels: dict[str, int],
+        statement_count: int, line: int) -> int:
+    """Returns the index of the destination of a jump, as find_jump_error()
+    decides it, raising a GrinRuntimeError if the jump is impossible."""
+    destination, message = find_jump_error(target, index, labels, statement_count)
+
+    if message is not None:
+        raise runtime_error(message, line)
+
+    return destination
+
+
+
+__all__ = [
+    GrinLimitError.__name__,
+    GrinRuntimeError.__name__
+]
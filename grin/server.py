@@ -0,0 +1,234 @@
+# server.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A long-lived Grin server, which listens on a Unix domain socket and runs the
+# programs sent to it, so that running a program doesn't require starting a
+# new Python process (and importing grin) every time.
+#
+# The protocol is as simple as it can be: a client sends exactly what it would
+# otherwise give to project3.py as its standard input -- the program, followed
+# by a line containing only a ".", followed by the program's input -- and the
+# server sends back exactly what project3.py would print, closing the
+# connection when the program ends.  Input can be sent as it becomes
+# available; output is flushed before the program waits for more of it.
+#
+# The server is a pool of worker processes, forked from one that has already
+# imported grin and run a small program, each of which accepts connections
+# from the same socket and runs one program at a time.  A worker whose
+# program runs for longer than the timeout stops it and reports an error, and
+# a worker that dies is replaced.
+#
+# Usage: python -m grin.server [--socket PATH] [--workers N] [--timeout SECONDS]
+
+from grin.client import default_socket_path
+from grin.interpreter import interpret, GrinOutputBuffer
+from grin.lexing import GrinLexError
+from grin.loading import load_source
+from grin.parsing import GrinParseError
+from grin.reading import GrinInputReader
+from grin.runtime import GrinRuntimeError
+import io
+import os
+import signal
+import socket
+import sys
+
+
+
+DEFAULT_TIMEOUT = 10.0
+
+
+
+class GrinServer:
+    """A pool of worker_count worker processes (by default, one per processor)
+    serving Grin programs on the Unix domain socket at socket_path.  Programs
+    that run for longer than timeout seconds are stopped, unless the timeout is
+    None."""
+
+    def __init__(
+            self, socket_path: str, *,
+            worker_count: int | None = None,
+            timeout: float | None = DEFAULT_TIMEOUT):
+        self._socket_path = socket_path
+        self._worker_count = worker_count or os.cpu_count() or 1
+        self._timeout = timeout
+        self._listener = None
+        self._worker_ids = set()
+        self._stopping = False
+
+
+    def serve_forever(self) -> None:
+        """Starts the workers, then replaces any that die, until the server
+        receives SIGTERM or SIGINT."""
+        self._listen()
+        _warm_up()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        try:
+            for _ in range(self._worker_count):
+                self._start_worker()
+
+            while self._worker_ids:
+                try:
+                    worker_id, _ = os.wait()
+                except ChildProcessError:
+                    # Every worker has already been reaped.
+                    break
+
+                self._worker_ids.discard(worker_id)
+
+                if not self._stopping:
+                    self._start_worker()
+        finally:
+            self._listener.close()
+
+            if os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)
+
+
+    def _listen(self) -> None:
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self._socket_path)
+        self._listener.listen(128)
+
+
+    def _stop(self, signal_number, frame) -> None:
+        self._stopping = True
+
+        for worker_id in list(self._worker_ids):
+            try:
+                os.kill(worker_id, signal.SIGTERM)
+            except ProcessLookupError:
+                # The worker has already exited and been reaped, so there's
+                # nothing left to wait for.
+                self._worker_ids.discard(worker_id)
+
+
+    def _start_worker(self) -> None:
+        worker_id = os.fork()
+
+        if worker_id == 0:
+            status = 0
+
+            try:
+                self._work()
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+
+        self._worker_ids.add(worker_id)
+
+
+    def _work(self) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        while True:
+            connection, _ = self._listener.accept()
+
+            with connection:
+                self._serve_connection(connection)
+
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        incoming = connection.makefile('rb')
+        outgoing = connection.makefile('w', encoding = 'utf-8')
+
+        try:
+            serve_request(incoming, outgoing, timeout = self._timeout)
+            outgoing.flush()
+        except OSError:
+            # The client went away before the program ended, so there's no one
+            # to tell.
+            pass
+        finally:
+            for stream in (incoming, outgoing):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+
+
+class _GrinTimeout(BaseException):
+    # A BaseException, so that nothing that catches exceptions along the way
+    # (e.g., when a line of input is converted to a number) can catch it.
+    pass
+
+
+def _raise_timeout(signal_number, frame) -> None:
+    raise _GrinTimeout()
+
+
+def serve_request(
+        incoming: io.BufferedIOBase, outgoing: io.TextIOBase, *,
+        timeout: float | None = None) -> None:
+    """Reads a program followed by its input from incoming, as project3.py
+    reads them from the standard input, runs it, and writes what it prints to
+    outgoing.  If timeout is given, the program is stopped after that many
+    seconds, which relies on SIGALRM, so it's only possible in the main
+    thread."""
+    reader = GrinInputReader(incoming)
+
+    with GrinOutputBuffer(outgoing) as output:
+        if timeout is not None:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+
+        try:
+            statements = load_source(reader.read_program())
+            interpret(statements, input_line = output.flushing(reader.read_line), output_line = output.write_line)
+        except (GrinLexError, GrinParseError, GrinRuntimeError) as e:
+            output.write_line(str(e))
+        except _GrinTimeout:
+            output.write_line(f'Error during execution: Time limit exceeded ({timeout:g}s)')
+        finally:
+            if timeout is not None:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _warm_up() -> None:
+    # Runs a small program before the workers are forked, so that whatever is
+    # done lazily the first time a program runs is already done in all of them.
+    statements = load_source(b'LET X 1\nADD X 1\nGOSUB 2\nEND\nPRINT X\nRETURN\n')
+    interpret(statements, input_line = lambda: '', output_line = lambda line: None)
+
+
+def main() -> None:
+    arguments = sys.argv[1:]
+    options = {'--socket': default_socket_path(), '--workers': None, '--timeout': str(DEFAULT_TIMEOUT)}
+
+    while arguments:
+        if arguments[0] not in options or len(arguments) < 2:
+            print('Usage: python -m grin.server [--socket PATH] [--workers N] [--timeout SECONDS]')
+            sys.exit(2)
+
+        options[arguments[0]] = arguments[1]
+        del arguments[:2]
+
+    worker_count = int(options['--workers']) if options['--workers'] else None
+    timeout = float(options['--timeout']) or None
+
+    GrinServer(options['--socket'], worker_count = worker_count, timeout = timeout).serve_forever()
+
+
+
+__all__ = [
+    'DEFAULT_TIMEOUT',
+    serve_request.__name__,
+    GrinServer.__name__
+]
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+# streaming.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# A streaming mode for running Grin programs too large to hold in memory, or
+# whose lines arrive over time.  Rather than parsing the whole program before
+# running it, each line is read and parsed only when it's needed: straight-line
+# code runs as soon as its lines arrive, while a jump forward (or to a label
+# that hasn't been seen yet) reads ahead until its destination is found.
+#
+# Only a bounded window of the most recently used statements is kept in
+# memory.  Every line's text is written to a temporary file as it's read, so
+# a statement that has left the window (e.g., the top of a long loop) can be
+# read and parsed again when a jump returns to it.
+#
+# Since lines are parsed as they're reached, a parse error is only raised when
+# the line on which it occurs is read, after any statements before it have
+# run.  Otherwise, programs behave as they do when run by grin.interpret().
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from grin.ast import GrinStatement, JumpStatement, EndStatement
+from grin.interpreter import _StatementInterpreter, GrinOutputBuffer, DEFAULT_OUTPUT_BUFFER_SIZE
+from grin.parsing import parse_statements
+from grin.runtime import jump_destination
+import sys
+import tempfile
+
+
+
+DEFAULT_WINDOW_SIZE = 4096
+
+
+
+class GrinProgramWindow:
+    """The statements of a Grin program that's being read line by line, of
+    which at most window_size are kept in memory at once."""
+
+    def __init__(self, lines: Iterable[str], *, window_size: int = DEFAULT_WINDOW_SIZE):
+        if window_size < 1:
+            raise ValueError('window_size must be positive')
+
+        self._lines = iter(lines)
+        self._window_size = window_size
+        self._window = OrderedDict()
+        self._labels = {}
+        self._ended = False
+        self._spill = tempfile.TemporaryFile()
+        self._offsets = array('Q', [0])
+        self._reparsed_count = 0
+
+
+    def close(self) -> None:
+        """Discards the temporary file in which the program's text is kept."""
+        self._spill.close()
+
+
+    def __enter__(self) -> 'GrinProgramWindow':
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+    def statement(self, index: int) -> GrinStatement | None:
+        """Returns the statement with the given index, reading lines until it's
+        been read, or None if the program ends before it."""
+        statement = self._window.get(index)
+
+        if statement is not None:
+            self._window.move_to_end(index)
+            return statement
+        elif index < 0 or not self._read_through(index):
+            return None
+        elif index in self._window:
+            return self._window[index]
+
+        return self._reparse(index)
+
+
+    def find_label(self, label: str) -> int | None:
+        """Returns the index of the first statement with the given label,
+        reading lines until it's found, or None if the program doesn't have
+        one."""
+        while label not in self._labels and self._read_next():
+            pass
+
+        return self._labels.get(label)
+
+
+    def labels(self) -> dict[str, int]:
+        """Returns the labels that have been read so far."""
+        return self._labels
+
+
+    def read_count(self) -> int:
+        """Returns the number of statements that have been read so far."""
+        return len(self._offsets) - 1
+
+
+    def read_all(self) -> int:
+        """Reads the rest of the program, returning how many statements it
+        has."""
+        while self._read_next():
+            pass
+
+        return self.read_count()
+
+
+    def has_ended(self) -> bool:
+        """Returns True if the whole program has been read."""
+        return self._ended
+
+
+    def reparsed_count(self) -> int:
+        """Returns the number of times a statement that had left the window
+        was read back from the temporary file."""
+        return self._reparsed_count
+
+
+    def _read_through(self, index: int) -> bool:
+        while self.read_count() <= index:
+            if not self._read_next():
+                return False
+
+        return True
+
+
+    def _read_next(self) -> bool:
+        if self._ended:
+            return False
+
+        line = next(self._lines, None)
+        line_number = self.read_count() + 1
+        statements = [] if line is None else list(parse_statements([line], first_line = line_number))
+
+        if not statements:
+            self._ended = True
+            return False
+
+        statement = statements[0]
+        self._spill.seek(0, 2)
+        self._spill.write(line.encode(encoding = 'utf-8'))
+        self._offsets.append(self._spill.tell())
+
+        if statement.label() is not None and statement.label() not in self._labels:
+            self._labels[statement.label()] = line_number - 1
+
+        self._remember(line_number - 1, statement)
+        return True
+
+
+    def _reparse(self, index: int) -> GrinStatement:
+        self._spill.seek(self._offsets[index])
+        text = self._spill.read(self._offsets[index + 1] - self._offsets[index])
+        line = text.decode(encoding = 'utf-8')
+        statement = next(iter(parse_statements([line], first_line = index + 1)))
+        self._reparsed_count += 1
+        self._remember(index, statement)
+        return statement
+
+
+    def _remember(self, index: int, statement: GrinStatement) -> None:
+        self._window[index] = statement
+
+        if len(self._window) > self._window_size:
+            self._window.popitem(last = False)
+
+
+
+def interpret_stream(
+        lines: Iterable[str],
+        *,
+        input_line: Callable[[], str] = input,
+        output_line: Callable[[str], None] | None = None,
+        output_buffer_size: int = DEFAULT_OUTPUT_BUFFER_SIZE,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        program_precedes_input: bool = False) -> None:
+    """Runs a Grin program whose lines are read from the given sequence only as
+    they're needed, keeping at most window_size statements in memory.
+
+    If program_precedes_input is True, the program's lines and its input come
+    from the same place (e.g., the standard input), so the rest of the program
+    is read before the first line of input is.
+
+    As in grin.interpret(), lines are written to the standard output by a
+    GrinOutputBuffer of output_buffer_size characters if output_line isn't
+    given.
+
+    Raises a GrinParseError when a line that has a parse error is read, or a
+    GrinRuntimeError if an error occurs while the program runs."""
+
+    with GrinProgramWindow(lines, window_size = window_size) as window:
+        if program_precedes_input:
+            read_input = input_line
+
+            def input_line() -> str:
+                window.read_all()
+                return read_input()
+
+        if output_line is None:
+            with GrinOutputBuffer(sys.stdout, buffer_size = output_buffer_size) as output:
+                _StreamingInterpreter(window, output.flushing(input_line), output.write_line).run()
+        else:
+            _StreamingInterpreter(window, input_line, output_line).run()
+
+
+
+class _StreamingInterpreter(_StatementInterpreter):
+    """Runs a Grin program one statement at a time, as the tree-walking engine
+    does, but asks a GrinProgramWindow for each statement as it's reached."""
+
+    def __init__(
+            self, window: GrinProgramWindow,
+            input_line: Callable[[], str], output_line: Callable[[str], None]):
+        self._window = window
+        self._variables = {}
+        self._return_indexes = []
+        self._input_line = input_line
+        self._output_line = output_line
+
+
+    def run(self) -> None:
+        window = self._window
+        executors = self._EXECUTORS
+        index = 0
+
+        while True:
+            statement = window.statement(index)
+
+            if statement is None:
+                break
+
+            index = executors[type(statement)](self, statement, index)
+
+
+    def _destination(self, statement: JumpStatement, index: int) -> int:
+        window = self._window
+        target = self._evaluate(statement.target())
+
+        if type(target) is int:
+            window.statement(index + target)
+        elif type(target) is str:
+            window.find_label(target)
+
+        # Until the whole program has been read, its length is unknown, but any
+        # destination that exists has been read by now, so the number of
+        # statements read so far is enough to decide whether the jump is
+        # within the program.
+        return jump_destination(target, index, window.labels(), window.read_count(), statement.line())
+
+
+    def _execute_end(self, statement: EndStatement, index: int) -> int:
+        return -1
+
+
+    _EXECUTORS = {
+        **_StatementInterpreter._EXECUTORS,
+        EndStatement: _execute_end
+    }
+
+
+
+__all__ = [
+    'DEFAULT_WINDOW_SIZE',
+    interpret_stream.__name__,
+    GrinProgramWindow.__name__
+]
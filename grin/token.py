@@ -9,13 +9,16 @@
 # * GrinTokenKind, which identifies a type of token, such as a literal integer
 #   or the keyword SUB.
 # * GrinTokenCategory, which kinds of tokens into broader categories.
+# * TokenBuffer, which stores a long sequence of tokens compactly, in parallel
+#   arrays, rather than as one GrinToken object per token.
 #
 # WHAT YOU'LL NEED TO DO: Nothing.  This module is provided in its entirety,
 # and it should not be necessary to change it.
 
+from array import array
+from collections.abc import Iterable, Iterator
 from enum import Enum
 from grin.location import GrinLocation
-from typing import Any
 
 
 
@@ -62,6 +65,7 @@ class GrinTokenKind(Enum):
     def __init__(self, index: int, category: GrinTokenCategory):
         self._index = index
         self._category = category
+        self._bit = 1 << index
 
 
     def index(self) -> int:
@@ -75,19 +79,79 @@ class GrinTokenKind(Enum):
         return self._category
 
 
+    def bit(self) -> int:
+        """A bit (1 << index()) identifying this kind of token, so that a set
+        of kinds can be represented as an integer mask, and membership in the
+        set tested with a single &."""
+        return self._bit
+
+
+
+def kinds_mask(kinds: Iterable[GrinTokenKind]) -> int:
+    """Returns the mask representing the given set of kinds of tokens."""
+    mask = 0
+
+    for kind in kinds:
+        mask |= kind.bit()
+
+    return mask
+
+
+def _make_kinds_by_index() -> tuple[GrinTokenKind | None, ...]:
+    kinds = [None] * (max(kind.index() for kind in GrinTokenKind) + 1)
+
+    for kind in GrinTokenKind:
+        kinds[kind.index()] = kind
+
+    return tuple(kinds)
+
+
+# Every kind of token, indexed by its index, so that the indexes stored in a
+# TokenBuffer can be turned back into kinds.
+KINDS_BY_INDEX = _make_kinds_by_index()
+
+# The bit of each kind of token, indexed by the kind's index, so that the bit
+# for an index stored in a TokenBuffer can be found without the enum.
+KIND_BITS = tuple(1 << index for index in range(len(KINDS_BY_INDEX)))
+
+# The mask of the kinds of tokens in each category.
+CATEGORY_MASKS = {
+    category: kinds_mask(kind for kind in GrinTokenKind if kind.category() == category)
+    for category in GrinTokenCategory
+}
+
+# The masks of the kinds of tokens that can serve particular roles in a
+# statement: as a comparison operator, as a value, or as the target of a jump.
+COMPARISON_OPERATOR_MASK = CATEGORY_MASKS[GrinTokenCategory.COMPARISON_OPERATOR]
+
+VALUE_MASK = kinds_mask([
+    GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
+    GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER])
+
+JUMP_TARGET_MASK = kinds_mask([
+    GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING,
+    GrinTokenKind.IDENTIFIER])
+
+
 
 class GrinToken:
-    """A single token in a Grin program"""
+    """A single token in a Grin program.  Tokens are immutable and hashable,
+    so they can be used as keys in dictionaries; the hash is computed once,
+    the first time it's needed, and cached."""
+
+    __slots__ = ('_kind', '_text', '_location', '_value', '_hash')
+
+
     def __init__(
             self, *,
             kind: GrinTokenKind,
             text: str,
             location: GrinLocation,
-            value: Any = None):
-        self._kind = kind
-        self._text = text
-        self._location = location
-        self._value = value
+            value: object = None):
+        _set_attribute(self, '_kind', kind)
+        _set_attribute(self, '_text', text)
+        _set_attribute(self, '_location', location)
+        _set_attribute(self, '_value', value)
 
 
     def kind(self) -> GrinTokenKind:
@@ -102,21 +166,202 @@ class GrinToken:
         return self._location
 
 
-    def value(self) -> Any:
+    def value(self) -> object:
         return self._value
 
 
     def __eq__(self, other):
-        return isinstance(other, GrinToken) \
-                and self._kind == other._kind \
-                and self._text == other._text \
+        return self is other \
+                or isinstance(other, GrinToken) \
+                and self._kind is other._kind \
                 and self._location == other._location \
+                and self._text == other._text \
                 and self._value == other._value
 
 
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            _set_attribute(self, '_hash', hash((self._kind, self._text, self._location, self._value)))
+            return self._hash
+
+
+    def __repr__(self) -> str:
+        return f'GrinToken(kind = {self._kind}, text = {self._text!r}, ' \
+               f'location = {self._location!r}, value = {self._value!r})'
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+
+    def __reduce__(self):
+        return _make_token, (self._kind, self._text, self._location, self._value)
+
+
+
+_set_attribute = object.__setattr__
+
+
+def _make_token(kind: GrinTokenKind, text: str, location: GrinLocation, value: object) -> GrinToken:
+    return GrinToken(kind = kind, text = text, location = location, value = value)
+
+
+
+class TokenBuffer:
+    """A sequence of tokens stored as parallel arrays (a "struct of arrays"),
+    which is far more compact than one GrinToken per token.  For each token, it
+    stores the index of its kind, its line and column, and the offset of its
+    text within the source.  Texts and values are pooled, so that every token
+    with the same text (e.g., each occurrence of the same variable name) shares
+    one entry; tokens with the same text are expected to have the same value,
+    which is always so for tokens produced by the lexer.
+
+    Indexing a TokenBuffer produces GrinToken objects on demand."""
+
+    def __init__(self, source: str | bytes | memoryview = ''):
+        self._source = source
+        self._kinds = array('B')
+        self._lines = array('I')
+        self._columns = array('I')
+        self._starts = array('Q')
+        self._pool_ids = array('I')
+        self._pool_ids_by_text = {}
+        self._texts = []
+        self._values = []
+
+
+    def append(
+            self, kind: GrinTokenKind, text: str, value: object,
+            line: int, column: int, start: int) -> None:
+        """Appends a token, given its kind, text, and value, along with its
+        line and column and the offset of its text within the source."""
+        pool_id = self._pool_ids_by_text.get(text)
+
+        if pool_id is None:
+            pool_id = len(self._texts)
+            self._pool_ids_by_text[text] = pool_id
+            self._texts.append(text)
+            self._values.append(value)
+
+        self._kinds.append(kind._index)
+        self._lines.append(line)
+        self._columns.append(column)
+        self._starts.append(start)
+        self._pool_ids.append(pool_id)
+
+
+    def truncate(self, length: int) -> None:
+        """Removes every token at or after the given index."""
+        del self._kinds[length:]
+        del self._lines[length:]
+        del self._columns[length:]
+        del self._starts[length:]
+        del self._pool_ids[length:]
+
+
+    def source(self) -> str | bytes | memoryview:
+        """Returns the source text into which the tokens' spans refer, which
+        is the bytes from which the tokens were lexed, if they were lexed
+        directly from bytes."""
+        return self._source
+
+
+    def kind_indexes(self) -> array:
+        """Returns the array of every token's kind, as GrinTokenKind indexes."""
+        return self._kinds
+
+
+    def kind(self, index: int) -> GrinTokenKind:
+        return KINDS_BY_INDEX[self._kinds[index]]
+
+
+    def text(self, index: int) -> str:
+        return self._texts[self._pool_ids[index]]
+
+
+    def value(self, index: int) -> object:
+        return self._values[self._pool_ids[index]]
+
+
+    def location(self, index: int) -> GrinLocation:
+        return GrinLocation(self._lines[index], self._columns[index])
+
+
+    def span(self, index: int) -> tuple[int, int]:
+        """Returns the start and end offsets of a token's text in the source."""
+        start = self._starts[index]
+        return start, start + len(self._texts[self._pool_ids[index]])
+
+
+    def token(self, index: int) -> GrinToken:
+        """Returns a GrinToken describing the token at the given index."""
+        pool_id = self._pool_ids[index]
+
+        return GrinToken(
+            kind = KINDS_BY_INDEX[self._kinds[index]],
+            text = self._texts[pool_id],
+            location = GrinLocation(self._lines[index], self._columns[index]),
+            value = self._values[pool_id])
+
+
+    def tokens(self, start: int, end: int) -> list[GrinToken]:
+        """Returns GrinTokens describing the tokens in the given range."""
+        kinds = self._kinds
+        lines = self._lines
+        columns = self._columns
+        pool_ids = self._pool_ids
+        texts = self._texts
+        values = self._values
+
+        return [
+            GrinToken(
+                kind = KINDS_BY_INDEX[kinds[index]],
+                text = texts[pool_ids[index]],
+                location = GrinLocation(lines[index], columns[index]),
+                value = values[pool_ids[index]])
+            for index in range(start, end)
+        ]
+
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+
+    def __getitem__(self, index: int | slice) -> GrinToken | list[GrinToken]:
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self._kinds)))]
+
+        if index < 0:
+            index += len(self._kinds)
+
+        if not 0 <= index < len(self._kinds):
+            raise IndexError('TokenBuffer index out of range')
+
+        return self.token(index)
+
+
+    def __iter__(self) -> Iterator[GrinToken]:
+        for index in range(len(self._kinds)):
+            yield self.token(index)
+
+
 
 __all__ = [
+    'CATEGORY_MASKS',
+    'COMPARISON_OPERATOR_MASK',
+    'JUMP_TARGET_MASK',
+    'KIND_BITS',
+    'KINDS_BY_INDEX',
+    'VALUE_MASK',
+    kinds_mask.__name__,
     GrinToken.__name__,
     GrinTokenCategory.__name__,
-    GrinTokenKind.__name__
+    GrinTokenKind.__name__,
+    TokenBuffer.__name__
 ]
@@ -1,28 +1,77 @@
 import grin
 from grin import interpreter
+import os
+import sys
 
-def read_grin_program() -> iter:
-    """Reads lines of input from the standard input until the end-of-program marker is encountered."""
-    lines = []
+def read_grin_program(reader: grin.GrinInputReader) -> bytes:
+    """Reads the standard input until the end-of-program marker is encountered,
+    returning the text of the program."""
+    return reader.read_program()
+
+def read_grin_lines(reader: grin.GrinInputReader) -> iter:
+    """Generates lines of input from the standard input, one at a time, as they're needed."""
     while True:
-        line = input()
-        if line == '.':
-            break
-        lines.append(line)
-    return iter(lines)
+        try:
+            yield reader.read_line()
+        except EOFError:
+            return
 
 def main():
-    """The main entry point for the Grin interpreter."""
+    """The main entry point for the Grin interpreter.  When run with --stream,
+    the program runs as its lines are read, rather than after all of them are.
+    When given the path to a file, the program is read from that file, and
+    only its input is read from the standard input.  The parsed program is
+    cached alongside the file (unless run with --no-cache), or, for programs
+    read from the standard input, in the directory named by the GRIN_CACHE_DIR
+    environment variable, if it's set.
+
+    When run with --profile, the program is profiled, and a report of how
+    many times each line executed and how long it took is printed to the
+    standard error when it ends; with --profile=PATH, the profile is also
+    written to PATH in the format of Python's pstats module.  (Programs run
+    with --stream aren't profiled.)"""
+    reader = grin.GrinInputReader(sys.stdin.buffer)
+    paths = [argument for argument in sys.argv[1:] if not argument.startswith('--')]
+    cache = '--no-cache' not in sys.argv[1:]
+    profile_options = [argument for argument in sys.argv[1:] if argument.split('=')[0] == '--profile']
+    profile = grin.GrinProfile() if profile_options and '--stream' not in sys.argv[1:] else None
+    program_text = b''
+
     try:
-        program_lines = read_grin_program()
-        tokens_per_line = grin.parse(program_lines)
-        interpreter.interpret(tokens_per_line)
+        if paths:
+            if profile is not None:
+                with open(paths[0], 'rb') as program_file:
+                    program_text = program_file.read()
+
+            grin.run_file(paths[0], input_line = reader.read_line, cache = cache, profile = profile)
+        elif '--stream' in sys.argv[1:]:
+            grin.interpret_stream(
+                read_grin_lines(reader), input_line = reader.read_line,
+                program_precedes_input = True)
+        else:
+            program_text = read_grin_program(reader)
+            cache_directory = os.environ.get('GRIN_CACHE_DIR') if cache else None
+            statements = grin.load_source(program_text, cache_directory = cache_directory)
+            interpreter.interpret(statements, input_line = reader.read_line, profile = profile)
     except grin.GrinLexError as e:
         print(e)
     except grin.GrinParseError as e:
         print(e)
     except interpreter.GrinRuntimeError as e:
         print(e)
+    finally:
+        if profile is not None:
+            report_profile(profile, program_text, profile_options[-1].partition('=')[2])
+
+def report_profile(profile: 'grin.GrinProfile', program_text: bytes, path: str) -> None:
+    """Prints a profile's report to the standard error, and writes it to the
+    given path, unless the path is empty."""
+    sys.stdout.flush()
+    source = program_text.decode(encoding = 'utf-8', errors = 'replace')
+    print(profile.report(source), file = sys.stderr)
+
+    if path:
+        profile.write_pstats(path, source)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
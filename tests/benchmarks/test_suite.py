@@ -0,0 +1,64 @@
+# test_suite.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the benchmarks.suite module.
+
+from benchmarks.suite import find_regressions
+import benchmarks.suite
+import unittest
+
+
+
+def _results(**workloads: dict[str, float]) -> dict:
+    return {'workloads': workloads}
+
+
+
+class TestFindingRegressions(unittest.TestCase):
+    def test_times_slower_than_the_threshold_allows_are_regressions(self):
+        regressions = find_regressions(
+            _results(loop = {'lexing': 0.5, 'execution': 1.25}),
+            _results(loop = {'lexing': 0.5, 'execution': 1.0}),
+            0.1)
+
+        self.assertEqual(regressions, [('loop', 'execution', 1.25)])
+
+
+    def test_times_within_the_threshold_are_not_regressions(self):
+        for seconds in (0.5, 1.0, 1.1):
+            with self.subTest(seconds = seconds):
+                self.assertEqual(
+                    find_regressions(
+                        _results(loop = {'execution': seconds}),
+                        _results(loop = {'execution': 1.0}),
+                        0.1),
+                    [])
+
+
+    def test_times_too_short_to_compare_are_not_regressions(self):
+        short = benchmarks.suite._MINIMUM_COMPARABLE_TIME / 4
+        longer = benchmarks.suite._MINIMUM_COMPARABLE_TIME * 2
+
+        self.assertEqual(
+            find_regressions(_results(loop = {'lexing': short * 3}), _results(loop = {'lexing': short}), 0.1),
+            [])
+
+        self.assertEqual(
+            find_regressions(_results(loop = {'lexing': longer}), _results(loop = {'lexing': short}), 0.1),
+            [('loop', 'lexing', 8.0)])
+
+
+    def test_workloads_and_phases_missing_from_the_baseline_are_skipped(self):
+        regressions = find_regressions(
+            _results(new = {'execution': 5.0}, loop = {'lexing': 5.0, 'execution': 5.0}),
+            _results(loop = {'execution': 5.0}),
+            0.1)
+
+        self.assertEqual(regressions, [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
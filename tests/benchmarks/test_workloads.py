@@ -0,0 +1,49 @@
+# test_workloads.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the benchmarks.workloads module.
+
+from benchmarks.workloads import WORKLOADS
+from grin.interpreter import interpret, load_statements, LIMIT_CHECK_INTERVAL
+from grin.lexing import to_program_tokens
+from grin.parsing import parse_statements
+from grin.runtime import GrinLimitError
+import unittest
+
+
+
+def _no_input() -> str:
+    raise AssertionError('A workload read a line of input')
+
+
+
+class TestWorkloads(unittest.TestCase):
+    def test_every_workload_generates_a_valid_program_at_scale_1(self):
+        for name, workload in WORKLOADS.items():
+            with self.subTest(name = name):
+                source = workload(1)
+                self.assertTrue(source.endswith('\n.\n'))
+
+                statements = load_statements(parse_statements(to_program_tokens(source)))
+
+                # Only the beginning of each program is run, which is enough
+                # to find a jump to a missing label or a read of its input.
+                try:
+                    interpret(
+                        statements, input_line = _no_input, output_line = lambda line: None,
+                        strict = True, budget = LIMIT_CHECK_INTERVAL * 4)
+                except GrinLimitError:
+                    pass
+
+
+    def test_larger_scales_generate_longer_or_longer_running_programs(self):
+        for name, workload in WORKLOADS.items():
+            with self.subTest(name = name):
+                self.assertNotEqual(workload(2), workload(1))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
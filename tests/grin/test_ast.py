@@ -0,0 +1,115 @@
+# test_ast.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.ast module, and for the parsing of Grin programs
+# into its statements.
+
+from grin.ast import *
+from grin.lexing import to_program_tokens
+from grin.parsing import parse, parse_statements, to_statement, GrinParseError
+from grin.token import GrinTokenKind
+import pickle
+import unittest
+
+
+
+class TestGrinStatements(unittest.TestCase):
+    def test_statements_compare_by_type_and_fields(self):
+        statement = LetStatement(line = 1, target = 'X', value = Constant(3))
+        self.assertEqual(statement, LetStatement(line = 1, target = 'X', value = Constant(3)))
+        self.assertEqual(hash(statement), hash(LetStatement(line = 1, target = 'X', value = Constant(3))))
+        self.assertNotEqual(statement, AddStatement(line = 1, target = 'X', value = Constant(3)))
+        self.assertNotEqual(statement, LetStatement(line = 1, target = 'X', value = Variable(3)))
+
+
+    def test_constants_compare_by_type_and_sign(self):
+        self.assertNotEqual(Constant(1), Constant(1.0))
+        self.assertNotEqual(Constant(0.0), Constant(-0.0))
+        self.assertNotEqual(
+            PrintStatement(line = 1, value = Constant(0.0)),
+            PrintStatement(line = 1, value = Constant(-0.0)))
+        self.assertEqual(Constant(-0.0), Constant(-0.0))
+        self.assertEqual(hash(Constant(-0.0)), hash(Constant(-0.0)))
+        self.assertEqual(len({Constant(1), Constant(1.0), Constant(0.0), Constant(-0.0)}), 4)
+
+
+    def test_statements_are_immutable(self):
+        statement = PrintStatement(line = 1, value = Constant('Boo'))
+
+        with self.assertRaises(AttributeError):
+            statement._value = Constant('Hello')
+
+        with self.assertRaises(AttributeError):
+            statement.extra = 1
+
+
+    def test_statements_can_be_pickled(self):
+        statement = GotoStatement(
+            line = 4, label = 'LOOP', target = Constant('END'),
+            condition = JumpCondition(
+                left = Variable('X'), operator = GrinTokenKind.LESS_THAN, right = Constant(10)))
+
+        self.assertEqual(pickle.loads(pickle.dumps(statement)), statement)
+
+
+
+class TestGrinStatementParsing(unittest.TestCase):
+    def assertParsesTo(self, line: str, expected: GrinStatement) -> None:
+        self.assertEqual(list(parse_statements([line])), [expected])
+        self.assertEqual(list(parse_statements(to_program_tokens(line))), [expected])
+
+
+    def test_variable_updates_distinguish_constants_from_variables(self):
+        self.assertParsesTo('LET X 3', LetStatement(line = 1, target = 'X', value = Constant(3)))
+        self.assertParsesTo('DIV X Y', DivStatement(line = 1, target = 'X', value = Variable('Y')))
+        self.assertParsesTo('ADD X "3"', AddStatement(line = 1, target = 'X', value = Constant('3')))
+
+
+    def test_statements_keep_their_labels(self):
+        self.assertParsesTo('DONE: END', EndStatement(line = 1, label = 'DONE'))
+        self.assertParsesTo('PRINT 1.5', PrintStatement(line = 1, value = Constant(1.5)))
+
+
+    def test_input_statements(self):
+        self.assertParsesTo('INNUM X', InNumStatement(line = 1, target = 'X'))
+        self.assertParsesTo('INSTR X', InStrStatement(line = 1, target = 'X'))
+
+
+    def test_jump_statements_with_and_without_conditions(self):
+        self.assertParsesTo('GOSUB "SUB"', GosubStatement(line = 1, target = Constant('SUB')))
+
+        self.assertParsesTo(
+            'GOTO N IF X >= "A"',
+            GotoStatement(
+                line = 1, target = Variable('N'),
+                condition = JumpCondition(
+                    left = Variable('X'), operator = GrinTokenKind.GREATER_THAN_OR_EQUAL,
+                    right = Constant('A'))))
+
+
+    def test_statements_know_their_line_numbers(self):
+        statements = list(parse_statements(['LET X 1', 'RETURN', '.', 'END']))
+        self.assertEqual(statements, [
+            LetStatement(line = 1, target = 'X', value = Constant(1)),
+            ReturnStatement(line = 2)
+        ])
+
+
+    def test_to_statement_agrees_with_parse_statements(self):
+        lines = ['A: LET X 1', 'GOTO -1 IF X <> 2', 'PRINT X', 'END']
+
+        self.assertEqual(
+            [to_statement(tokens) for tokens in parse(lines)],
+            list(parse_statements(lines)))
+
+
+    def test_parse_errors_are_raised(self):
+        with self.assertRaises(GrinParseError):
+            list(parse_statements(to_program_tokens('LET X\n')))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
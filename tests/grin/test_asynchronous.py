@@ -0,0 +1,109 @@
+# test_asynchronous.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.asynchronous module.
+
+from grin.asynchronous import run_async
+from grin.interpreter import ENGINES
+from grin.parsing import parse_statements
+from grin.runtime import GrinLimitError, GrinRuntimeError
+import asyncio
+import unittest
+
+
+
+class RecordingWriter:
+    """Stands in for an asyncio.StreamWriter, recording what's written and how
+    many times it's drained."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.drain_count = 0
+
+
+    def write(self, data: bytes) -> None:
+        self.data.extend(data)
+
+
+    async def drain(self) -> None:
+        self.drain_count += 1
+
+
+    def lines(self) -> list[str]:
+        return self.data.decode(encoding = 'utf-8').splitlines()
+
+
+
+def make_reader(text: str = '', *, at_eof: bool = True) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(text.encode(encoding = 'utf-8'))
+
+    if at_eof:
+        reader.feed_eof()
+
+    return reader
+
+
+
+class TestRunAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_programs_read_and_write_streams_on_every_engine(self):
+        program = list(parse_statements(['INNUM X', 'INSTR Y', 'MULT X 2', 'PRINT X', 'PRINT Y']))
+
+        for engine in ENGINES:
+            with self.subTest(engine = engine):
+                writer = RecordingWriter()
+                await run_async(program, make_reader('21\r\nBoo\n'), writer, engine = engine)
+                self.assertEqual(writer.lines(), ['42', 'Boo'])
+
+
+    async def test_programs_wait_for_input_to_arrive(self):
+        reader = make_reader(at_eof = False)
+        writer = RecordingWriter()
+        task = asyncio.create_task(
+            run_async(parse_statements(['PRINT "Name?"', 'INSTR NAME', 'PRINT NAME']), reader, writer))
+
+        await asyncio.sleep(0.01)
+        self.assertEqual(writer.lines(), ['Name?'])
+        self.assertFalse(task.done())
+
+        reader.feed_data(b'Boo\n')
+        await task
+        self.assertEqual(writer.lines(), ['Name?', 'Boo'])
+
+
+    async def test_running_out_of_input_is_an_error(self):
+        with self.assertRaises(GrinRuntimeError):
+            await run_async(parse_statements(['INNUM X']), make_reader(), RecordingWriter())
+
+
+    async def test_long_programs_let_other_tasks_run(self):
+        program = list(parse_statements(['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < 5000', 'PRINT I']))
+        writers = [RecordingWriter(), RecordingWriter()]
+
+        await asyncio.gather(*(
+            run_async(program, make_reader(), writer, slice_size = 100)
+            for writer in writers
+        ))
+
+        for writer in writers:
+            self.assertEqual(writer.lines(), ['5000'])
+            self.assertGreater(writer.drain_count, 100)
+
+
+    async def test_running_past_the_budget_is_a_limit_error(self):
+        program = parse_statements(['LOOP: INNUM X', 'GOTO "LOOP"'])
+
+        with self.assertRaises(GrinLimitError):
+            await run_async(program, make_reader('1\n' * 1000), RecordingWriter(), slice_size = 10, budget = 100)
+
+
+    async def test_slice_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            await run_async([], make_reader(), RecordingWriter(), slice_size = 0)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# test_batch.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.batch module.
+
+from grin.batch import find_programs, run_batch, run_program, GrinBatchProgram
+import os
+import tempfile
+import unittest
+
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def write_file(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+
+        with open(path, 'w', encoding = 'utf-8') as file:
+            file.write(content)
+
+        return path
+
+
+    def test_finding_programs_in_a_directory(self):
+        first = self.write_file('first.grin', 'PRINT 1\n')
+        self.write_file('first.in', '1\n')
+        second = self.write_file('second.grin', 'PRINT 2\n')
+        self.write_file('notes.txt', 'ignored\n')
+
+        programs = find_programs(self.directory.name)
+
+        self.assertEqual([program.program_path() for program in programs], [first, second])
+        self.assertEqual(programs[0].input_path(), os.path.join(self.directory.name, 'first.in'))
+        self.assertIsNone(programs[1].input_path())
+
+
+    def test_finding_programs_in_a_manifest(self):
+        manifest = self.write_file('batch.txt', 'b.grin b.in\n\na.grin\n')
+        programs = find_programs(manifest)
+
+        self.assertEqual(
+            [(program.program_path(), program.input_path()) for program in programs],
+            [
+                (os.path.join(self.directory.name, 'b.grin'), os.path.join(self.directory.name, 'b.in')),
+                (os.path.join(self.directory.name, 'a.grin'), None)
+            ])
+
+
+    def test_running_a_program_captures_its_input_and_output(self):
+        program = GrinBatchProgram(
+            self.write_file('p.grin', 'INNUM X\nINSTR NAME\nPRINT X\nPRINT NAME\n'),
+            self.write_file('p.in', '3\r\nBoo\r\n'))
+
+        result = run_program(program)
+
+        self.assertIs(result.program(), program)
+        self.assertEqual(result.output(), ['3', 'Boo'])
+        self.assertIsNone(result.error())
+
+
+    def test_input_lines_are_split_as_project3_splits_them(self):
+        program = GrinBatchProgram(
+            self.write_file('p.grin', 'INSTR A\nINSTR B\nPRINT A\nPRINT B\n'),
+            self.write_file('p.in', 'one\x0ctwo\r\nthree\u2028four\n'))
+
+        self.assertEqual(run_program(program).output(), ['one\x0ctwo', 'three\u2028four'])
+
+
+    def test_programs_are_not_cached(self):
+        run_program(GrinBatchProgram(self.write_file('p.grin', 'PRINT 1\n')))
+        self.assertEqual(os.listdir(self.directory.name), ['p.grin'])
+
+
+    def test_errors_are_captured_after_the_output(self):
+        result = run_program(GrinBatchProgram(self.write_file('p.grin', 'PRINT 1\nRETURN\n')))
+        self.assertEqual(result.output(), ['1', result.error()])
+        self.assertIn('RETURN', result.error())
+
+
+    def test_running_out_of_input_is_an_error(self):
+        result = run_program(GrinBatchProgram(self.write_file('p.grin', 'INSTR X\n')))
+        self.assertIsNotNone(result.error())
+
+
+    def test_results_are_in_the_same_order_as_the_programs(self):
+        programs = [
+            GrinBatchProgram(self.write_file(f'p{n}.grin', f'PRINT {n}\n'))
+            for n in range(12)
+        ]
+
+        results = run_batch(programs, max_workers = 2, chunk_size = 3)
+
+        self.assertEqual([result.output() for result in results], [[str(n)] for n in range(12)])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# test_bytecode.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.bytecode module.
+
+from grin.bytecode import compile_bytecode, fuse_instructions, GrinOpcode
+from grin.parsing import parse_statements
+from grin.resolution import resolve
+import unittest
+
+
+
+def compile_lines(lines: list[str]):
+    return compile_bytecode(resolve(parse_statements(lines)))
+
+
+
+class TestGrinBytecode(unittest.TestCase):
+    def opcodes(self, lines: list[str]) -> list[GrinOpcode]:
+        return [opcode for opcode, _, _, _ in compile_lines(lines).instructions()]
+
+
+    def test_variables_precede_constants_in_values(self):
+        bytecode = compile_lines(['LET X "Boo"', 'LET Y 1', 'LET Z 1.0', 'LET X "Boo"'])
+        self.assertEqual(bytecode.initial_values(), [0, 0, 0, 'Boo', 1, 1.0])
+
+
+    def test_integer_constants_are_added_directly(self):
+        bytecode = compile_lines(['ADD X 3', 'SUB X 2', 'ADD X 2.5', 'MULT X 2'])
+
+        self.assertEqual(list(bytecode.instructions()), [
+            (GrinOpcode.ADD_VAR_CONST, 0, 3, 0),
+            (GrinOpcode.SUB_VAR_CONST, 0, 2, 0),
+            (GrinOpcode.ADD, 0, 1, 0),
+            (GrinOpcode.MULT, 0, 2, 0)
+        ])
+
+
+    def test_comparisons_with_numeric_constants_are_typed(self):
+        self.assertEqual(
+            self.opcodes(['LOOP: ADD I 1', 'GOTO "LOOP" IF I < 10', 'GOTO -2 IF I = "A"', 'GOTO -3 IF 1 >= I']),
+            [GrinOpcode.ADD_VAR_CONST, GrinOpcode.JUMP_IF_LT_VAR_CONST, GrinOpcode.JUMP_IF_EQ, GrinOpcode.JUMP_IF_GE])
+
+
+    def test_jumps_go_to_the_first_instruction_of_their_statement(self):
+        bytecode = compile_lines(['GOSUB 2 IF X > 1', 'END', 'GOTO -2'])
+        instructions = list(bytecode.instructions())
+
+        self.assertEqual(list(bytecode.starts()), [0, 2, 3, 4])
+        self.assertEqual(instructions[0][0], GrinOpcode.JUMP_UNLESS_GT)
+        self.assertEqual(instructions[0][3], 2)
+        self.assertEqual(instructions[1], (GrinOpcode.GOSUB, 3, 0, 0))
+        self.assertEqual(instructions[3], (GrinOpcode.JUMP, 0, 0, 0))
+        self.assertEqual(list(bytecode.lines()), [1, 1, 2, 3])
+
+
+    def test_dynamic_and_impossible_jumps(self):
+        bytecode = compile_lines(['GOTO X', 'GOSUB X', 'GOTO "NOWHERE"'])
+        instructions = list(bytecode.instructions())
+
+        self.assertEqual(instructions[0], (GrinOpcode.JUMP_DYNAMIC, 0, 0, 0))
+        self.assertEqual(instructions[1], (GrinOpcode.GOSUB_DYNAMIC, 0, 1, 0))
+        self.assertEqual(instructions[2][0], GrinOpcode.FAIL)
+        self.assertEqual(bytecode.initial_values()[instructions[2][1]], 'Unknown label "NOWHERE"')
+
+
+    def test_common_pairs_are_fused(self):
+        bytecode = compile_lines([
+            'LOOP: LET X I', 'PRINT X', 'ADD I 1', 'GOTO "LOOP" IF I < 10',
+            'ADD I 1', 'GOTO "LOOP"', 'ADD I 1', 'GOTO "LOOP" IF I = "A"'
+        ])
+
+        self.assertEqual(fuse_instructions(bytecode), 3)
+
+        self.assertEqual(
+            [opcode for opcode, _, _, _ in bytecode.instructions()],
+            [
+                GrinOpcode.LET_PRINT, GrinOpcode.PRINT,
+                GrinOpcode.ADD_VAR_CONST_JUMP_IF_VAR_CONST, GrinOpcode.JUMP_IF_LT_VAR_CONST,
+                GrinOpcode.ADD_VAR_CONST_JUMP, GrinOpcode.JUMP,
+                GrinOpcode.ADD_VAR_CONST, GrinOpcode.JUMP_IF_EQ
+            ])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# test_caching.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.caching module.
+
+from grin.caching import GrinProgramCache
+import grin.caching
+from grin.lexing import to_program_tokens
+from grin.parsing import parse_statements
+import os
+import tempfile
+import unittest
+
+
+
+_SOURCE = '''START: LET NAME "Boo"
+INNUM X
+INSTR Y
+ADD X 1.5
+SUB X -2
+MULT NAME 3
+DIV X Y
+PRINT NAME
+GOSUB "START" IF X <= 3
+GOTO -2 IF NAME <> "Boo"
+GOTO X
+RETURN
+END
+'''.encode(encoding = 'utf-8')
+
+
+
+class TestGrinProgramCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = GrinProgramCache(os.path.join(self.directory.name, '__grincache__'))
+        self.parse_count = 0
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def parse(self, source: bytes = _SOURCE) -> list:
+        self.parse_count += 1
+        return list(parse_statements(to_program_tokens(source)))
+
+
+    def load(self, source: bytes = _SOURCE) -> list:
+        return self.cache.load(source, lambda: self.parse(source))
+
+
+    def only_entry(self) -> str:
+        [name] = os.listdir(self.cache.directory())
+        return os.path.join(self.cache.directory(), name)
+
+
+    def test_cached_programs_are_not_parsed_again(self):
+        first = self.load()
+        second = self.load()
+        self.assertEqual(first, self.parse())
+        self.assertEqual(second, first)
+        self.assertEqual(self.parse_count, 2)
+
+
+    def test_changed_programs_miss_the_cache(self):
+        self.load()
+        changed = _SOURCE.replace(b'"Boo"', b'"Boo!"')
+        self.assertEqual(self.load(changed), self.parse(changed))
+        self.assertEqual(len(os.listdir(self.cache.directory())), 2)
+
+
+    def test_signed_zeros_are_not_confused(self):
+        source = b'PRINT 0.0\nPRINT -0.0\nPRINT 0\n'
+        self.load(source)
+        values = [statement.value().value() for statement in self.load(source)]
+        self.assertEqual([repr(value) for value in values], ['0.0', '-0.0', '0'])
+
+
+    def test_corrupt_entries_are_rebuilt(self):
+        self.load()
+        path = self.only_entry()
+
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        for corrupted in (data[:10], data[:-1], data[:-1] + bytes([data[-1] ^ 1]), b''):
+            with self.subTest(corrupted = corrupted[:12]):
+                with open(path, 'wb') as file:
+                    file.write(corrupted)
+
+                parse_count = self.parse_count
+                self.assertEqual(self.load(), self.parse())
+                self.assertEqual(self.parse_count, parse_count + 2)
+
+                with open(path, 'rb') as file:
+                    self.assertEqual(file.read(), data)
+
+
+    def test_entries_from_other_grin_versions_are_not_used(self):
+        self.load()
+        original_version = grin.caching.GRIN_VERSION
+
+        try:
+            grin.caching.GRIN_VERSION = original_version + '+1'
+            self.load()
+        finally:
+            grin.caching.GRIN_VERSION = original_version
+
+        self.assertEqual(self.parse_count, 2)
+
+
+    def test_failing_to_write_the_cache_is_not_an_error(self):
+        with open(self.cache.directory(), 'w'):
+            pass
+
+        self.assertEqual(self.load(), self.parse())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
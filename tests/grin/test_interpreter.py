@@ -0,0 +1,319 @@
+# test_interpreter.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.interpreter module.
+
+from grin.interpreter import interpret, GrinOutputBuffer, GrinRuntimeError, LIMIT_CHECK_INTERVAL
+from grin.location import GrinLocation
+from grin.parsing import parse, parse_statements
+from grin.runtime import GrinLimitError
+import contextlib
+import io
+import time
+import unittest
+
+
+
+def run(
+        lines: list[str], inputs: list[str] = (),
+        engine: str = 'statements', fuse: bool = True) -> list[str]:
+    remaining = iter(inputs)
+    output = []
+
+    def input_line() -> str:
+        try:
+            return next(remaining)
+        except StopIteration:
+            raise EOFError from None
+
+    interpret(
+        parse_statements(lines), input_line = input_line,
+        output_line = output.append, engine = engine, fuse = fuse)
+    return output
+
+
+
+class TestGrinInterpreter(unittest.TestCase):
+    engine = 'statements'
+
+
+    def run_program(self, lines: list[str], inputs: list[str] = ()) -> list[str]:
+        return run(lines, inputs, self.engine)
+
+
+    def assertRuntimeError(self, lines: list[str], line_number: int, inputs: list[str] = ()) -> None:
+        with self.assertRaises(GrinRuntimeError) as context:
+            self.run_program(lines, inputs)
+
+        self.assertEqual(context.exception.location(), GrinLocation(line_number, 1))
+
+
+    def test_unassigned_variables_are_zero(self):
+        self.assertEqual(self.run_program(['PRINT X']), ['0'])
+
+
+    def test_arithmetic(self):
+        lines = [
+            'LET A 7', 'ADD A 3', 'PRINT A',
+            'SUB A 0.5', 'PRINT A',
+            'LET B 7', 'DIV B 2', 'PRINT B',
+            'LET C 7.0', 'DIV C 2', 'PRINT C',
+            'LET S "Boo"', 'MULT S 3', 'PRINT S',
+            'ADD S "!"', 'PRINT S'
+        ]
+
+        self.assertEqual(self.run_program(lines), ['10', '9.5', '3', '3.5', 'BooBooBoo', 'BooBooBoo!'])
+
+
+    def test_equal_constants_that_print_differently(self):
+        lines = ['LET I -0.0', 'PRINT I', 'PRINT 0.0', 'PRINT -0.0', 'PRINT 1', 'PRINT 1.0']
+        self.assertEqual(self.run_program(lines), ['-0.0', '0.0', '-0.0', '1', '1.0'])
+
+
+    def test_invalid_arithmetic_is_a_runtime_error(self):
+        for lines in (['LET A "Boo"', 'ADD A 1'], ['LET A 1', 'DIV A 0'], ['SUB A "Boo"']):
+            with self.subTest(lines = lines):
+                self.assertRuntimeError(lines, len(lines))
+
+
+    def test_loops_with_conditional_jumps(self):
+        lines = [
+            'LET I 0',
+            'LOOP: ADD I 1',
+            'PRINT I',
+            'GOTO "LOOP" IF I < 3',
+            'END',
+            'PRINT "unreachable"'
+        ]
+
+        self.assertEqual(self.run_program(lines), ['1', '2', '3'])
+
+
+    def test_relative_jumps_and_variable_targets(self):
+        lines = ['LET T 2', 'GOTO T', 'PRINT "skipped"', 'GOTO -3 IF "A" > "B"', 'PRINT "done"']
+        self.assertEqual(self.run_program(lines), ['done'])
+
+
+    def test_gosub_and_return(self):
+        lines = ['GOSUB "PROC"', 'PRINT "back"', 'END', 'PROC: PRINT "in"', 'RETURN']
+        self.assertEqual(self.run_program(lines), ['in', 'back'])
+
+
+    def test_invalid_jumps_are_runtime_errors(self):
+        for lines in (['GOTO 0'], ['GOTO 3'], ['GOTO "NOWHERE"'], ['LET T 1.5', 'GOTO T'], ['RETURN']):
+            with self.subTest(lines = lines):
+                self.assertRuntimeError(lines, len(lines))
+
+
+    def test_impossible_jumps_fail_only_when_executed(self):
+        self.assertEqual(self.run_program(['PRINT 1', 'END', 'GOTO "NOWHERE"']), ['1'])
+
+
+    def test_impossible_jumps_fail_before_running_when_strict(self):
+        output = []
+
+        with self.assertRaises(GrinRuntimeError) as context:
+            interpret(
+                parse_statements(['PRINT 1', 'END', 'GOTO "NOWHERE"']),
+                output_line = output.append, strict = True, engine = self.engine)
+
+        self.assertEqual(context.exception.location(), GrinLocation(3, 1))
+        self.assertEqual(output, [])
+
+
+    def test_jumping_just_past_the_end_ends_the_program(self):
+        self.assertEqual(self.run_program(['GOTO 2', 'PRINT "Boo"']), [])
+
+
+    def test_comparing_strings_to_numbers_is_a_runtime_error(self):
+        self.assertRuntimeError(['GOTO 1 IF "A" = 1'], 1)
+
+
+    def test_input(self):
+        lines = ['INNUM A', 'INNUM B', 'INSTR C', 'PRINT A', 'PRINT B', 'PRINT C']
+        self.assertEqual(self.run_program(lines, [' 12 ', '-3.5', 'Hello Boo!']), ['12', '-3.5', 'Hello Boo!'])
+
+
+    def test_invalid_input_is_a_runtime_error(self):
+        self.assertRuntimeError(['INNUM A'], 1, ['twelve'])
+        self.assertRuntimeError(['INSTR A', 'INSTR B'], 2, ['only one'])
+
+
+    def test_token_lists_from_parse_can_be_interpreted(self):
+        output = []
+        interpret(parse(['LET X "Boo"', 'PRINT X']), output_line = output.append, engine = self.engine)
+        self.assertEqual(output, ['Boo'])
+
+
+    def test_optimized_programs_behave_identically(self):
+        output = []
+        lines = ['LET X 5', 'ADD X 1', 'GOTO 2 IF 1 < 2', 'PRINT "skipped"', 'PRINT X']
+        interpret(parse_statements(lines), output_line = output.append, engine = self.engine, optimize = True)
+        self.assertEqual(output, ['6'])
+
+
+    def test_unknown_engines_are_rejected(self):
+        with self.assertRaises(ValueError):
+            run(['END'], engine = 'unknown')
+
+
+    def test_running_past_the_budget_is_a_limit_error(self):
+        lines = ['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP"']
+
+        with self.assertRaises(GrinLimitError) as context:
+            interpret(parse_statements(lines), output_line = print, engine = self.engine, budget = 5000)
+
+        self.assertIn(context.exception.location().line(), (2, 3))
+        self.assertIsInstance(context.exception, GrinRuntimeError)
+
+
+    def test_programs_within_their_budget_run_to_completion(self):
+        output = []
+        lines = ['LET I 0', 'LOOP: INNUM N', 'ADD I N', 'GOTO "LOOP" IF I < 3000', 'PRINT I']
+        interpret(
+            parse_statements(lines), input_line = lambda: '1', output_line = output.append,
+            engine = self.engine, budget = 3 * 3000 + LIMIT_CHECK_INTERVAL)
+        self.assertEqual(output, ['3000'])
+
+
+    def test_running_past_the_deadline_is_a_limit_error(self):
+        lines = ['LOOP: GOTO "LOOP"']
+
+        with self.assertRaises(GrinLimitError) as context:
+            interpret(parse_statements(lines), engine = self.engine, deadline = time.monotonic() + 0.05)
+
+        self.assertEqual(context.exception.location(), GrinLocation(1, 1))
+
+
+
+class TestGrinClosureInterpreter(TestGrinInterpreter):
+    engine = 'closures'
+
+
+
+class TestGrinBytecodeInterpreter(TestGrinInterpreter):
+    engine = 'bytecode'
+
+
+
+class TestGrinSuperinstructions(unittest.TestCase):
+    def assertFusingPreservesBehavior(self, lines: list[str], inputs: list[str] = ()) -> None:
+        results = []
+
+        for fuse in (False, True):
+            try:
+                results.append(('output', run(lines, inputs, 'bytecode', fuse)))
+            except GrinRuntimeError as e:
+                results.append(('error', str(e)))
+
+        self.assertEqual(results[0], results[1])
+
+
+    def test_increment_and_branch_loops(self):
+        for operator in ['<', '<=', '>', '>=', '=', '<>']:
+            with self.subTest(operator = operator):
+                self.assertFusingPreservesBehavior([
+                    'LET I 0',
+                    'LOOP: PRINT I',
+                    'ADD I 1',
+                    f'GOTO "LOOP" IF I {operator} 5',
+                    'PRINT "done"'
+                ])
+
+
+    def test_increment_and_unconditional_jump(self):
+        self.assertFusingPreservesBehavior([
+            'TOP: GOTO "DONE" IF I >= 3', 'PRINT I', 'ADD I 1', 'GOTO "TOP"', 'DONE: PRINT I'
+        ])
+
+
+    def test_assignment_and_print(self):
+        self.assertFusingPreservesBehavior(['LET X "Boo"', 'PRINT X', 'LET Y X', 'PRINT Y', 'LET Z 1', 'PRINT X'])
+
+
+    def test_jumps_to_the_second_instruction_of_a_pair(self):
+        self.assertFusingPreservesBehavior([
+            'LET T 4', 'GOSUB T', 'LET X 1', 'PRINT X', 'ADD I 1', 'GOTO 2 IF I < 2', 'RETURN'
+        ])
+
+
+    def test_errors_in_either_half_of_a_pair(self):
+        programs = [
+            ['LET I "A"', 'ADD I 1', 'GOTO -1 IF I < 3'],
+            ['LET I "A"', 'ADD J 1', 'GOTO -1 IF I < 3'],
+            ['ADD I 1', 'GOTO "NOWHERE"'],
+            ['LET X 1', 'PRINT X', 'RETURN']
+        ]
+
+        for lines in programs:
+            with self.subTest(lines = lines):
+                self.assertFusingPreservesBehavior(lines)
+
+
+
+class RecordingStream(io.StringIO):
+    def __init__(self, is_terminal: bool = False):
+        super().__init__()
+        self.is_terminal = is_terminal
+        self.writes = []
+
+
+    def write(self, text: str) -> int:
+        self.writes.append(text)
+        return super().write(text)
+
+
+    def isatty(self) -> bool:
+        return self.is_terminal
+
+
+
+class TestGrinOutputBuffer(unittest.TestCase):
+    def test_lines_are_written_together_when_the_buffer_is_full(self):
+        stream = RecordingStream()
+        output = GrinOutputBuffer(stream, buffer_size = 8)
+
+        for line in ('Boo', 'is', 'happy', 'now'):
+            output.write_line(line)
+
+        self.assertEqual(stream.writes, ['Boo\nis\nhappy\n'])
+        output.flush()
+        self.assertEqual(stream.getvalue(), 'Boo\nis\nhappy\nnow\n')
+
+
+    def test_lines_are_written_immediately_to_a_terminal(self):
+        stream = RecordingStream(is_terminal = True)
+        output = GrinOutputBuffer(stream)
+        output.write_line('Boo')
+        output.write_line('is happy')
+        self.assertEqual(stream.writes, ['Boo\n', 'is happy\n'])
+
+
+    def test_output_is_flushed_before_input_is_read(self):
+        stream = RecordingStream()
+        inputs = []
+
+        with contextlib.redirect_stdout(stream):
+            interpret(
+                parse_statements(['PRINT "Name?"', 'INSTR NAME', 'PRINT NAME', 'PRINT "Bye"']),
+                input_line = lambda: inputs.append(stream.getvalue()) or 'Boo')
+
+        self.assertEqual(inputs, ['Name?\n'])
+        self.assertEqual(stream.writes, ['Name?\n', 'Boo\nBye\n'])
+
+
+    def test_output_is_flushed_when_a_runtime_error_occurs(self):
+        stream = RecordingStream()
+
+        with contextlib.redirect_stdout(stream):
+            with self.assertRaises(GrinRuntimeError):
+                interpret(parse_statements(['PRINT 1', 'PRINT 2', 'RETURN']))
+
+        self.assertEqual(stream.getvalue(), '1\n2\n')
+
+
+
+if __name__ == '__main__':
+    unittest.main()
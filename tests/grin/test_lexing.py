@@ -8,7 +8,7 @@
 # WHAT YOU NEED TO DO: Nothing, unless you make changes to grin.lexing
 # (which shouldn't be necessary).
 
-from grin.lexing import to_tokens, GrinLexError, KEYWORDS
+from grin.lexing import to_tokens, to_program_tokens, GrinLexError, KEYWORDS
 from grin.location import GrinLocation
 from grin.token import GrinTokenKind, GrinToken
 import unittest
@@ -149,6 +149,132 @@ class TestGrinLexing(unittest.TestCase):
                 location = GrinLocation(1, 19)))
 
 
+    def test_tokens_are_separated_by_any_whitespace(self):
+        self.assertTokens(
+            'LET\tX\x0c\x1f 5 ', 7,
+            GrinToken(
+                kind = GrinTokenKind.LET, text = 'LET', value = 'LET',
+                location = GrinLocation(7, 1)),
+            GrinToken(
+                kind = GrinTokenKind.IDENTIFIER, text = 'X', value = 'X',
+                location = GrinLocation(7, 5)),
+            GrinToken(
+                kind = GrinTokenKind.LITERAL_INTEGER, text = '5', value = 5,
+                location = GrinLocation(7, 9)))
+
+
+    def test_can_recognize_adjacent_tokens_without_whitespace(self):
+        self.assertTokens(
+            'X<=-5.5.', 1,
+            GrinToken(
+                kind = GrinTokenKind.IDENTIFIER, text = 'X', value = 'X',
+                location = GrinLocation(1, 1)),
+            GrinToken(
+                kind = GrinTokenKind.LESS_THAN_OR_EQUAL, text = '<=',
+                location = GrinLocation(1, 2)),
+            GrinToken(
+                kind = GrinTokenKind.LITERAL_FLOAT, text = '-5.5', value = -5.5,
+                location = GrinLocation(1, 4)),
+            GrinToken(
+                kind = GrinTokenKind.DOT, text = '.',
+                location = GrinLocation(1, 8)))
+
+
+    def test_can_recognize_non_ascii_letters_and_whitespace(self):
+        self.assertTokens(
+            '\u00a0CAF\u00c9', 1,
+            GrinToken(
+                kind = GrinTokenKind.IDENTIFIER, text = 'CAF\u00c9', value = 'CAF\u00c9',
+                location = GrinLocation(1, 2)))
+
+
+    def test_errors_are_reported_after_preceding_tokens(self):
+        tokens = to_tokens('PRINT X !', 1)
+        self.assertEqual(next(tokens).kind(), GrinTokenKind.PRINT)
+        self.assertEqual(next(tokens).kind(), GrinTokenKind.IDENTIFIER)
+
+        with self.assertRaises(GrinLexError) as context:
+            next(tokens)
+
+        self.assertEqual(context.exception.location(), GrinLocation(1, 9))
+        self.assertEqual(str(context.exception), 'Error during lexing: Line 1 Column 9: Invalid character')
+
+
+    def test_tokens_with_same_keyword_or_punctuation_share_their_text(self):
+        first, second = list(to_tokens('END', 1)), list(to_tokens('X<2 END', 2))
+        self.assertIs(first[0].text(), second[3].text())
+        self.assertIs(list(to_tokens('<', 1))[0].text(), second[1].text())
+
+
+
+class TestGrinProgramLexing(unittest.TestCase):
+    LINES = ['START: LET X 5', '  PRINT "Boo"', '', 'GOTO "START" IF X < 10']
+
+
+    def test_program_tokens_match_tokens_of_each_line(self):
+        for line_ending in ('\n', '\r\n', '\r'):
+            with self.subTest(line_ending = line_ending):
+                lexed = to_program_tokens(''.join(line + line_ending for line in self.LINES))
+                self.assertEqual(lexed.line_count(), len(self.LINES))
+
+                for line_number, line in enumerate(self.LINES, start = 1):
+                    self.assertEqual(lexed.line_tokens(line_number), list(to_tokens(line, line_number)))
+                    self.assertEqual(lexed.line_length(line_number), len(line))
+
+
+    def test_line_ranges_are_offsets_into_flat_tokens(self):
+        lexed = to_program_tokens('\n'.join(self.LINES))
+        self.assertEqual(len(lexed.tokens()), 13)
+        self.assertEqual(lexed.line_range(1), (0, 5))
+        self.assertEqual(lexed.line_range(3), (7, 7))
+        self.assertEqual(lexed.line_range(4), (7, 13))
+
+
+    def test_can_lex_bytes_and_memoryviews(self):
+        text = '\n'.join(self.LINES)
+        expected = list(to_program_tokens(text).tokens())
+
+        for source in (text.encode('utf-8'), memoryview(text.encode('utf-8'))):
+            with self.subTest(source = source):
+                self.assertEqual(list(to_program_tokens(source).tokens()), expected)
+
+
+    def test_lexing_bytes_reports_errors_as_lexing_text_does(self):
+        for text in ('PRINT 1\nLET X "Boo\nEND\n', 'PRINT 1\n  -\n', 'LET X @\n', 'LET X @\r\n', 'LET \u00e9 @\n'):
+            with self.subTest(text = text):
+                expected = to_program_tokens(text, defer_errors = True)
+                lexed = to_program_tokens(text.encode(encoding = 'utf-8'), defer_errors = True)
+                self.assertEqual(list(lexed.tokens()), list(expected.tokens()))
+                self.assertEqual(str(lexed.error()), str(expected.error()))
+
+
+    def test_can_lex_non_ascii_programs(self):
+        lexed = to_program_tokens('PRINT "\u00e9t\u00e9"\nEND\n')
+        self.assertEqual(lexed.line_count(), 2)
+        self.assertEqual(lexed.tokens()[1].value(), '\u00e9t\u00e9')
+        self.assertEqual(lexed.tokens()[2].location(), GrinLocation(2, 1))
+
+
+    def test_lexing_stops_after_end_of_program_marker(self):
+        lexed = to_program_tokens('END\n.\n!!!\n')
+        self.assertEqual(lexed.line_count(), 2)
+        self.assertEqual(lexed.line_tokens(2)[0].kind(), GrinTokenKind.DOT)
+
+
+    def test_lex_errors_are_raised_with_their_line_and_column(self):
+        with self.assertRaises(GrinLexError) as context:
+            to_program_tokens('END\nPRINT "Boo\nEND\n')
+
+        self.assertEqual(context.exception.location(), GrinLocation(2, 11))
+
+
+    def test_lex_errors_can_be_deferred(self):
+        lexed = to_program_tokens('END\nPRINT -\nEND\n', defer_errors = True)
+        self.assertEqual(lexed.line_count(), 1)
+        self.assertEqual(len(lexed.tokens()), 1)
+        self.assertEqual(lexed.error().location(), GrinLocation(2, 8))
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+# test_loading.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.loading module.
+
+from grin.ast import LetStatement, PrintStatement
+from grin.lexing import GrinLexError
+from grin.loading import load_file, run_file
+from grin.location import GrinLocation
+from grin.parsing import GrinParseError
+import os
+import tempfile
+import unittest
+
+
+
+class TestLoadingFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def write_file(self, content: bytes) -> str:
+        path = os.path.join(self.directory.name, 'program.grin')
+
+        with open(path, 'wb') as file:
+            file.write(content)
+
+        return path
+
+
+    def test_loading_stops_at_the_end_of_program(self):
+        path = self.write_file(b'LET X 1\nPRINT X\n.\nPRINT "ignored"\n')
+        self.assertEqual([type(statement) for statement in load_file(path)], [LetStatement, PrintStatement])
+
+
+    def test_empty_files_are_empty_programs(self):
+        self.assertEqual(load_file(self.write_file(b'')), [])
+
+
+    def test_non_ascii_and_windows_line_endings(self):
+        path = self.write_file('PRINT "été"\r\nPRINT 1\r\n'.encode(encoding = 'utf-8'))
+        output = []
+        run_file(path, output_line = output.append)
+        self.assertEqual(output, ['été', '1'])
+
+
+    def test_running_passes_options_along(self):
+        path = self.write_file(b'INSTR NAME\nPRINT NAME\n')
+        output = []
+        run_file(path, input_line = lambda: 'Boo', output_line = output.append, engine = 'bytecode')
+        self.assertEqual(output, ['Boo'])
+
+
+    def test_programs_are_cached_alongside_their_files(self):
+        path = self.write_file(b'LET X 1\nPRINT X\n')
+        cache_directory = os.path.join(self.directory.name, '__grincache__')
+
+        load_file(path, cache = False)
+        self.assertFalse(os.path.exists(cache_directory))
+
+        self.assertEqual(load_file(path), load_file(path, cache = False))
+        self.assertEqual(len(os.listdir(cache_directory)), 1)
+        self.assertEqual(load_file(path), load_file(path, cache = False))
+
+
+    def test_errors_are_raised_before_the_program_runs(self):
+        for content, error_type, location in [
+                (b'PRINT 1\nLET X @\n', GrinLexError, GrinLocation(2, 7)),
+                (b'PRINT 1\nLET X\n', GrinParseError, GrinLocation(2, 6))]:
+            with self.subTest(content = content):
+                output = []
+
+                with self.assertRaises(error_type) as context:
+                    run_file(self.write_file(content), output_line = output.append)
+
+                self.assertEqual(context.exception.location(), location)
+                self.assertEqual(output, [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
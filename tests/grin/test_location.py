@@ -9,6 +9,7 @@
 # (which shouldn't be necessary).
 
 from grin import GrinLocation
+import pickle
 import unittest
 
 
@@ -46,6 +47,29 @@ class TestGrinLocation(unittest.TestCase):
         self.assertEqual(repr(location), 'GrinLocation(11, 7)')
 
 
+    def test_locations_with_same_line_and_column_are_interned(self):
+        self.assertIs(GrinLocation(11, 7), GrinLocation(11, 7))
+
+
+    def test_equal_locations_have_equal_hashes(self):
+        self.assertEqual(hash(GrinLocation(11, 7)), hash(GrinLocation(11, 7)))
+        self.assertEqual(len({GrinLocation(11, 7), GrinLocation(11, 7), GrinLocation(7, 11)}), 2)
+
+
+    def test_locations_are_immutable(self):
+        location = GrinLocation(11, 7)
+
+        with self.assertRaises(AttributeError):
+            location._line = 3
+
+        self.assertEqual(location.line(), 11)
+
+
+    def test_can_be_pickled(self):
+        location = GrinLocation(11, 7)
+        self.assertIs(pickle.loads(pickle.dumps(location)), location)
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+# test_optimizing.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.optimizing module.
+
+from grin.ast import *
+from grin.interpreter import interpret, GrinRuntimeError
+from grin.optimizing import optimize
+from grin.parsing import parse_statements
+import unittest
+
+
+
+class TestGrinOptimizing(unittest.TestCase):
+    def optimize_lines(self, lines: list[str]):
+        return optimize(parse_statements(lines))
+
+
+    def assertBehavesIdentically(self, lines: list[str]) -> None:
+        results = []
+
+        for statements in (list(parse_statements(lines)), self.optimize_lines(lines).statements()):
+            output = []
+
+            try:
+                interpret(statements, output_line = output.append)
+                results.append(output)
+            except GrinRuntimeError as e:
+                results.append((output, str(e)))
+
+        self.assertEqual(results[0], results[1])
+
+
+    def test_literal_conditions_are_decided(self):
+        optimized = self.optimize_lines(['GOTO 2 IF 1 < 2', 'GOTO 1 IF "B" < "A"', 'PRINT 1'])
+
+        self.assertEqual(optimized.statements(), [
+            GotoStatement(line = 1, target = Constant(1)),
+            PrintStatement(line = 3, value = Constant(1))
+        ])
+
+        self.assertEqual(optimized.report(), [
+            'Line 1: folded into GOTO without a condition',
+            'Line 2: removed (condition is always false)'
+        ])
+
+
+    def test_comparisons_that_would_fail_are_left_alone(self):
+        optimized = self.optimize_lines(['GOTO 1 IF 1 < "A"'])
+        self.assertEqual(optimized.report(), [])
+
+
+    def test_literal_arithmetic_is_folded(self):
+        optimized = self.optimize_lines(['LET X 5', 'ADD X 3', 'MULT X 2', 'DIV X 0', 'PRINT X'])
+
+        self.assertEqual(optimized.statements(), [
+            LetStatement(line = 3, target = 'X', value = Constant(16)),
+            DivStatement(line = 4, target = 'X', value = Constant(0)),
+            PrintStatement(line = 5, value = Variable('X'))
+        ])
+
+        self.assertEqual(
+            [reason for _, reason in optimized.removed()],
+            ['overwritten by the next statement'] * 2)
+
+
+    def test_arithmetic_that_can_be_jumped_to_is_not_folded(self):
+        lines = ['LET X 5', 'ADD X 3', 'PRINT X', 'GOTO -2 IF X < 20']
+        self.assertEqual(self.optimize_lines(lines).report(), [])
+        self.assertBehavesIdentically(lines)
+
+
+    def test_unreachable_unlabeled_statements_are_removed(self):
+        lines = ['GOTO 2', 'PRINT "skipped"', 'GOSUB 3', 'END', 'PRINT "skipped"', 'PROC: PRINT "in"', 'RETURN']
+        optimized = self.optimize_lines(lines)
+
+        self.assertEqual(
+            [(statement.line(), reason) for statement, reason in optimized.removed()],
+            [(2, 'unreachable'), (5, 'unreachable')])
+
+        self.assertEqual(optimized.statements()[0], GotoStatement(line = 1, target = Constant(1)))
+        self.assertEqual(optimized.statements()[1], GosubStatement(line = 3, target = Constant(2)))
+        self.assertBehavesIdentically(lines)
+
+
+    def test_labeled_statements_are_kept(self):
+        self.assertEqual(self.optimize_lines(['END', 'UNUSED: PRINT 1']).removed(), [])
+
+
+    def test_nothing_is_removed_when_a_jump_target_is_a_variable(self):
+        lines = ['LET T 2', 'GOTO T', 'PRINT "skipped"', 'GOTO 2 IF 1 > 2', 'END', 'PRINT "dead"']
+        optimized = self.optimize_lines(lines)
+
+        self.assertEqual(optimized.removed(), [])
+        self.assertEqual(len(optimized.statements()), len(lines))
+        self.assertBehavesIdentically(lines)
+
+
+    def test_jumps_to_removed_statements_never_become_jumps_to_themselves(self):
+        lines = ['LET X 0', 'GOTO 5 IF 1 > 2', 'ADD X 1', 'GOTO -1 IF X < 3', 'PRINT X']
+        self.assertBehavesIdentically(lines)
+
+        lines = ['GOTO 1 IF 1 > 2', 'ADD X 1', 'GOTO -2 IF X < 3', 'PRINT X']
+        self.assertBehavesIdentically(lines)
+
+
+    def test_errors_are_reported_on_the_original_lines(self):
+        self.assertBehavesIdentically(['GOTO 2', 'PRINT "dead"', 'LET X "A"', 'ADD X 1'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# test_package.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the 'grin' package itself, whose names are imported from its
+# submodules lazily.
+
+import grin
+import importlib
+import subprocess
+import sys
+import unittest
+
+
+
+class TestGrinPackage(unittest.TestCase):
+    def test_every_submodule_export_is_listed(self):
+        for module_name, names in grin._EXPORTS_BY_MODULE.items():
+            with self.subTest(module_name = module_name):
+                module = importlib.import_module(f'grin.{module_name}')
+                self.assertEqual(names, module.__all__)
+
+
+    def test_names_are_found_in_their_submodules(self):
+        from grin.parsing import parse
+        self.assertIs(grin.parse, parse)
+        self.assertIn('parse', dir(grin))
+
+
+    def test_submodules_are_available_as_attributes(self):
+        self.assertEqual(grin.streaming.__name__, 'grin.streaming')
+
+
+    def test_unknown_names_raise_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            grin.no_such_name
+
+
+    def test_importing_the_package_imports_no_submodules(self):
+        completed = subprocess.run(
+            [sys.executable, '-c', 'import grin, sys; print(sorted(m for m in sys.modules if m.startswith("grin.")))'],
+            capture_output = True, text = True, check = True)
+
+        self.assertEqual(completed.stdout.strip(), '[]')
+
+
+    def test_running_a_program_imports_only_the_submodules_it_needs(self):
+        completed = subprocess.run(
+            [
+                sys.executable, '-c',
+                'import grin, sys; '
+                'grin.interpret(grin.load_source("PRINT 1\\n.\\n"), output_line = print); '
+                'print(sorted(m for m in sys.modules if m.startswith("grin.")))'
+            ],
+            capture_output = True, text = True, check = True)
+
+        output, imported = completed.stdout.splitlines()
+        self.assertEqual(output, '1')
+
+        for module_name in ('bytecode', 'bytecode_engine', 'caching', 'optimizing', 'profiling'):
+            with self.subTest(module_name = module_name):
+                self.assertNotIn(f"'grin.{module_name}'", imported)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,9 +8,9 @@
 # WHAT YOU NEED TO DO: Nothing, unless you make changes to grin.parsing
 # (which shouldn't be necessary).
 
-from grin.lexing import to_tokens
+from grin.lexing import to_tokens, to_program_tokens, GrinLexError
 from grin.location import GrinLocation
-from grin.parsing import parse, GrinParseError
+from grin.parsing import parse, parse_statements, GrinLineCache, GrinParseError
 import unittest
 
 
@@ -231,5 +231,78 @@ class TestGrinParsing(unittest.TestCase):
 
 
 
+    def test_can_parse_lexed_programs(self):
+        lines = ['START: LET X 5', 'GOTO "START" IF X < 10', '.', 'RETURN']
+        lexed = to_program_tokens('\n'.join(lines))
+        self.assertEqual(list(parse(lexed)), list(parse(lines)))
+
+
+    def test_parse_errors_in_lexed_programs_precede_later_lex_errors(self):
+        lexed = to_program_tokens('END\nLET X\nPRINT !\n', defer_errors = True)
+
+        with self.assertRaises(GrinParseError) as context:
+            list(parse(lexed))
+
+        self.assertEqual(context.exception.location(), GrinLocation(2, 6))
+
+
+    def test_deferred_lex_errors_are_raised_after_earlier_lines_parse(self):
+        lexed = to_program_tokens('END\nPRINT !\n', defer_errors = True)
+        parsed = parse(lexed)
+        self.assertEqual(len(next(parsed)), 1)
+
+        with self.assertRaises(GrinLexError):
+            next(parsed)
+
+
+
+class TestGrinLineCache(unittest.TestCase):
+    LINES = ['LET I 0', 'LOOP: ADD I 1', 'ADD I 1', 'GOTO "LOOP" IF I < 3', 'ADD I 1', 'RETURN', 'RETURN']
+
+
+    def test_cached_lines_have_their_own_locations(self):
+        cache = GrinLineCache()
+        parsed = list(parse(self.LINES, line_cache = cache))
+        self.assertEqual(parsed, list(parse(self.LINES, line_cache = None)))
+        self.assertEqual(parsed[4][0].location(), GrinLocation(5, 1))
+        self.assertEqual((cache.hits(), cache.misses(), len(cache)), (2, 5, 5))
+
+
+    def test_cached_statements_have_their_own_line_numbers(self):
+        cache = GrinLineCache()
+        statements = list(parse_statements(self.LINES, first_line = 10, line_cache = cache))
+        self.assertEqual(statements, list(parse_statements(self.LINES, first_line = 10, line_cache = None)))
+        self.assertEqual([statement.line() for statement in statements], list(range(10, 17)))
+
+
+    def test_least_recently_used_lines_are_evicted(self):
+        cache = GrinLineCache(max_size = 2)
+        list(parse(['PRINT 1', 'PRINT 2', 'PRINT 1', 'PRINT 3', 'PRINT 1', 'PRINT 2'], line_cache = cache))
+        self.assertEqual((cache.hits(), cache.misses(), cache.evictions(), len(cache)), (2, 4, 2, 2))
+
+
+    def test_errors_are_reported_at_their_own_lines(self):
+        cache = GrinLineCache()
+
+        for lines, error_type, location in [
+                (['PRINT 1', 'PRINT 1', 'PRINT'], GrinParseError, GrinLocation(3, 6)),
+                (['LET X @', 'LET X @'], GrinLexError, GrinLocation(1, 7))]:
+            for first_line in (1, 5):
+                with self.subTest(lines = lines, first_line = first_line):
+                    with self.assertRaises(error_type) as context:
+                        list(parse_statements(lines, first_line = first_line, line_cache = cache))
+
+                    self.assertEqual(
+                        context.exception.location(),
+                        GrinLocation(location.line() + first_line - 1, location.column()))
+
+
+    def test_a_cache_of_size_zero_caches_nothing(self):
+        cache = GrinLineCache(max_size = 0)
+        list(parse(['END', 'END'], line_cache = cache))
+        self.assertEqual((cache.hits(), cache.misses(), len(cache)), (0, 2, 0))
+
+
+
 if __name__ == '__main__':
     unittest.main()
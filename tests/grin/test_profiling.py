@@ -0,0 +1,84 @@
+# test_profiling.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.profiling module.
+
+from grin.interpreter import interpret
+from grin.parsing import parse_statements
+from grin.profiling import GrinProfile
+import os
+import pstats
+import tempfile
+import unittest
+
+
+
+_SOURCE = '''LET I 0
+LOOP: GOSUB "COUNT"
+ADD I 1
+GOTO "LOOP" IF I < 3
+PRINT N
+END
+COUNT: LET DEPTH 0
+GOSUB "DESCEND"
+RETURN
+DESCEND: ADD DEPTH 1
+ADD N 1
+GOSUB "DESCEND" IF DEPTH < 4
+RETURN
+'''
+
+
+
+class TestGrinProfile(unittest.TestCase):
+    def setUp(self):
+        self.profile = GrinProfile()
+        self.output = []
+        interpret(parse_statements(_SOURCE.splitlines()), output_line = self.output.append, profile = self.profile)
+
+
+    def test_programs_behave_identically_when_profiled(self):
+        self.assertEqual(self.output, ['12'])
+
+
+    def test_executions_of_each_line_are_counted(self):
+        counts = {line: count for line, count, _ in self.profile.lines()}
+        self.assertEqual(counts, {1: 1, 2: 3, 3: 3, 4: 3, 5: 1, 6: 1, 7: 3, 8: 3, 9: 3, 10: 12, 11: 12, 12: 12, 13: 12})
+
+
+    def test_calls_of_each_subroutine_are_counted(self):
+        calls = {(line, name): calls for line, name, calls, _ in self.profile.subroutines()}
+        self.assertEqual(calls, {(7, 'COUNT'): 3, (10, 'DESCEND'): 12})
+
+
+    def test_recursive_calls_are_only_timed_once(self):
+        seconds = {name: seconds for _, name, _, seconds in self.profile.subroutines()}
+        self.assertLessEqual(seconds['DESCEND'], seconds['COUNT'])
+
+
+    def test_reports_include_the_text_of_each_line(self):
+        report = self.profile.report(_SOURCE)
+        self.assertIn('DESCEND: ADD DEPTH 1', report)
+        self.assertIn('COUNT', report.split('Subroutine')[1])
+
+
+    def test_profiles_can_be_read_by_pstats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.pstats')
+            self.profile.write_pstats(path, _SOURCE)
+            statistics = pstats.Stats(path).stats
+
+        self.assertEqual(statistics[('program.grin', 10, 'line 10: DESCEND: ADD DEPTH 1')][1], 12)
+        self.assertEqual(statistics[('program.grin', 10, 'GOSUB DESCEND')][1], 12)
+
+
+    def test_only_the_closures_engine_can_profile(self):
+        with self.assertRaises(ValueError):
+            interpret([], engine = 'bytecode', profile = GrinProfile())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
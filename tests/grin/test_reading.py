@@ -0,0 +1,79 @@
+# test_reading.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.reading module.
+
+from grin.reading import GrinInputReader
+import io
+import unittest
+
+
+
+def make_reader(text: bytes, chunk_size: int = 4) -> GrinInputReader:
+    return GrinInputReader(io.BufferedReader(io.BytesIO(text)), chunk_size = chunk_size)
+
+
+
+class TestGrinInputReader(unittest.TestCase):
+    def test_program_ends_at_a_dot_line(self):
+        for chunk_size in (1, 2, 3, 4, 1024):
+            with self.subTest(chunk_size = chunk_size):
+                reader = make_reader(b'LET X 1\nPRINT X\n.\n12\nBoo\n', chunk_size)
+                self.assertEqual(reader.read_program(), b'LET X 1\nPRINT X\n')
+                self.assertEqual(reader.read_line(), '12')
+                self.assertEqual(reader.read_line(), 'Boo')
+
+
+    def test_dots_within_lines_do_not_end_the_program(self):
+        reader = make_reader(b'PRINT ".5"\n.5\n..\n. \n.\nafter\n')
+        self.assertEqual(reader.read_program(), b'PRINT ".5"\n.5\n..\n. \n')
+        self.assertEqual(reader.read_line(), 'after')
+
+
+    def test_dot_on_the_first_line(self):
+        reader = make_reader(b'.\nafter\n')
+        self.assertEqual(reader.read_program(), b'')
+        self.assertEqual(reader.read_line(), 'after')
+
+
+    def test_dot_on_the_last_line_without_a_newline(self):
+        for text in (b'PRINT 1\n.', b'PRINT 1\n.\r'):
+            with self.subTest(text = text):
+                reader = make_reader(text)
+                self.assertEqual(reader.read_program(), b'PRINT 1\n')
+
+                with self.assertRaises(EOFError):
+                    reader.read_line()
+
+
+    def test_program_without_a_dot_is_the_rest_of_the_input(self):
+        self.assertEqual(make_reader(b'PRINT 1\nPRINT 2').read_program(), b'PRINT 1\nPRINT 2')
+
+
+    def test_windows_line_endings(self):
+        reader = make_reader(b'PRINT 1\r\n.\r\n12\r\nlast')
+        self.assertEqual(reader.read_program(), b'PRINT 1\r\n')
+        self.assertEqual(reader.read_line(), '12')
+        self.assertEqual(reader.read_line(), 'last')
+
+
+    def test_lines_are_decoded_as_utf8(self):
+        reader = make_reader('.\nBoo \N{GRINNING FACE}\n'.encode(encoding = 'utf-8'))
+        reader.read_program()
+        self.assertEqual(reader.read_line(), 'Boo \N{GRINNING FACE}')
+
+
+    def test_reading_past_the_end_raises_eof_error(self):
+        reader = make_reader(b'.\n\n')
+        reader.read_program()
+        self.assertEqual(reader.read_line(), '')
+
+        with self.assertRaises(EOFError):
+            reader.read_line()
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# test_resolution.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.resolution module.
+
+from grin.location import GrinLocation
+from grin.parsing import parse_statements
+from grin.resolution import resolve
+from grin.runtime import GrinRuntimeError
+import unittest
+
+
+
+class TestGrinResolution(unittest.TestCase):
+    def test_first_occurrence_of_each_label_is_used(self):
+        resolved = resolve(parse_statements(['A: LET X 1', 'B: PRINT X', 'A: END']))
+        self.assertEqual(resolved.labels(), {'A': 0, 'B': 1})
+
+
+    def test_variables_are_assigned_slots_in_order_of_appearance(self):
+        resolved = resolve(parse_statements([
+            'LET X Y', 'PRINT Z', 'INNUM X', 'GOTO T IF A < "B"', 'END'
+        ]))
+
+        self.assertEqual(resolved.slots(), {'X': 0, 'Y': 1, 'Z': 2, 'T': 3, 'A': 4})
+
+
+    def test_literal_targets_are_resolved_to_absolute_indexes(self):
+        resolved = resolve(parse_statements([
+            'LET X 1', 'GOTO -1', 'GOSUB "DONE"', 'GOTO 2 IF X < 3', 'DONE: RETURN', 'GOTO X'
+        ]))
+
+        self.assertEqual(resolved.destination(1), 0)
+        self.assertEqual(resolved.destination(2), 4)
+        self.assertEqual(resolved.destination(3), 5)
+        self.assertTrue(resolved.is_resolved(3))
+        self.assertFalse(resolved.is_resolved(0))
+        self.assertFalse(resolved.is_resolved(5))
+
+
+    def test_jumping_just_past_the_end_is_resolved(self):
+        self.assertEqual(resolve(parse_statements(['GOTO 1'])).destination(0), 1)
+
+
+    def test_impossible_literal_jumps_are_diagnosed(self):
+        resolved = resolve(parse_statements(['GOTO "NOWHERE"', 'PRINT 1', 'GOSUB 0', 'GOTO -4']))
+
+        self.assertEqual(
+            [error.location() for error in resolved.diagnostics()],
+            [GrinLocation(1, 1), GrinLocation(3, 1), GrinLocation(4, 1)])
+
+        self.assertTrue(resolved.is_resolved(0))
+
+        with self.assertRaises(GrinRuntimeError):
+            resolved.destination(0)
+
+
+    def test_possible_programs_have_no_diagnostics(self):
+        self.assertEqual(resolve(parse_statements(['A: GOTO "A"'])).diagnostics(), [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
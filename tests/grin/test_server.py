@@ -0,0 +1,146 @@
+# test_server.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.server and grin.client modules.
+
+from grin.client import run_client
+from grin.server import serve_request, GrinServer
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+
+
+_PROJECT3 = pathlib.Path(__file__).parent.parent.parent / 'project3.py'
+
+
+
+class TestServingRequests(unittest.TestCase):
+    def serve(self, text: str, **options) -> str:
+        outgoing = io.StringIO()
+        serve_request(io.BytesIO(text.encode(encoding = 'utf-8')), outgoing, **options)
+        return outgoing.getvalue()
+
+
+    def test_programs_read_their_input_after_the_end_of_the_program(self):
+        self.assertEqual(self.serve('INSTR NAME\nPRINT NAME\n.\nBoo\n'), 'Boo\n')
+
+
+    def test_errors_are_printed_after_the_output(self):
+        self.assertEqual(
+            self.serve('PRINT 1\nRETURN\n.\n'),
+            '1\nError during execution: Line 2 Column 1: RETURN without a matching GOSUB\n')
+
+
+    def test_programs_that_run_too_long_are_stopped(self):
+        output = self.serve('PRINT 1\nL: GOTO "M"\nM: GOTO "L"\n.\n', timeout = 0.1)
+        self.assertEqual(output, '1\nError during execution: Time limit exceeded (0.1s)\n')
+
+
+
+class TestStoppingServers(unittest.TestCase):
+    def test_workers_that_already_exited_are_skipped(self):
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+
+        server = GrinServer('unused.sock', worker_count = 1)
+        server._worker_ids.add(exited.pid)
+        server._stop(None, None)
+
+        self.assertEqual(server._worker_ids, set())
+
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.directory.name, 'grin.sock')
+        cls.server = subprocess.Popen([
+            sys.executable, '-m', 'grin.server', '--socket', cls.socket_path,
+            '--workers', '2', '--timeout', '0.5'])
+
+        deadline = time.monotonic() + 10
+
+        while not os.path.exists(cls.socket_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        cls.directory.cleanup()
+
+
+    def run_client(self, text: str) -> str:
+        output_stream = io.BytesIO()
+        run_client(self.socket_path, io.BytesIO(text.encode(encoding = 'utf-8')), output_stream)
+        return output_stream.getvalue().decode(encoding = 'utf-8')
+
+
+    def test_running_programs(self):
+        self.assertEqual(self.run_client('INNUM X\nMULT X 2\nPRINT X\n.\n21\n'), '42\n')
+
+
+    def test_programs_needn_t_read_all_of_their_input(self):
+        self.assertEqual(self.run_client('PRINT "Boo"\n.\n' + 'unread\n' * 100000), 'Boo\n')
+
+
+    def test_workers_survive_programs_that_run_too_long(self):
+        self.assertEqual(
+            self.run_client('L: GOTO "M"\nM: GOTO "L"\n.\n'),
+            'Error during execution: Time limit exceeded (0.5s)\n')
+
+        for n in range(4):
+            self.assertEqual(self.run_client(f'PRINT {n}\n.\n'), f'{n}\n')
+
+
+    def test_the_client_behaves_like_project3(self):
+        program = b'LET X 3\nPRINT X\nINSTR Y\nPRINT Y\n.\nBoo\n'
+        project3 = subprocess.run(
+            [sys.executable, str(_PROJECT3)], input = program, capture_output = True, check = True)
+        client = subprocess.run(
+            [sys.executable, '-m', 'grin.client', '--socket', self.socket_path],
+            input = program, capture_output = True, check = True)
+
+        self.assertEqual(client.stdout, project3.stdout)
+
+
+    def test_the_client_behaves_like_project3_given_a_program_file(self):
+        for program in (b'PRINT "hello"\nINSTR Y\nPRINT Y\n.\n', b'PRINT "hello"\nINSTR Y\nPRINT Y\n'):
+            with self.subTest(program = program):
+                program_path = os.path.join(self.directory.name, 'program.grin')
+
+                with open(program_path, 'wb') as program_file:
+                    program_file.write(program)
+
+                project3 = subprocess.run(
+                    [sys.executable, str(_PROJECT3), program_path],
+                    input = b'Boo\n', capture_output = True, check = True)
+                client = subprocess.run(
+                    [sys.executable, '-m', 'grin.client', '--socket', self.socket_path, program_path],
+                    input = b'Boo\n', capture_output = True, check = True)
+
+                self.assertEqual(client.stdout, b'hello\nBoo\n')
+                self.assertEqual(client.stdout, project3.stdout)
+
+
+    def test_the_client_runs_programs_itself_without_a_server(self):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'grin.client', '--socket', os.path.join(self.directory.name, 'none')],
+            input = b'PRINT 1\n.\n', capture_output = True, check = True)
+
+        self.assertEqual(completed.stdout, b'1\n')
+
+
+
+if __name__ == '__main__':
+    unittest.main()
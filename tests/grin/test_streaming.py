@@ -0,0 +1,149 @@
+# test_streaming.py
+#
+# ICS 33 Spring 2024
+# Project 3: Why Not Smile?
+#
+# Unit tests for the grin.streaming module.
+
+from grin.location import GrinLocation
+from grin.parsing import GrinParseError
+from grin.runtime import GrinRuntimeError
+from grin.streaming import interpret_stream, GrinProgramWindow
+import unittest
+
+
+
+class TestGrinProgramWindow(unittest.TestCase):
+    def test_lines_are_read_only_as_needed(self):
+        read = []
+
+        def lines():
+            for line in ['LET X 1', 'PRINT X', 'END', '.']:
+                read.append(line)
+                yield line
+
+        with GrinProgramWindow(lines()) as window:
+            self.assertEqual(window.statement(0).line(), 1)
+            self.assertEqual(read, ['LET X 1'])
+            self.assertEqual(window.statement(2).line(), 3)
+            self.assertEqual(window.read_count(), 3)
+            self.assertFalse(window.has_ended())
+            self.assertIsNone(window.statement(3))
+            self.assertTrue(window.has_ended())
+
+
+    def test_statements_that_leave_the_window_are_read_again(self):
+        lines = [f'PRINT "line {n}"' for n in range(1, 11)]
+
+        with GrinProgramWindow(lines, window_size = 3) as window:
+            self.assertEqual(window.read_all(), 10)
+            self.assertEqual(window.reparsed_count(), 0)
+
+            first = window.statement(0)
+            self.assertEqual(first.line(), 1)
+            self.assertEqual(first.value().value(), 'line 1')
+            self.assertEqual(window.reparsed_count(), 1)
+
+            window.statement(0)
+            self.assertEqual(window.reparsed_count(), 1)
+
+
+    def test_labels_are_found_by_reading_ahead(self):
+        with GrinProgramWindow(['PRINT 1', 'A: PRINT 2', 'A: PRINT 3', 'B: END']) as window:
+            self.assertEqual(window.find_label('A'), 1)
+            self.assertEqual(window.read_count(), 2)
+            self.assertIsNone(window.find_label('C'))
+            self.assertEqual(window.labels(), {'A': 1, 'B': 3})
+
+
+    def test_window_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            GrinProgramWindow([], window_size = 0)
+
+
+
+class TestGrinStreaming(unittest.TestCase):
+    def run_stream(self, lines, inputs: list[str] = (), window_size: int = 2) -> list[str]:
+        output = []
+        remaining = iter(inputs)
+
+        interpret_stream(
+            lines, input_line = lambda: next(remaining),
+            output_line = output.append, window_size = window_size)
+
+        return output
+
+
+    def test_statements_run_before_later_lines_are_read(self):
+        output = []
+
+        def lines():
+            yield 'PRINT "first"'
+            self.assertEqual(output, ['first'])
+            yield 'PRINT "second"'
+            self.assertEqual(output, ['first', 'second'])
+            yield '.'
+
+        interpret_stream(lines(), output_line = output.append)
+        self.assertEqual(output, ['first', 'second'])
+
+
+    def test_loops_and_subroutines_larger_than_the_window(self):
+        lines = [
+            'LET I 0',
+            'TOP: ADD I 1',
+            'GOSUB "SHOW"',
+            'GOTO 2',
+            'PRINT "skipped"',
+            'GOTO -4 IF I < 3',
+            'END',
+            'SHOW: PRINT I',
+            'RETURN',
+            '.',
+            'not Grin at all'
+        ]
+
+        self.assertEqual(self.run_stream(lines), ['1', '2', '3'])
+
+
+    def test_parse_errors_are_raised_when_their_line_is_read(self):
+        output = []
+
+        with self.assertRaises(GrinParseError) as context:
+            interpret_stream(['PRINT 1', 'LET X', 'PRINT 2'], output_line = output.append)
+
+        self.assertEqual(output, ['1'])
+        self.assertEqual(context.exception.location(), GrinLocation(2, 6))
+
+
+    def test_invalid_jumps_are_runtime_errors(self):
+        programs = [
+            ['GOTO "NOWHERE"', 'PRINT 1'],
+            ['PRINT 1', 'GOTO 3', 'PRINT 2'],
+            ['PRINT 1', 'GOTO -2']
+        ]
+
+        for lines in programs:
+            with self.subTest(lines = lines):
+                with self.assertRaises(GrinRuntimeError):
+                    self.run_stream(lines)
+
+
+    def test_jumping_just_past_the_end_ends_the_program(self):
+        self.assertEqual(self.run_stream(['GOTO 2', 'PRINT 1']), [])
+
+
+    def test_rest_of_program_is_read_before_input_when_they_share_a_source(self):
+        source = iter(['INNUM X', 'PRINT X', '.', '42'])
+        output = []
+
+        interpret_stream(
+            source, input_line = lambda: next(source), output_line = output.append,
+            program_precedes_input = True)
+
+        self.assertEqual(output, ['42'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,11 @@
 # WHAT YOU NEED TO DO: Nothing, unless you make changes to grin.token
 # (which shouldn't be necessary).
 
-from grin.token import GrinTokenKind, GrinToken
+from grin.location import GrinLocation
+from grin.token import GrinTokenCategory, GrinTokenKind, GrinToken, TokenBuffer
+from grin.token import CATEGORY_MASKS, COMPARISON_OPERATOR_MASK, JUMP_TARGET_MASK, KIND_BITS
+from grin.token import VALUE_MASK, kinds_mask
+import pickle
 import unittest
 
 
@@ -17,3 +21,126 @@ class GrinTokenKindTest(unittest.TestCase):
     def test_indexes_are_unique(self):
         indexes = set(kind.index() for kind in GrinTokenKind.__members__.values())
         self.assertEqual(len(indexes), len(GrinTokenKind.__members__))
+
+
+    def test_bits_are_indexed_by_kind_index(self):
+        for kind in GrinTokenKind:
+            with self.subTest(kind = kind):
+                self.assertEqual(kind.bit(), 1 << kind.index())
+                self.assertEqual(KIND_BITS[kind.index()], kind.bit())
+
+
+    def test_category_masks_contain_exactly_the_kinds_in_each_category(self):
+        for kind in GrinTokenKind:
+            for category, mask in CATEGORY_MASKS.items():
+                with self.subTest(kind = kind, category = category):
+                    self.assertEqual(bool(kind.bit() & mask), kind.category() == category)
+
+
+    def test_role_masks(self):
+        values = {
+            GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
+            GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER
+        }
+
+        self.assertEqual(VALUE_MASK, kinds_mask(values))
+        self.assertEqual(JUMP_TARGET_MASK, kinds_mask(values - {GrinTokenKind.LITERAL_FLOAT}))
+
+        for kind in GrinTokenKind:
+            with self.subTest(kind = kind):
+                self.assertEqual(
+                    bool(kind.bit() & COMPARISON_OPERATOR_MASK),
+                    kind.category() == GrinTokenCategory.COMPARISON_OPERATOR)
+
+
+
+class GrinTokenTest(unittest.TestCase):
+    def make_token(self, column: int = 1) -> GrinToken:
+        return GrinToken(
+            kind = GrinTokenKind.IDENTIFIER, text = 'BOO', value = 'BOO',
+            location = GrinLocation(3, column))
+
+
+    def test_equal_tokens_have_equal_hashes(self):
+        self.assertEqual(self.make_token(), self.make_token())
+        self.assertEqual(hash(self.make_token()), hash(self.make_token()))
+        self.assertEqual(len({self.make_token(), self.make_token(), self.make_token(5)}), 2)
+
+
+    def test_tokens_are_immutable(self):
+        token = self.make_token()
+
+        with self.assertRaises(AttributeError):
+            token._text = 'OTHER'
+
+        self.assertEqual(token.text(), 'BOO')
+
+
+    def test_can_be_pickled(self):
+        token = self.make_token()
+        self.assertEqual(pickle.loads(pickle.dumps(token)), token)
+
+
+
+class TokenBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = TokenBuffer('LET X 5\nPRINT X')
+        self.buffer.append(GrinTokenKind.LET, 'LET', 'LET', 1, 1, 0)
+        self.buffer.append(GrinTokenKind.IDENTIFIER, 'X', 'X', 1, 5, 4)
+        self.buffer.append(GrinTokenKind.LITERAL_INTEGER, '5', 5, 1, 7, 6)
+        self.buffer.append(GrinTokenKind.PRINT, 'PRINT', 'PRINT', 2, 1, 8)
+        self.buffer.append(GrinTokenKind.IDENTIFIER, 'X', 'X', 2, 7, 14)
+
+
+    def test_tokens_are_available_as_grin_tokens(self):
+        self.assertEqual(len(self.buffer), 5)
+
+        self.assertEqual(
+            self.buffer[2],
+            GrinToken(
+                kind = GrinTokenKind.LITERAL_INTEGER, text = '5', value = 5,
+                location = GrinLocation(1, 7)))
+
+        token = self.buffer[-1]
+        self.assertEqual(token.kind(), GrinTokenKind.IDENTIFIER)
+        self.assertEqual(token.text(), 'X')
+        self.assertEqual(token.value(), 'X')
+        self.assertEqual(token.location(), GrinLocation(2, 7))
+
+
+    def test_can_slice_and_iterate(self):
+        self.assertEqual(self.buffer[3:], [self.buffer[3], self.buffer[4]])
+        self.assertEqual(list(self.buffer), self.buffer.tokens(0, 5))
+
+
+    def test_indexing_past_end_raises_index_error(self):
+        with self.assertRaises(IndexError):
+            self.buffer[5]
+
+
+    def test_columns_are_available_without_building_tokens(self):
+        self.assertEqual(self.buffer.kind(3), GrinTokenKind.PRINT)
+        self.assertEqual(self.buffer.text(4), 'X')
+        self.assertEqual(self.buffer.value(2), 5)
+        self.assertEqual(self.buffer.location(1), GrinLocation(1, 5))
+        self.assertEqual(list(self.buffer.kind_indexes()), [17, 11, 19, 23, 11])
+
+
+    def test_spans_refer_to_the_source(self):
+        start, end = self.buffer.span(3)
+        self.assertEqual(self.buffer.source()[start:end], 'PRINT')
+
+
+    def test_tokens_with_same_text_share_their_text_and_value(self):
+        self.assertIs(self.buffer.text(1), self.buffer.text(4))
+
+
+    def test_can_truncate(self):
+        self.buffer.truncate(2)
+        self.assertEqual(len(self.buffer), 2)
+        self.assertEqual(self.buffer[1].text(), 'X')
+
+
+
+if __name__ == '__main__':
+    unittest.main()